@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of the parsers.
+
+The suite times every parser on the tests/data corpus and on generated
+files of increasing size, and compares the results with a baseline::
+
+    python -m benchmarks run --output results.json
+    python -m benchmarks compare benchmarks/baseline.json results.json
+
+The other modules benchmark a single optimisation, and are run as
+``python -m benchmarks.<module>`` from the repository root.
+"""
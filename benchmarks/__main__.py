@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""Run the benchmark suite, see ``python -m benchmarks --help``."""
+
+from benchmarks.suite import main
+
+main()
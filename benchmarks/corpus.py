@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Files of the tests/data corpus used by the benchmarks."""
+
+from pathlib import Path
+
+DATA_PATH = Path(__file__).parent.parent / 'tests' / 'data'
+
+
+def corpus():
+    """All parsable files in tests/data as batch items."""
+    items = []
+    items += [(p, 'mic', 'xl') for p in (DATA_PATH / 'mic').glob('*.xls')]
+    items += [(p, 'bel', 'xl') for p in (DATA_PATH / 'bel').glob('*.xls')]
+    for ext, fmt in (('*.DAT', 'dat'), ('*.csv', 'csv')):
+        for p in (DATA_PATH / 'bel').glob(ext):
+            lang = 'JPN' if p.stem.endswith('_jis') else 'ENG'
+            items.append((p, 'bel', fmt, {'lang': lang}))
+    items += [(p, '3p', 'xl') for p in (DATA_PATH / '3p').glob('*.xlsx')]
+    items += [(p, 'qnt', 'txt-raw') for p in (DATA_PATH / 'qnt').glob('*.txt')]
+    items += [(p, 'smsdvs', 'xlsx') for p in (DATA_PATH / 'sms_dvs').glob('*.xlsx')]
+    items += [(p, 'generic', 'csv') for p in (DATA_PATH / 'generic').glob('*.csv')]
+    items += [(p, 'generic', 'xls') for p in (DATA_PATH / 'generic').glob('*.xls')]
+    return items
+
+
+def parser_files():
+    """
+    All files in tests/data by parser module.
+
+    Unlike ``corpus``, this includes the 3P .jwgbt files, which
+    ``read`` does not support but ``trp_xml.parse`` reads.
+
+    Returns
+    -------
+    dict
+        Lists of ``(path, options)`` by parser module name.
+    """
+    from adsorption_file_parser.registry import get_parser
+
+    files = {}
+    for item in corpus():
+        path, manufacturer, fmt = item[:3]
+        options = item[3] if len(item) == 4 else {}
+        module = get_parser(manufacturer, fmt).target.partition(':')[0].rpartition('.')[2]
+        files.setdefault(module, []).append((path, options))
+    files['trp_xml'] = [(p, {}) for p in (DATA_PATH / '3p').glob('*.jwgbt')]
+    return {module: sorted(paths) for module, paths in files.items()}
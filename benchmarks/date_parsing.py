@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark date parsing with learned formats against dateutil.
+
+Run from the repository root::
+
+    python -m benchmarks.date_parsing --count 10000
+
+Distinct timestamps are written in the formats found in tests/data, so the
+per-string cache does not help, and parsed with ``dateutil.parser.parse``
+and with ``date_parsing.parse_date``.
+"""
+
+import argparse
+import time
+from datetime import datetime
+from datetime import timedelta
+
+import dateutil.parser
+
+from adsorption_file_parser.utils import date_parsing
+
+FORMATS = {
+    'mic': ('%d.%m.%Y %H:%M:%S', False),
+    'trp': ('%m/%d/%Y %I:%M:%S %p', False),
+    'bel': ('%y/%m/%d', True),
+    'sms': ('%Y-%m-%d %H:%M:%S+01:00', False),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=10000, help='timestamps per format')
+    args = parser.parse_args()
+
+    start = datetime(2015, 1, 1)
+    for name, (fmt, yearfirst) in FORMATS.items():
+        step = timedelta(days=1) if '%H' not in fmt and '%I' not in fmt else timedelta(seconds=7919)
+        strings = [(start + i * step).strftime(fmt) for i in range(args.count)]
+
+        t0 = time.perf_counter()
+        for text in strings:
+            dateutil.parser.parse(text, yearfirst=yearfirst).isoformat()
+        t_dateutil = time.perf_counter() - t0
+
+        date_parsing.date_cache_clear()
+        t0 = time.perf_counter()
+        for text in strings:
+            date_parsing.parse_date(text, yearfirst=yearfirst)
+        t_learned = time.perf_counter() - t0
+
+        info = date_parsing.date_cache_info()
+        print(
+            f'{name:>4} {fmt:>24}: dateutil {t_dateutil / args.count * 1e6:7.2f} us  '
+            f'learned {t_learned / args.count * 1e6:7.2f} us  speedup {t_dateutil / t_learned:5.1f}x  '
+            f'({info["dateutil"]} dateutil calls)'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark format detection against parsing.
+
+Run from the repository root::
+
+    python -m benchmarks.detect --repeat 20
+
+For each file in tests/data, times ``detect_format`` and ``read`` with the
+format given, and checks that the detected format is the expected one.
+"""
+
+import argparse
+import logging
+import time
+from collections import defaultdict
+
+import adsorption_file_parser as afp
+from adsorption_file_parser.detect import detect_format
+from benchmarks.corpus import corpus
+
+
+def best_time(func, *args, repeat=3, **kwargs):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20, help='runs per file, the best is kept')
+    args = parser.parse_args()
+    logging.getLogger('adsorption_file_parser').setLevel(logging.ERROR)
+
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    for item in corpus():
+        path, manufacturer, fmt = item[:3]
+        options = item[3] if len(item) == 4 else {}
+        detection = detect_format(path)
+        if (detection.manufacturer, detection.fmt, detection.options) != (manufacturer, fmt, options):
+            raise RuntimeError(f'{path} detected as {detection}')
+
+        total = totals[(manufacturer, fmt)]
+        total[0] += 1
+        total[1] += best_time(detect_format, path, repeat=args.repeat)
+        total[2] += best_time(afp.read, path, manufacturer, fmt, repeat=max(1, args.repeat // 10), **options)
+
+    print(f'{"format":>16} {"files":>5} {"detect":>10} {"parse":>10} {"detect/parse":>12}')
+    for (manufacturer, fmt), (count, t_detect, t_parse) in sorted(totals.items()):
+        print(
+            f'{manufacturer + " " + fmt:>16} {count:5d} {t_detect / count * 1e6:7.1f} us '
+            f'{t_parse / count * 1e3:7.2f} ms {t_detect / t_parse * 100:11.2f}%'
+        )
+
+
+if __name__ == '__main__':
+    main()
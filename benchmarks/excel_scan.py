@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the xlrd-based report parsers (Micromeritics and BEL).
+
+Run from the repository root::
+
+    python -m benchmarks.excel_scan --rows 50000
+
+Times ``mic_excel.parse`` on each file in tests/data/mic and
+``bel_excel.parse`` on tests/data/bel, then on a synthetic Micromeritics
+report with ``--rows`` data points built from the layout of Sample_M.
+Each file is timed with the layout cache disabled (cold) and with the
+layout already cached (warm).
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import xlrd
+import xlwt
+
+from adsorption_file_parser import bel_excel
+from adsorption_file_parser import mic_excel
+from adsorption_file_parser.utils.layout_cache import configure_layout_cache
+from benchmarks.corpus import DATA_PATH
+
+
+def synthetic_mic_report(path, rows):
+    """Copy the metadata of Sample_M and write ``rows`` data points."""
+    source = xlrd.open_workbook(DATA_PATH / 'mic' / 'Sample_M.xls', encoding_override='latin-1')
+    sheet = source.sheet_by_name('Isotherm Tabular Report')
+
+    book = xlwt.Workbook()
+    out = book.add_sheet('Isotherm Tabular Report')
+    for row in range(29):  # metadata, header and first P0 row
+        for col, value in enumerate(sheet.row_values(row)):
+            if value != '':
+                out.write(row, col, value)
+    for point in range(rows):
+        frac = (point + 1) / (rows + 1)
+        row = 29 + point
+        out.write(row, 0, frac)
+        out.write(row, 1, frac * 122.2)
+        out.write(row, 2, 150 * frac / (0.1 + frac))
+        out.write(row, 3, f'{point // 60 % 100:02d}:{point % 60:02d}')
+        out.write(row, 4, 122.2)
+    book.save(str(path))
+
+
+def best_time(func, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name, path, parse):
+    configure_layout_cache(maxsize=0)
+    t_cold = best_time(parse, path)
+    configure_layout_cache()
+    parse(path)
+    t_warm = best_time(parse, path)
+    print(f'{name:>40}: cold {t_cold * 1000:9.2f} ms  warm {t_warm * 1000:9.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000, help='points in the synthetic report (max 65000)')
+    args = parser.parse_args()
+    logging.getLogger('adsorption_file_parser').setLevel(logging.ERROR)
+
+    for path in sorted((DATA_PATH / 'mic').glob('*.xls')):
+        report(path.name, path, mic_excel.parse)
+    for path in sorted((DATA_PATH / 'bel').glob('*.xls')):
+        report(path.name, path, bel_excel.parse)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'synthetic.xls'
+        synthetic_mic_report(path, args.rows)
+        report(f'synthetic mic, {args.rows} rows', path, mic_excel.parse)
+
+
+if __name__ == '__main__':
+    main()
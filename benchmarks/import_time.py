@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the cold start cost of the package with ``python -X importtime``.
+
+Run from the repository root::
+
+    python -m benchmarks.import_time --repeat 5
+
+Each import runs in a fresh interpreter. The best cumulative time of the
+package modules is reported, with the slowest modules of the last run.
+The budgets tracked by the test suite are in tests/test_import_time.py.
+"""
+
+import argparse
+import subprocess
+import sys
+
+TARGETS = [
+    'import adsorption_file_parser',
+    'from adsorption_file_parser import read',
+] + [
+    f'from adsorption_file_parser.{module} import parse' for module in (
+        'bel_csv',
+        'bel_dat',
+        'bel_excel',
+        'generic_csv',
+        'generic_excel',
+        'mic_excel',
+        'qnt_txt',
+        'sms_dvs_excel',
+        'trp_excel',
+    )
+]
+
+
+def import_time(statement):
+    """Return the ``-X importtime`` report as (name, self us, cumulative us)."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        report.append((name, int(self_us), int(cumulative_us)))
+    return report
+
+
+def package_time(report):
+    """Cumulative time of the top-level package imports."""
+    return sum(cumulative for name, _, cumulative in report if name.startswith(' adsorption_file_parser'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per import')
+    parser.add_argument('--top', type=int, default=5, help='slowest modules shown per import')
+    args = parser.parse_args()
+
+    for statement in TARGETS:
+        reports = [import_time(statement) for _ in range(args.repeat)]
+        best = min(package_time(report) for report in reports)
+        print(f'{statement:<60} {best / 1000:8.2f} ms')
+        slowest = sorted(reports[-1], key=lambda entry: entry[1], reverse=True)[:args.top]
+        for name, self_us, _ in slowest:
+            print(f'    {name.strip():<56} {self_us / 1000:8.2f} ms self')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark of the cost of the parser instrumentation.
+
+Run from the repository root::
+
+    python -m benchmarks.instrumentation
+
+Small generated files of each format, where the fixed cost of the
+reporting weighs the most, are parsed with the undecorated parse
+function, with the instrumented one outside ``collect`` (the default),
+and inside ``collect``. The phase marks and counters within the parsers
+run in all three cases, outside ``collect`` they each cost a lookup of
+the context variable, a few dozen per file.
+"""
+
+import tempfile
+import time
+from importlib import import_module
+from pathlib import Path
+
+from adsorption_file_parser import synthetic
+from adsorption_file_parser.utils import instrumentation
+
+POINTS = 20
+
+
+def timeit(func, path, repeat=5, number=20):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func(path)
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def collected(parse):
+    def run(path):
+        with instrumentation.collect():
+            parse(path)
+    return run
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for parser, (_, ext, _) in synthetic.WRITERS.items():
+            path = Path(directory) / f'{parser}{ext}'
+            synthetic.write(parser, path, POINTS)
+            parse = import_module(f'adsorption_file_parser.{parser}').parse
+            bare = timeit(parse.__wrapped__, path)
+            disabled = timeit(parse, path)
+            enabled = timeit(collected(parse), path)
+            print(
+                f'{parser:>14}: bare {bare * 1e3:8.3f} ms | '
+                f'disabled {(disabled / bare - 1) * 100:+6.1f}% | '
+                f'collecting {(enabled / bare - 1) * 100:+6.1f}%'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark of metadata keyword lookups.
+
+Run from the repository root::
+
+    python -m benchmarks.keyword_index
+
+Every non-empty text cell of the Micromeritics and BEL reports in
+tests/data is looked up in the corresponding ``_META_DICT``, as done
+during the grid scan of the parsers, first with a linear
+search of the aliases, as the parsers did, and then with a ``KeywordIndex``.
+"""
+
+import time
+
+import xlrd
+
+from adsorption_file_parser import bel_common
+from adsorption_file_parser import mic_excel
+from adsorption_file_parser.utils.keyword_index import KeywordIndex
+from benchmarks.corpus import DATA_PATH
+
+
+def cell_texts(pattern):
+    """All non-empty text cells in the matching workbooks, lowercase."""
+    texts = []
+    for path in DATA_PATH.glob(pattern):
+        book = xlrd.open_workbook(path, encoding_override='latin-1')
+        for sheet in book.sheets():
+            for row in range(sheet.nrows):
+                texts += [v.strip().lower() for v in sheet.row_values(row) if isinstance(v, str) and v]
+    return texts
+
+
+def search_in(key, def_dict):
+    """The former exact lookup, scanning every alias."""
+    return next(k for k, v in def_dict.items() if any(key == n for n in v.get('text', [])))
+
+
+def search_starts(key, def_dict):
+    """The former "starts with" lookup, scanning every alias."""
+    return next(k for k, v in def_dict.items() if any(key.startswith(n) for n in v.get('text', [])))
+
+
+def linear(texts, search, def_dict):
+    found = 0
+    for text in texts:
+        try:
+            search(text, def_dict)
+            found += 1
+        except StopIteration:
+            pass
+    return found
+
+
+def indexed(texts, find):
+    found = 0
+    for text in texts:
+        if find(text) is not None:
+            found += 1
+    return found
+
+
+def timeit(func, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    cases = [
+        ('mic starts', cell_texts('mic/*.xls'), search_starts, mic_excel._META_DICT, 'find_start'),
+        ('bel exact', cell_texts('bel/*.xls'), search_in, bel_common._META_DICT, 'find'),
+        ('bel starts', cell_texts('bel/*.xls'), search_starts, bel_common._META_DICT, 'find_start'),
+    ]
+    for name, texts, search, def_dict, method in cases:
+        index = KeywordIndex(def_dict)
+        t_old, n_old = timeit(linear, texts, search, def_dict)
+        t_new, n_new = timeit(indexed, texts, getattr(index, method))
+        assert n_old == n_new
+        print(
+            f'{name:>12}: {len(texts)} lookups, {n_new} hits | '
+            f'linear {len(texts) / t_old:12,.0f}/s | index {len(texts) / t_new:12,.0f}/s | '
+            f'{t_old / t_new:5.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
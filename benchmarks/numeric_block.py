@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark of the conversion of numeric blocks.
+
+Run from the repository root::
+
+    python -m benchmarks.numeric_block [rows]
+
+A block of whitespace separated values, one million rows of four
+columns by default, is converted to columns first with the line by line
+loop the parsers used, ``map(float, line.split())`` on each line, then
+with ``numeric_block.tokenize``, as lists, as arrays, in tolerant mode,
+and with a decimal comma.
+"""
+
+import random
+import sys
+import time
+
+from adsorption_file_parser.utils import common_utils as util
+from adsorption_file_parser.utils.numeric_block import tokenize
+
+NCOLS = 4
+
+
+def make_block(rows):
+    """A block of random values, as read from a text file."""
+    rand = random.Random(0)
+    return ''.join(
+        '\t'.join(f'{rand.uniform(0, 1000):.6E}' for _ in range(NCOLS)) + '\n'
+        for _ in range(rows)
+    )
+
+
+def line_loop(block, as_arrays=False):
+    """The former conversion: each line is split and converted in turn."""
+    rows = [list(map(float, line.split())) for line in block.splitlines() if line.strip()]
+    columns = [list(column) for column in zip(*rows)]
+    if as_arrays:
+        np = util.import_numpy()
+        columns = [np.array(column, dtype=np.float64) for column in columns]
+    return columns
+
+
+def timeit(func, *args, repeat=3, **kwargs):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    block = make_block(rows)
+    comma = block.replace('.', ',')
+    print(f'{rows:,} rows x {NCOLS} columns, {len(block) / 1e6:.0f} MB')
+
+    reference = timeit(line_loop, block)
+    cases = [
+        ('line loop, arrays', line_loop, block, {'as_arrays': True}),
+        ('tokenize, lists', tokenize, block, {'ncols': NCOLS}),
+        ('tokenize, arrays', tokenize, block, {'ncols': NCOLS, 'as_arrays': True}),
+        ('tokenize, bytes', tokenize, block.encode(), {'ncols': NCOLS}),
+        ('tokenize, tolerant', tokenize, block, {'ncols': NCOLS, 'tolerant': True}),
+        ('tokenize, decimal comma', tokenize, comma, {'ncols': NCOLS, 'decimal': ','}),
+    ]
+    print(f'{"line loop, lists":>24}: {reference:6.2f} s')
+    for name, func, data, kwargs in cases:
+        elapsed = timeit(func, data, **kwargs)
+        print(f'{name:>24}: {elapsed:6.2f} s | {reference / elapsed:4.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark parallel parsing with ``read_many`` on the tests/data corpus.
+
+Run from the repository root::
+
+    python -m benchmarks.read_many --repeat 10
+
+The corpus is repeated ``--repeat`` times to obtain a batch large enough
+to amortise the worker start-up, then parsed serially with ``read`` and
+with ``read_many`` for an increasing number of workers.
+"""
+
+import argparse
+import os
+import time
+
+import adsorption_file_parser as afp
+from benchmarks.corpus import corpus
+
+
+def run_serial(items):
+    """Parse all items one after the other."""
+    start = time.perf_counter()
+    for item in items:
+        options = item[3] if len(item) == 4 else {}
+        afp.read(item[0], item[1], item[2], **options)
+    return time.perf_counter() - start
+
+
+def run_batch(items, workers, executor):
+    """Parse all items with ``read_many``."""
+    start = time.perf_counter()
+    errors = [r for r in afp.read_many(items, workers=workers, executor=executor) if r.error]
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise RuntimeError(f'{len(errors)} files failed, first: {errors[0].error}')
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10, help='times the corpus is repeated')
+    parser.add_argument('--executor', default='process', choices=('process', 'thread'))
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    items = corpus() * args.repeat
+    print(f'{len(items)} files, {os.cpu_count()} CPUs, {args.executor} executor')
+
+    serial = run_serial(items)
+    print(f'{"serial":>10}: {serial:8.3f} s  {len(items) / serial:8.1f} files/s')
+
+    workers = 1
+    while workers <= args.max_workers:
+        elapsed = run_batch(items, workers, args.executor)
+        print(
+            f'{workers:>4} workers: {elapsed:8.3f} s  {len(items) / elapsed:8.1f} files/s  '
+            f'speedup {serial / elapsed:5.2f}x'
+        )
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
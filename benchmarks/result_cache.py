@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the persistent result cache.
+
+Run from the repository root::
+
+    python -m benchmarks.result_cache --repeat 20
+
+For each file in tests/data, times ``read`` without cache, on a cache
+miss (parse and store) and on a cache hit, in a temporary cache directory.
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+
+import adsorption_file_parser as afp
+from adsorption_file_parser.cache import configure_result_cache
+from benchmarks.corpus import corpus
+
+
+def best_time(func, *args, repeat=3, **kwargs):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20, help='runs per file, the best is kept')
+    args = parser.parse_args()
+    logging.getLogger('adsorption_file_parser').setLevel(logging.ERROR)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for item in corpus():
+            path, manufacturer, fmt = item[:3]
+            options = item[3] if len(item) == 4 else {}
+
+            configure_result_cache(None)
+            t_parse = best_time(afp.read, path, manufacturer, fmt, repeat=3, **options)
+
+            cache = configure_result_cache(tmp)
+            start = time.perf_counter()
+            afp.read(path, manufacturer, fmt, **options)
+            t_miss = time.perf_counter() - start
+            t_hit = best_time(afp.read, path, manufacturer, fmt, repeat=args.repeat, **options)
+            cache.clear()
+            rows.append((f'{manufacturer} {fmt}', path.name, t_parse, t_miss, t_hit))
+        configure_result_cache(None)
+
+    print(f'{"format":>12} {"file":>45} {"parse":>10} {"miss":>10} {"hit":>10}')
+    for fmt, name, t_parse, t_miss, t_hit in sorted(rows):
+        print(f'{fmt:>12} {name[-45:]:>45} {t_parse * 1e3:7.2f} ms {t_miss * 1e3:7.2f} ms {t_hit * 1e6:7.1f} us')
+    cheapest = min(row[2] for row in rows)
+    slowest_hit = max(row[4] for row in rows)
+    print(f'cheapest parse {cheapest * 1e3:.2f} ms, slowest hit {slowest_hit * 1e6:.1f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+"""
+Time every parser on the bundled corpus and on generated files.
+
+Run from the repository root::
+
+    python -m benchmarks run --output results.json
+    python -m benchmarks run --sizes 100,1e3,1e4,1e5,1e6 --budget 60
+    python -m benchmarks compare benchmarks/baseline.json results.json
+
+For each file, ``parse`` is timed (best of ``--repeat`` runs, and of as
+many as fit in ``--min-time`` seconds for small files) and the
+throughput is reported in points and megabytes per second. The peak
+memory allocated during a parse is measured with tracemalloc, and the
+time spent in each phase (file reader, package code, unit and date
+parsing, numeric conversions) comes from a profiled run, scaled to the
+measured time.
+
+Generated files, written by ``adsorption_file_parser.synthetic``, have
+100 to 1,000,000 points and are kept in ``--data-dir`` to be reused by
+later runs. A parser is not timed on larger files once a parse takes
+longer than ``--budget`` seconds, and the xls formats stop at the 65,000
+rows an xls sheet can hold.
+
+``compare`` flags the cases slower or using more memory than the
+baseline by more than ``--threshold``, and exits with status 1 if
+there is any. Timings depend on the machine, a baseline should be
+recorded on the machine it is compared on.
+"""
+
+import argparse
+import cProfile
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import pstats
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+
+from adsorption_file_parser import logger
+from adsorption_file_parser import synthetic
+from benchmarks.corpus import parser_files
+
+PARSERS = tuple(synthetic.WRITERS)
+DEFAULT_SIZES = (100, 1000, 10000)
+
+# phases, by the location of the code running
+_PHASE_PATHS = (
+    ('units', ('adsorption_file_parser/utils/unit_parsing', 'adsorption_file_parser/utils/date_parsing', 'dateutil/')),
+    ('parser', ('adsorption_file_parser/', )),
+    ('reader', ('xlrd/', 'openpyxl/', 'et_xmlfile/', 'xml/', 'zipfile', 'codecs', 'encodings/', '_pyio')),
+)
+# timings below these are noise, not regressions
+_MIN_TIME_DELTA = 0.5e-3
+_MIN_MEMORY_DELTA = 64 * 1024
+
+
+def best_time(func, *args, repeat=3, min_time=0.0, **kwargs):
+    """Best time of at least ``repeat`` runs, repeated until ``min_time`` is spent."""
+    best = float('inf')
+    runs = 0
+    start = time.perf_counter()
+    while runs < repeat or (time.perf_counter() - start < min_time and runs < 1000):
+        t_run = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - t_run)
+        runs += 1
+    return best
+
+
+def count_points(data):
+    """Number of points in the parsed data, the length of the longest column."""
+    return max((len(column) for column in data.values()), default=0)
+
+
+def peak_memory(parse, path, options):
+    """
+    Peak memory allocated by Python during a parse, in bytes.
+
+    The garbage collector is paused for a result independent of when
+    it runs, unreachable cycles count until the end of the parse.
+    """
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        parse(path, **options)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+
+
+def phase_fractions(parse, path, options):
+    """Fraction of the time of a profiled parse spent in each phase."""
+    profile = cProfile.Profile()
+    profile.runcall(parse, path, **options)
+    totals = {name: 0.0 for name, _ in _PHASE_PATHS}
+    totals['builtins'] = totals['other'] = 0.0
+    for (filename, _, _), (_, _, tottime, _, _) in pstats.Stats(profile).stats.items():
+        totals[_phase(filename)] += tottime
+    total = sum(totals.values()) or 1.0
+    return {name: value / total for name, value in totals.items()}
+
+
+def _phase(filename):
+    if filename == '~':  # functions implemented in C
+        return 'builtins'
+    filename = filename.replace(os.sep, '/')
+    for name, paths in _PHASE_PATHS:
+        if any(path in filename for path in paths):
+            return name
+    return 'other'
+
+
+def measure(parse, path, options, repeat=3, min_time=0.5):
+    """Time, throughput, memory and phases of parsing a file."""
+    start = time.perf_counter()
+    _, data = parse(path, **options)
+    seconds = time.perf_counter() - start
+    # slow files are not worth repeating
+    if seconds < 1:
+        seconds = min(seconds, best_time(parse, path, repeat=repeat, min_time=min_time, **options))
+
+    points = count_points(data)
+    size = os.path.getsize(path)
+    phases = phase_fractions(parse, path, options)
+    return {
+        'points': points,
+        'bytes': size,
+        'seconds': seconds,
+        'points_per_s': points / seconds,
+        'mb_per_s': size / seconds / 1e6,
+        'peak_bytes': peak_memory(parse, path, options),
+        'phases': {name: fraction * seconds for name, fraction in phases.items()},
+    }
+
+
+def synthetic_file(parser, points, directory):
+    """Return a generated file for a parser, writing it if needed."""
+    writer, ext, _ = synthetic.WRITERS[parser]
+    path = os.path.join(directory, f'{parser}-{points}{ext}')
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp{ext}'
+        writer(tmp, points)
+        os.replace(tmp, path)
+    return path
+
+
+def run(parsers=PARSERS, sizes=DEFAULT_SIZES, bundled=True, repeat=3, min_time=0.5, budget=10.0, directory=None):
+    """
+    Run the benchmarks, each parser in a new process.
+
+    Parameters
+    ----------
+    parsers : iterable
+        Names of the parser modules to time.
+    sizes : iterable
+        Number of points of the generated files.
+    bundled : bool
+        Whether to time the files in tests/data.
+    repeat : int
+        Minimum runs per file, the best time is kept.
+    min_time : float
+        Minimum time in seconds spent timing each file.
+    budget : float
+        Time in seconds after which larger files are skipped.
+    directory : str, optional
+        Where generated files are kept, a temporary directory by default.
+
+    Returns
+    -------
+    dict
+        The environment, results by case and skipped cases.
+    """
+    if directory is None:
+        directory = os.path.join(tempfile.gettempdir(), 'adsorption_file_parser_benchmarks')
+    files = parser_files() if bundled else {}
+    results = {}
+    skipped = {}
+
+    # a new process per parser keeps the results independent of the
+    # modules, caches and garbage left by the parsers timed before
+    context = multiprocessing.get_context('spawn')
+    for parser in parsers:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            future = executor.submit(
+                run_parser, parser, files.get(parser, []), sizes, repeat, min_time, budget, directory
+            )
+            parser_results, parser_skipped = future.result()
+        results.update(parser_results)
+        skipped.update(parser_skipped)
+
+    return {'environment': environment(), 'results': results, 'skipped': skipped}
+
+
+def run_parser(parser, files, sizes, repeat, min_time, budget, directory):
+    """Time a parser on the given files and on generated files, see ``run``."""
+    logger.setLevel('ERROR')
+    parse = import_module(f'adsorption_file_parser.{parser}').parse
+    results = {}
+    skipped = {}
+
+    for path, options in files:
+        case = f'{parser}/{path.name}'
+        results[case] = dict(measure(parse, path, options, repeat, min_time), parser=parser, source='bundled')
+        print(format_result(case, results[case]), flush=True)
+
+    max_points = synthetic.WRITERS[parser][2]
+    too_slow = None
+    for points in sorted(sizes):
+        case = f'{parser}/synthetic-{points}'
+        if max_points is not None and points > max_points:
+            skipped[case] = f'over the {max_points} points of the format'
+        elif too_slow is not None:
+            skipped[case] = f'{too_slow} took longer than the {budget} s budget'
+        else:
+            path = synthetic_file(parser, points, directory)
+            results[case] = dict(measure(parse, path, {}, repeat, min_time), parser=parser, source='synthetic')
+            print(format_result(case, results[case]), flush=True)
+            if results[case]['seconds'] > budget:
+                too_slow = case
+            continue
+        print(f'{case:>52}  skipped, {skipped[case]}', flush=True)
+
+    return results, skipped
+
+
+def environment():
+    """Description of the machine and versions the results were obtained with."""
+    from adsorption_file_parser import __version__
+    return {
+        'package': __version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def format_result(case, result):
+    phases = ' '.join(f'{name} {value * 1e3:.1f}' for name, value in result['phases'].items() if value >= 0.05 * result['seconds'])
+    return (
+        f'{case:>52} {result["points"]:8d} pts {result["seconds"] * 1e3:10.2f} ms '
+        f'{result["points_per_s"]:11.0f} pts/s {result["mb_per_s"]:7.2f} MB/s '
+        f'{result["peak_bytes"] / 1e6:8.2f} MB peak  [{phases} ms]'
+    )
+
+
+def compare(baseline, current, threshold=0.2, log=print):
+    """
+    Compare results with a baseline.
+
+    Parameters
+    ----------
+    baseline : dict
+        Results of ``run``.
+    current : dict
+        Results of ``run``.
+    threshold : float
+        Relative increase of time or peak memory counted as a regression.
+    log : callable
+        Called with a line of text for each case.
+
+    Returns
+    -------
+    list
+        Descriptions of the regressions.
+    """
+    regressions = []
+    old_results = baseline['results']
+    for case, new in current['results'].items():
+        old = old_results.get(case)
+        if old is None:
+            continue
+        time_ratio = new['seconds'] / old['seconds']
+        memory_ratio = new['peak_bytes'] / old['peak_bytes'] if old['peak_bytes'] else 1.0
+        flags = []
+        if time_ratio > 1 + threshold and new['seconds'] - old['seconds'] > _MIN_TIME_DELTA:
+            flags.append(f'time x{time_ratio:.2f}')
+        if memory_ratio > 1 + threshold and new['peak_bytes'] - old['peak_bytes'] > _MIN_MEMORY_DELTA:
+            flags.append(f'memory x{memory_ratio:.2f}')
+        if flags:
+            regressions.append(f'{case}: {", ".join(flags)}')
+        log(
+            f'{case:>52} {old["seconds"] * 1e3:10.2f} -> {new["seconds"] * 1e3:10.2f} ms (x{time_ratio:5.2f}) '
+            f'{old["peak_bytes"] / 1e6:8.2f} -> {new["peak_bytes"] / 1e6:8.2f} MB (x{memory_ratio:5.2f})'
+            f'{"  REGRESSION" if flags else ""}'
+        )
+    for case in sorted(set(old_results) - set(current['results'])):
+        log(f'{case:>52}  not in the current results')
+    return regressions
+
+
+def _sizes(text):
+    return tuple(int(float(size)) for size in text.split(','))
+
+
+def _parsers(text):
+    names = tuple(text.split(','))
+    unknown = set(names) - set(PARSERS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f'unknown parsers {sorted(unknown)}, choose from {PARSERS}')
+    return names
+
+
+def _load(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_command = commands.add_parser('run', help='run the benchmarks')
+    run_command.add_argument('--parsers', type=_parsers, default=PARSERS, help='comma separated parser modules')
+    run_command.add_argument('--sizes', type=_sizes, default=DEFAULT_SIZES, help='points of the generated files, e.g. 100,1e3,1e6')
+    run_command.add_argument('--no-bundled', action='store_true', help='skip the files in tests/data')
+    run_command.add_argument('--repeat', type=int, default=3, help='minimum runs per file, the best is kept')
+    run_command.add_argument('--min-time', type=float, default=0.5, help='minimum seconds spent timing each file')
+    run_command.add_argument('--budget', type=float, default=10.0, help='seconds per parse before larger files are skipped')
+    run_command.add_argument('--data-dir', help='where generated files are kept')
+    run_command.add_argument('--output', help='write the results to this JSON file')
+    run_command.add_argument('--compare', metavar='BASELINE', help='compare the results with this JSON file')
+    run_command.add_argument('--threshold', type=float, default=0.2, help='relative slowdown flagged as a regression')
+
+    compare_parser = commands.add_parser('compare', help='compare results with a baseline')
+    compare_parser.add_argument('baseline', help='JSON file of the baseline results')
+    compare_parser.add_argument('current', help='JSON file of the current results')
+    compare_parser.add_argument('--threshold', type=float, default=0.2, help='relative slowdown flagged as a regression')
+
+    args = parser.parse_args(argv)
+    logger.setLevel('ERROR')
+
+    if args.command == 'run':
+        current = run(
+            parsers=args.parsers,
+            sizes=args.sizes,
+            bundled=not args.no_bundled,
+            repeat=args.repeat,
+            min_time=args.min_time,
+            budget=args.budget,
+            directory=args.data_dir,
+        )
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                json.dump(current, file, indent=2)
+        if not args.compare:
+            return
+        baseline = _load(args.compare)
+    else:
+        baseline = _load(args.baseline)
+        current = _load(args.current)
+
+    regressions = compare(baseline, current, threshold=args.threshold)
+    if regressions:
+        print(f'{len(regressions)} regressions:')
+        for regression in regressions:
+            print(f'  {regression}')
+        sys.exit(1)
+    print('No regressions.')
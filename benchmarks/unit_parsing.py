@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the memoised unit string parsers.
+
+Run from the repository root::
+
+    python -m benchmarks.unit_parsing --repeat 1000
+
+The unit strings are collected by parsing every file in tests/data, then
+parsed ``--repeat`` times with the memoised functions and with the
+original uncached code path (regex cleanup, no memoisation).
+"""
+
+import argparse
+import logging
+import time
+
+import adsorption_file_parser as afp
+from adsorption_file_parser.utils import unit_parsing
+from benchmarks.corpus import corpus
+
+PARSERS = ('parse_loading_string', 'parse_pressure_string', 'parse_temperature_string')
+
+
+def collect_unit_strings():
+    """Record the arguments of the unit parsers while reading the corpus."""
+    found = {name: [] for name in PARSERS}
+    originals = {name: getattr(unit_parsing, name) for name in PARSERS}
+
+    def recorder(name):
+        def record(string, *args, **kwargs):
+            found[name].append(string)
+            return originals[name](string, *args, **kwargs)
+
+        return record
+
+    try:
+        for name in PARSERS:
+            setattr(unit_parsing, name, recorder(name))
+        for item in corpus():
+            options = item[3] if len(item) == 4 else {}
+            afp.read(item[0], item[1], item[2], **options)
+    finally:
+        for name, func in originals.items():
+            setattr(unit_parsing, name, func)
+    return found
+
+
+def uncached(name, string):
+    """The unit parsers without memoisation, with the regex cleanup."""
+    clean_unit_string = unit_parsing.clean_unit_string
+    unit_parsing.clean_unit_string = lambda text: unit_parsing.clean_string(text, unit_parsing.pre_proc_sub)
+    try:
+        if name == 'parse_loading_string':
+            return unit_parsing._parse_loading_string.__wrapped__(string)
+        return getattr(unit_parsing, name).__wrapped__(string)
+    finally:
+        unit_parsing.clean_unit_string = clean_unit_string
+
+
+def timed(func, strings, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for string in strings:
+            func(string)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=1000, help='times each string is parsed')
+    args = parser.parse_args()
+    logging.getLogger('adsorption_file_parser').setLevel(logging.ERROR)
+
+    found = collect_unit_strings()
+    unit_parsing.unit_cache_clear()
+    for name, strings in found.items():
+        if not strings:
+            continue
+        t_cached = timed(getattr(unit_parsing, name), strings, args.repeat)
+        t_uncached = timed(lambda s, name=name: uncached(name, s), strings, args.repeat)
+        calls = len(strings) * args.repeat
+        print(
+            f'{name:>26}: {len(strings):4d} strings, {len(set(strings)):3d} distinct  '
+            f'uncached {t_uncached / calls * 1e6:7.2f} us  cached {t_cached / calls * 1e6:7.2f} us  '
+            f'speedup {t_uncached / t_cached:6.1f}x'
+        )
+    for name, info in unit_parsing.unit_cache_info().items():
+        print(f'{name:>26}: {info}')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@
 # isort:skip_file
 import logging
 import sys
+import time
 
 logger = logging.getLogger('adsorption_file_parser')
 logger.setLevel(logging.DEBUG)
@@ -15,34 +16,40 @@ ch.setLevel(logging.INFO)
 # add the handlers to the logger
 logger.addHandler(ch)
 
-# Solve version shenanigans on conda-build
-try:
-    # -- Distribution mode --
-    # import from _version.py generated by setuptools_scm during release
-    from ._version import __version__
-except ImportError:
-    # -- Source mode --
-    # use setuptools_scm to get the current version from src using git
-    from setuptools_scm import get_version as _gv
-    from os import path as _path
-    __version__ = _gv(_path.join(_path.dirname(__file__), _path.pardir))
+
+def __getattr__(name):
+    """Resolve the version, which may require setuptools_scm and git, and the asyncio API lazily."""
+    if name == '__version__':
+        global __version__
+        __version__ = _get_version()
+        return __version__
+    if name in ('aread', 'aread_many'):
+        # asyncio is only imported by applications using it
+        from . import aio
+        return getattr(aio, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _get_version():
+    # Solve version shenanigans on conda-build
+    try:
+        # -- Distribution mode --
+        # import from _version.py generated by setuptools_scm during release
+        from ._version import __version__ as version
+    except ImportError:
+        # -- Source mode --
+        # use setuptools_scm to get the current version from src using git
+        from setuptools_scm import get_version as _gv
+        from os import path as _path
+        version = _gv(_path.join(_path.dirname(__file__), _path.pardir))
+    return version
 
 
 class ParsingError(Exception):
     """Raised when parsing fails."""
 
 
-_SUPPORTED_FORMATS = {
-    'smsdvs': ('xlsx', ),
-    'bel': ('csv', 'xl', 'dat'),
-    'mic': ('xl', ),
-    '3p': ('xl'),  # 'jwgbt'),
-    'qnt': ('txt-raw', ),
-    'generic': ('csv', 'xls'),
-}
-
-
-def read(path, manufacturer, fmt, **options):
+def read(path, manufacturer=None, fmt=None, **options):
     """
     Parse a file generated by commercial apparatus.
 
@@ -50,10 +57,19 @@ def read(path, manufacturer, fmt, **options):
     ----------
     path: str
         the location of the file.
-    manufacturer : {'mic', 'bel', '3p'}
-        Manufacturer of the apparatus.
-    fmt : {'xl', 'txt', ...}
-        The format of the import for the isotherm.
+    manufacturer : {'mic', 'bel', '3p', ...}, optional
+        Manufacturer of the apparatus. If not given, it is
+        detected from the content of the file. All available
+        parsers are listed by ``registry.supported_formats()``.
+    fmt : {'xl', 'txt', ...}, optional
+        The format of the import for the isotherm. If not given, it is
+        detected from the content of the file, together with the
+        ``lang`` of BEL files.
+    options :
+        Parser-specific options, e.g. ``lang`` for BEL files.
+        All built-in parsers accept ``as_arrays=True`` to return data columns as
+        numpy float64 arrays (and the branch column as int8) instead of
+        lists. This requires numpy to be installed.
 
     Returns
     -------
@@ -61,40 +77,48 @@ def read(path, manufacturer, fmt, **options):
         the metadata
     data: dict
         all available data
-    """
 
-    if manufacturer not in _SUPPORTED_FORMATS:
-        raise ParsingError(
-            f'Currently available manufacturers are {list(_SUPPORTED_FORMATS.keys())})'
-        )
-
-    if fmt not in _SUPPORTED_FORMATS[manufacturer]:
-        raise ParsingError(f'Currently available formats are {_SUPPORTED_FORMATS[manufacturer]}')
-
-    if manufacturer == 'smsdvs' and fmt == 'xlsx':
-        from .sms_dvs_excel import parse
-    elif manufacturer == 'mic' and fmt == 'xl':
-        from .mic_excel import parse
-    elif manufacturer == 'bel':
-        if fmt == 'xl':
-            from .bel_excel import parse
-        elif fmt == 'csv':
-            from .bel_csv import parse
-        elif fmt == 'dat':
-            from .bel_dat import parse
-    elif manufacturer == '3p':
-        if fmt == 'xl':
-            from .trp_excel import parse
-        elif fmt == 'jwgbt':
-            from .trp_xml import parse
-    elif manufacturer == 'qnt' and fmt == 'txt-raw':
-        from .qnt_txt import parse
-    elif manufacturer == 'generic':
-        if fmt == 'csv':
-            from .generic_csv import parse
-        elif fmt == 'xls':
-            from .generic_excel import parse
-    else:
-        raise ParsingError('Something went wrong.')
+    Notes
+    -----
+    Results can be stored on disk and reused for files with the same
+    content, see ``cache.configure_result_cache``. Files parsed are
+    recorded in the process metrics, see ``metrics``.
+    """
+    from .metrics import get_metrics
+    metrics = get_metrics()
+    if metrics is None:
+        return _read(path, manufacturer, fmt, options)
+
+    start = time.perf_counter()
+    try:
+        if manufacturer is None or fmt is None:
+            from .detect import resolve
+            manufacturer, fmt, options = resolve(path, manufacturer, fmt, options)
+        meta, data = _read(path, manufacturer, fmt, options)
+    except Exception:
+        metrics.record_read(manufacturer, fmt, 'error', time.perf_counter() - start, path)
+        raise
+    metrics.record_read(manufacturer, fmt, 'ok', time.perf_counter() - start, path, data)
+    return meta, data
+
+
+def _read(path, manufacturer, fmt, options):
+    """Parse a file, without recording it in the metrics."""
+    if manufacturer is None or fmt is None:
+        from .detect import resolve
+        manufacturer, fmt, options = resolve(path, manufacturer, fmt, options)
+
+    from .registry import get_parser
+    spec = get_parser(manufacturer, fmt)
+    parse = spec.load()
+
+    from .cache import get_result_cache
+    cache = get_result_cache()
+    if cache is not None:
+        return cache.read(path, f'{manufacturer}:{fmt}:{parse.__module__}.{parse.__qualname__}', options, parse)
 
     return parse(path, **options)
+
+
+from .batch import read_many
+from .detect import detect_format
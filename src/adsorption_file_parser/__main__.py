@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""Run the command line tool, see ``python -m adsorption_file_parser --help``."""
+
+import sys
+
+from adsorption_file_parser.cli import main
+
+sys.exit(main())
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Parse files from asyncio code.
+
+``aread`` and ``aread_many`` are the coroutine counterparts of ``read``
+and ``read_many``. Detection, file reading and parsing all run in an
+executor, so that the event loop keeps serving other tasks meanwhile.
+The parsers themselves are the same.
+
+A coroutine which is cancelled or times out stops waiting for its file
+at once. A file which is waiting for a worker is not parsed at all, but
+one which is already being parsed runs to the end in its worker, as
+threads and worker processes cannot be interrupted.
+"""
+
+import asyncio
+import functools
+import os
+
+from adsorption_file_parser import ParsingError
+from adsorption_file_parser.batch import BatchResult
+from adsorption_file_parser.batch import _file_size
+from adsorption_file_parser.batch import _normalise_item
+from adsorption_file_parser.batch import _read_one
+from adsorption_file_parser.batch import _record_result
+
+_EXECUTORS = ('process', 'thread')
+
+
+async def aread(path, manufacturer=None, fmt=None, executor=None, timeout=None, **options):
+    """
+    Parse a file generated by commercial apparatus, without blocking the event loop.
+
+    Parameters
+    ----------
+    path : str
+        The location of the file.
+    manufacturer : str, optional
+        Manufacturer of the apparatus, detected if not given.
+    fmt : str, optional
+        The format of the file, detected if not given.
+    executor : concurrent.futures.Executor, optional
+        Executor running the parsing, by default the thread
+        pool of the event loop. A ``ProcessPoolExecutor`` avoids
+        holding the GIL of the event loop thread while parsing.
+    timeout : float, optional
+        Seconds to wait for the result.
+    options :
+        Parser-specific options, as for ``read``.
+
+    Returns
+    -------
+    meta : dict
+        The metadata.
+    data : dict
+        All available data.
+
+    Raises
+    ------
+    ParsingError
+        If the file cannot be parsed.
+    asyncio.TimeoutError
+        If the result is not available in ``timeout`` seconds.
+    """
+    from adsorption_file_parser import read
+
+    loop = asyncio.get_running_loop()
+    call = functools.partial(read, path, manufacturer, fmt, **options)
+    return await asyncio.wait_for(loop.run_in_executor(executor, call), timeout)
+
+
+async def aread_many(items, workers=None, executor='thread', limit=None, timeout=None, stats=False):
+    """
+    Parse many files generated by commercial apparatus, without blocking the event loop.
+
+    As for ``read_many``, results are yielded as soon as they are available,
+    and a file which cannot be parsed, or is not parsed in ``timeout``
+    seconds, does not stop the batch: its error is returned in the
+    corresponding result instead. Leaving the loop over the results, or
+    cancelling the task running it, cancels the files not yet parsed.
+
+    Parameters
+    ----------
+    items : iterable
+        Tuples of ``(path, manufacturer, fmt)`` or
+        ``(path, manufacturer, fmt, options)``, or paths, see ``read_many``.
+    workers : int, optional
+        Number of workers of the pool created for the batch,
+        defaults to the number of CPUs.
+    executor : {'thread', 'process'} or concurrent.futures.Executor
+        Type of worker pool to create for the batch, or an
+        existing executor, which is left running afterwards.
+    limit : int, optional
+        Maximum number of files submitted to the executor at once,
+        by default the number of workers.
+    timeout : float, optional
+        Seconds to wait for each file, from its submission.
+    stats : bool, optional
+        Collect the time and work counters of each file, as ``read_many``.
+
+    Yields
+    ------
+    BatchResult
+        The index, file details, ``meta``, ``data`` and ``error`` of each file.
+    """
+    jobs = [_normalise_item(index, item) for index, item in enumerate(items)]
+    jobs.sort(key=lambda job: _file_size(job[1]), reverse=True)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs) or 1))
+
+    if isinstance(executor, str):
+        if executor == 'process':
+            from concurrent.futures import ProcessPoolExecutor as Executor
+        elif executor == 'thread':
+            from concurrent.futures import ThreadPoolExecutor as Executor
+        else:
+            raise ParsingError(f'Executor must be one of {_EXECUTORS} or an Executor.')
+        pool = Executor(max_workers=workers)
+    else:
+        pool = executor
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(limit or workers)
+
+    async def run(job):
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(loop.run_in_executor(pool, _read_one, *job, stats), timeout)
+            except asyncio.TimeoutError:
+                index, path, manufacturer, fmt, _ = job
+                error = ParsingError(f'Could not parse {path}: timed out after {timeout} s.')
+                return BatchResult(index, path, manufacturer, fmt, None, None, error, seconds=timeout)
+
+    tasks = [asyncio.ensure_future(run(job)) for job in jobs]
+    try:
+        for task in asyncio.as_completed(tasks):
+            result = await task
+            _record_result(result)
+            yield result
+    finally:
+        # if the consumer stops early, do not parse the remaining files
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if pool is not executor:
+            pool.shutdown(wait=False)
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""Parse many files in parallel."""
+
+import os
+import time
+from collections import namedtuple
+
+from adsorption_file_parser import ParsingError
+
+BatchResult = namedtuple(
+    'BatchResult',
+    ['index', 'path', 'manufacturer', 'fmt', 'meta', 'data', 'error', 'stats', 'seconds'],
+    defaults=(None, None),
+)
+BatchResult.__doc__ = """
+Outcome of parsing one file in a batch.
+
+``index`` is the position of the file in the original ``items``.
+If parsing failed, ``meta`` and ``data`` are None and ``error``
+holds the corresponding ``ParsingError``. ``stats`` holds the
+``ParseStats`` of the file, if they were collected, and ``seconds``
+the time taken to parse it.
+"""
+
+_EXECUTORS = ('process', 'thread')
+
+
+def read_many(items, workers=None, executor='process', stats=False):
+    """
+    Parse many files generated by commercial apparatus in parallel.
+
+    Files are submitted largest first so that big files do not end up
+    running alone at the end of the batch. Results are yielded as soon as
+    they are available, therefore not necessarily in the order of ``items``.
+    A file which cannot be parsed does not stop the batch: its error is
+    returned in the corresponding result instead. Results are recorded in
+    the metrics of the calling process, see ``metrics``.
+
+    When using the process executor on platforms which spawn new
+    interpreters (Windows, macOS), the calling code must be guarded by
+    ``if __name__ == '__main__':``.
+
+    Parameters
+    ----------
+    items : iterable
+        Tuples of ``(path, manufacturer, fmt)`` or
+        ``(path, manufacturer, fmt, options)``, where ``options``
+        is a dictionary of extra arguments passed to ``read``.
+        A path on its own, or None for the manufacturer and format,
+        means that they are detected from the file.
+    workers : int, optional
+        Number of parallel workers, defaults to the number of CPUs.
+    executor : {'process', 'thread'}
+        Type of worker pool to use. Threads are only useful if the
+        parsing is dominated by I/O.
+    stats : bool, optional
+        Collect the time and work counters of each file, see
+        ``utils.instrumentation``, summed by ``aggregate``.
+
+    Yields
+    ------
+    BatchResult
+        The index, file details, ``meta``, ``data`` and ``error`` of each file.
+    """
+    if executor == 'process':
+        from concurrent.futures import ProcessPoolExecutor as Executor
+    elif executor == 'thread':
+        from concurrent.futures import ThreadPoolExecutor as Executor
+    else:
+        raise ParsingError(f'Executor must be one of {_EXECUTORS}.')
+
+    from concurrent.futures import as_completed
+
+    jobs = [_normalise_item(index, item) for index, item in enumerate(items)]
+    jobs.sort(key=lambda job: _file_size(job[1]), reverse=True)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs) or 1))
+
+    pool = Executor(max_workers=workers)
+    futures = []
+    try:
+        futures = [pool.submit(_read_one, *job, stats) for job in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            _record_result(result)
+            yield result
+    finally:
+        # if the consumer stops early, do not parse the remaining files
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+def _normalise_item(index, item):
+    """Check a batch item and expand it to a full job tuple."""
+    if isinstance(item, (str, os.PathLike)):
+        return index, item, None, None, {}
+    if len(item) == 3:
+        path, manufacturer, fmt = item
+        options = {}
+    elif len(item) == 4:
+        path, manufacturer, fmt, options = item
+        options = options or {}
+    else:
+        raise ParsingError(
+            'Batch items must be (path, manufacturer, fmt) '
+            f'or (path, manufacturer, fmt, options), got {item!r}.'
+        )
+    return index, path, manufacturer, fmt, options
+
+
+def _file_size(path):
+    """File size used for scheduling, missing files go last."""
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError, ValueError):
+        return 0
+
+
+def _read_one(index, path, manufacturer, fmt, options, stats=False):
+    """Parse a single file, capturing any error (runs in the worker)."""
+    if stats:
+        from adsorption_file_parser.utils.instrumentation import collect
+        with collect() as collected:
+            result = _read_one(index, path, manufacturer, fmt, options)
+        return result._replace(stats=collected)
+
+    # recorded in the metrics by the calling process, from the result
+    from adsorption_file_parser import _read
+    from adsorption_file_parser.detect import resolve
+
+    start = time.perf_counter()
+    try:
+        manufacturer, fmt, options = resolve(path, manufacturer, fmt, options)
+        meta, data = _read(path, manufacturer, fmt, options)
+    except ParsingError as err:
+        return BatchResult(index, path, manufacturer, fmt, None, None, err, seconds=time.perf_counter() - start)
+    except Exception as err:  # pylint: disable=broad-except
+        # parsers may fail in many ways on malformed files,
+        # these are reported uniformly as a ParsingError
+        error = ParsingError(f'Could not parse {path}: {type(err).__name__}: {err}')
+        return BatchResult(index, path, manufacturer, fmt, None, None, error, seconds=time.perf_counter() - start)
+    return BatchResult(index, path, manufacturer, fmt, meta, data, None, seconds=time.perf_counter() - start)
+
+
+def _record_result(result):
+    """Record a result in the process metrics, if enabled."""
+    from adsorption_file_parser.metrics import get_metrics
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.record_result(result)
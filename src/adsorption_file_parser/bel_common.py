@@ -1,11 +1,10 @@
 # -*- coding: utf-8 -*-
 """Common BEL file utilities."""
 
-import dateutil.parser
-
-import adsorption_file_parser.utils.common_utils as util
 from adsorption_file_parser import logger
 from adsorption_file_parser.utils import unit_parsing
+from adsorption_file_parser.utils.date_parsing import parse_date
+from adsorption_file_parser.utils.keyword_index import KeywordIndex
 
 _META_DICT = {
     'material': {
@@ -116,6 +115,9 @@ _DATA_DICT = {
     },
 }
 
+_META_INDEX = KeywordIndex(_META_DICT)
+_DATA_INDEX = KeywordIndex(_DATA_DICT)
+
 
 def _parse_header(header_split):
     """Parse an adsorption/desorption header to get columns and units."""
@@ -123,10 +125,8 @@ def _parse_header(header_split):
     units = {}
 
     for h in header_split:
-        try:
-            text = h.replace(' ', '').lower()
-            header = util.search_key_starts_def_dict(text, _DATA_DICT)
-        except StopIteration:
+        header = _DATA_INDEX.find_start(h.replace(' ', '').lower())
+        if header is None:
             header = h
 
         headers.append(header)
@@ -149,7 +149,7 @@ def _parse_header(header_split):
 
 
 def _handle_bel_date(text):
-    return dateutil.parser.parse(text, yearfirst=True).isoformat()
+    return parse_date(text, yearfirst=True)
 
 
 def _check(meta, data, path):
@@ -159,7 +159,7 @@ def _check(meta, data, path):
     Also logs a warning for errors found in file.
     """
     if 'loading' in data:
-        empties = (k for k, v in data.items() if not v)
+        empties = (k for k, v in data.items() if len(v) == 0)
         for empty in empties:
             logger.info(f'No data collected for {empty} in file {path}.')
     if 'errors' in meta:
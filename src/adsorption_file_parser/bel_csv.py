@@ -3,12 +3,15 @@
 
 from adsorption_file_parser import ParsingError
 from adsorption_file_parser.bel_common import _META_DICT
+from adsorption_file_parser.bel_common import _META_INDEX
 from adsorption_file_parser.bel_common import _handle_bel_date
 from adsorption_file_parser.bel_common import _parse_header
 from adsorption_file_parser.utils import common_utils as util
+from adsorption_file_parser.utils import instrumentation
 
 
-def parse(path, separator=',', lang='ENG') -> "tuple[dict, dict]":
+@instrumentation.instrumented
+def parse(path, separator=',', lang='ENG', as_arrays=False, tolerant=False, decimal='.') -> "tuple[dict, dict]":
     """
     Get the isotherm and sample data from a BEL Japan .csv file.
 
@@ -20,6 +23,14 @@ def parse(path, separator=',', lang='ENG') -> "tuple[dict, dict]":
         CSV separator
     lang : str
         Language encoding of the file, either 'ENG' or 'JPN'.
+    as_arrays : bool, optional
+        Return data columns as numpy arrays instead of lists.
+    tolerant : bool, optional
+        Read data values which cannot be converted as NaN, listing
+        their location in ``meta['data_errors']``, instead of raising.
+    decimal : str, optional
+        Decimal mark of the numbers, ``','`` for files written in
+        some locales, with another ``separator``.
 
     Returns
     -------
@@ -39,36 +50,39 @@ def parse(path, separator=',', lang='ENG') -> "tuple[dict, dict]":
 
     meta = {}
     head = []
-    data = []
+    lines = []
+    branches = []
 
-    # local for efficiency
-    meta_dict = _META_DICT.copy()
+    # keys already found are removed from the index
+    meta_index = _META_INDEX.copy()
 
     with open(path, 'r', encoding=encoding) as file:
+        instrumentation.mark('metadata')
         for line in file:
+            instrumentation.count('lines')
             values = line.strip().split(sep=separator)
             nvalues = len(values)
 
-            if not line.startswith('No,') and nvalues > 1:  # key value section
+            if not line.startswith('No' + separator) and nvalues > 1:  # key value section
                 text, val = values[0], values[1]
                 text = text.strip().lower()
-                try:  # find the standard name in the metadata dictionary
-                    key = util.search_key_in_def_dict(text, meta_dict)
-                except StopIteration:  # Store unknown as is
+                # find the standard name in the metadata dictionary
+                key = meta_index.find(text)
+                if key is None:  # Store unknown as is
                     key = text.replace(' ', '_')
                     if nvalues > 2:
                         val = val + ' ' + values[2].strip('[]')
                     meta[key] = val
                     continue
 
-                if nvalues > 2 and meta_dict[key].get('unit'):
-                    meta[meta_dict[key]['unit']] = values[2].strip('[]')
-                tp = meta_dict[key]['type']
+                if nvalues > 2 and _META_DICT[key].get('unit'):
+                    meta[_META_DICT[key]['unit']] = values[2].strip('[]')
+                tp = _META_DICT[key]['type']
 
                 if val == '':
                     meta[key] = None
                 elif tp == 'numeric':
-                    meta[key] = util.handle_string_numeric(val)
+                    meta[key] = util.handle_string_numeric(val.replace(decimal, '.'))
                 elif tp == 'string':
                     meta[key] = val
                 elif tp in ['date', 'datetime']:
@@ -78,25 +92,28 @@ def parse(path, separator=',', lang='ENG') -> "tuple[dict, dict]":
                 elif tp == 'timedelta':
                     meta[key] = val
 
-                del meta_dict[key]  # delete for efficiency
+                meta_index.remove(key)
 
-            elif line.startswith('No,'):  # If "data" section
+            elif line.startswith('No' + separator):  # If "data" section
 
                 header_list = line.replace('"', '').split(separator)
-                head, units = _parse_header(header_list)  # header
+                with instrumentation.phase('header'):
+                    head, units = _parse_header(header_list)  # header
                 meta.update(units)
                 file.readline()  # ADS - discard
 
                 # read "adsorption" section
                 line = file.readline()  # first ads line
                 while not line.startswith('DES'):
-                    data.append([0] + list(map(float, line.split(separator))))
+                    lines.append(line)
                     line = file.readline()
+                branches.append(len(lines))
 
                 line = file.readline()  # first des line
                 while line:
-                    data.append([1] + list(map(float, line.split(separator))))
+                    lines.append(line)
                     line = file.readline()
+                branches.append(len(lines) - branches[0])
 
     # Format extra metadata
     meta['apparatus'] = 'BEL ' + meta['serialnumber']
@@ -104,6 +121,11 @@ def parse(path, separator=',', lang='ENG') -> "tuple[dict, dict]":
         meta['material'] = meta['file_name']
 
     # Prepare data
-    data = dict(zip(head, map(lambda *x: list(x), *data)))
+    instrumentation.mark('data')
+    instrumentation.count('lines', len(lines))
+    errors = [] if tolerant else None
+    data = util.pack_lines(head, lines, branches, separator=separator, decimal=decimal, as_arrays=as_arrays, errors=errors)
+    if tolerant:
+        meta['data_errors'] = errors
 
     return meta, data
@@ -3,13 +3,16 @@
 
 from adsorption_file_parser import ParsingError
 from adsorption_file_parser.bel_common import _META_DICT
+from adsorption_file_parser.bel_common import _META_INDEX
 from adsorption_file_parser.bel_common import _handle_bel_date
 from adsorption_file_parser.bel_common import _parse_header
 from adsorption_file_parser.utils import common_utils as util
+from adsorption_file_parser.utils import instrumentation
 from adsorption_file_parser.utils import unit_parsing
 
 
-def parse(path, lang='ENG') -> "tuple[dict, dict]":
+@instrumentation.instrumented
+def parse(path, lang='ENG', as_arrays=False, tolerant=False) -> "tuple[dict, dict]":
     """
     Get the isotherm and sample data from a BEL Japan .dat file.
 
@@ -19,6 +22,11 @@ def parse(path, lang='ENG') -> "tuple[dict, dict]":
         Path to the file to be read.
     lang : str
         Language encoding of the file, either 'ENG' or 'JPN'.
+    as_arrays : bool, optional
+        Return data columns as numpy arrays instead of lists.
+    tolerant : bool, optional
+        Read data values which cannot be converted as NaN, listing
+        their location in ``meta['data_errors']``, instead of raising.
 
     Returns
     -------
@@ -28,87 +36,48 @@ def parse(path, lang='ENG') -> "tuple[dict, dict]":
         Isotherm data.
     """
 
-    # set encoding
-    if lang == 'ENG':
-        encoding = 'cp1252'
-    elif lang == 'JPN':
-        encoding = 'shift_jis'
-    else:
-        raise ParsingError("Unknown language/encoding option.")
+    encoding = _encoding(lang)
 
     meta = {}
     head = []
-    data = []
+    spans = []
 
-    # local for efficiency
-    meta_dict = _META_DICT.copy()
+    # keys already found are removed from the index
+    meta_index = _META_INDEX.copy()
 
-    with open(path, 'r', encoding=encoding) as file:
-        for line in file:
+    # only metadata lines are decoded, data blocks are located
+    # by their offsets and converted from bytes at the end
+    with util.map_file(path) as buffer:
+        instrumentation.mark('metadata')
+        size = len(buffer)
+        pos = 0
+        while pos < size:
+            line, pos = util.read_line(buffer, pos)
+            line = line.decode(encoding)
             values = line.strip().split(sep='\t')
             nvalues = len(values)
 
             if nvalues == 2:  # If value pair
-                text, val = [v.strip('"').replace(',', ' ') for v in values]
-                text = text.lower()
-                try:  # find the standard name in the metadata dictionary
-                    key = util.search_key_starts_def_dict(text, meta_dict)
-                except StopIteration:  # Store unknown as is
-                    key, unit = _handle_bel_dat_string_units(text)
-                    if unit:
-                        val = val + ' ' + unit
-                    meta[key] = val
-                    continue
-
-                tp = meta_dict[key]['type']
-                unit_key = meta_dict[key].get('unit')
-                del meta_dict[key]  # delete for efficiency
-
-                if val == '':
-                    meta[key] = None
-                elif tp == 'numeric':
-                    meta[key] = util.handle_string_numeric(val)
-                elif tp == 'string':
-                    meta[key] = val
-                elif tp in ['date', 'datetime']:
-                    meta[key] = _handle_bel_date(val)
-                elif tp == 'time':
-                    meta[key] = val
-                elif tp == 'timedelta':
-                    meta[key] = val
-
-                if unit_key:
-                    text, unit = _handle_bel_dat_string_units(text)
-                    if key == 'temperature':
-                        meta[unit_key] = unit_parsing.parse_temperature_unit(unit)
-                    else:
-                        meta[unit_key] = unit
+                _read_meta_line(values, meta, meta_index)
 
             elif nvalues < 2:  # If "section title"
                 title = values[0].strip().lower()
 
                 # read "adsorption" section
                 if title in ['adsorption data', '吸着データ']:
-                    file.readline()  # ====== - discard
-                    header_line = file.readline().rstrip()  # header
-                    header_list = header_line.replace('"', '').split('\t')
-                    head, units = _parse_header(header_list)  # header
+                    _, pos = util.read_line(buffer, pos)  # ====== - discard
+                    header_line, pos = util.read_line(buffer, pos)  # header
+                    header_list = header_line.decode(encoding).rstrip().replace('"', '').split('\t')
+                    with instrumentation.phase('header'):
+                        head, units = _parse_header(header_list)  # header
                     meta.update(units)
-
-                    line = file.readline()  # first ads line
-                    while not line.startswith('0'):
-                        data.append([0] + list(map(float, line.split())))
-                        line = file.readline()
+                    pos = _read_block(buffer, pos, spans)
 
                 # read "desorption" section
                 elif title in ['desorption data', '脱着データ']:
-                    file.readline()  # ====== - discard
-                    file.readline()  # header - discard
-
-                    line = file.readline()  # first des line
-                    while not line.startswith('0'):
-                        data.append([1] + list(map(float, line.split())))
-                        line = file.readline()
+                    _, pos = util.read_line(buffer, pos)  # ====== - discard
+                    _, pos = util.read_line(buffer, pos)  # header - discard
+                    pos = _read_block(buffer, pos, spans)
 
                 else:  # other section titles
                     continue
@@ -116,15 +85,205 @@ def parse(path, lang='ENG') -> "tuple[dict, dict]":
             else:
                 raise ParsingError(f'Unknown line format: {line}')
 
+        # Prepare data
+        instrumentation.mark('data')
+        if instrumentation.active() is not None:
+            instrumentation.count('lines', util.count_lines(buffer))
+        errors = [] if tolerant else None
+        data = util.pack_block(head, buffer, spans, branched=True, as_arrays=as_arrays, errors=errors)
+        if tolerant:
+            meta['data_errors'] = errors
+
     # Format extra metadata
     meta['apparatus'] = 'BEL ' + meta['serialnumber']
 
-    # Prepare data
-    data = dict(zip(head, map(lambda *x: list(x), *data)))
-
     return meta, data
 
 
+class BelDatReader():
+    """
+    Incremental reader of a BEL Japan .dat file written during a measurement.
+
+    Each call to ``update`` only reads the lines appended to the file since
+    the previous call, keeping the position in the file, the metadata, the
+    header and the section being read in between. Lines which are not
+    complete yet, and sections which are not terminated, are not an error:
+    they are read once the instrument has written them.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file to be read.
+    lang : str
+        Language encoding of the file, either 'ENG' or 'JPN'.
+    as_arrays : bool, optional
+        Return data columns as numpy arrays instead of lists.
+
+    Attributes
+    ----------
+    meta : dict
+        Isotherm metadata read so far.
+    data : dict
+        All the isotherm data read so far, as returned by ``parse``
+        once the file is complete.
+    """
+
+    # states between two lines
+    _META, _RULE, _HEADER, _DATA = range(4)
+
+    def __init__(self, path, lang='ENG', as_arrays=False):
+        self.path = path
+        self.encoding = _encoding(lang)
+        self.as_arrays = as_arrays
+        self._reset()
+
+    def _reset(self):
+        self.meta = {}
+        self.data = {}
+        self.offset = 0
+        self._head = []
+        self._meta_index = _META_INDEX.copy()
+        self._state = self._META
+        self._branch = 0
+
+    def update(self):
+        """
+        Read the lines appended to the file since the previous call.
+
+        A file which became shorter was rewritten, and is read again
+        from the start.
+
+        Returns
+        -------
+        dict
+            The new data points, with their branch column. Empty if
+            no complete data line was appended.
+        """
+        with open(self.path, 'rb') as file:
+            file.seek(0, 2)
+            if file.tell() < self.offset:
+                self._reset()
+            file.seek(self.offset)
+            chunk = file.read()
+
+        # only complete lines are read, the rest is read again next time
+        end = chunk.rfind(b'\n') + 1
+        self.offset += end
+        branches = ([], [])
+
+        for line in chunk[:end].splitlines(keepends=True):
+            if self._state == self._DATA:
+                if line.startswith(b'0'):  # 0 0 0 0 0 - end of block
+                    self._state = self._META
+                elif line.strip():
+                    branches[self._branch].append(line.decode(self.encoding))
+            elif self._state == self._RULE:  # ====== - discard
+                self._state = self._HEADER
+            elif self._state == self._HEADER:
+                if self._branch == 0:
+                    header_list = line.decode(self.encoding).rstrip().replace('"', '').split('\t')
+                    self._head, units = _parse_header(header_list)
+                    self.meta.update(units)
+                self._state = self._DATA
+            else:
+                self._read_meta(line.decode(self.encoding))
+
+        if 'serialnumber' in self.meta:
+            self.meta['apparatus'] = 'BEL ' + self.meta['serialnumber']
+
+        if not any(branches):
+            return {}
+        new = util.pack_lines(self._head, branches[0] + branches[1], [len(branches[0]), len(branches[1])],
+                              as_arrays=self.as_arrays)
+        self._append(new)
+        return new
+
+    def _read_meta(self, line):
+        values = line.strip().split(sep='\t')
+        nvalues = len(values)
+        if nvalues == 2:  # If value pair
+            _read_meta_line(values, self.meta, self._meta_index)
+        elif nvalues < 2:  # If "section title"
+            title = values[0].strip().lower()
+            if title in ['adsorption data', '吸着データ']:
+                self._branch = 0
+                self._state = self._RULE
+            elif title in ['desorption data', '脱着データ']:
+                self._branch = 1
+                self._state = self._RULE
+        else:
+            raise ParsingError(f'Unknown line format: {line}')
+
+    def _append(self, new):
+        if self.as_arrays:
+            np = util.import_numpy()
+            self.data = {key: np.concatenate((self.data[key], column)) if key in self.data else column for key, column in new.items()}
+        else:
+            for key, column in new.items():
+                self.data.setdefault(key, []).extend(column)
+
+
+def _encoding(lang):
+    """Encoding of the files of an instrument language."""
+    if lang == 'ENG':
+        return 'cp1252'
+    if lang == 'JPN':
+        return 'shift_jis'
+    raise ParsingError("Unknown language/encoding option.")
+
+
+def _read_meta_line(values, meta, meta_index):
+    """Store a metadata value pair, removing known keys from the index."""
+    text, val = [v.strip('"').replace(',', ' ') for v in values]
+    text = text.lower()
+    # find the standard name in the metadata dictionary
+    key = meta_index.find_start(text)
+    if key is None:  # Store unknown as is
+        key, unit = _handle_bel_dat_string_units(text)
+        if unit:
+            val = val + ' ' + unit
+        meta[key] = val
+        return
+
+    tp = _META_DICT[key]['type']
+    unit_key = _META_DICT[key].get('unit')
+    meta_index.remove(key)
+
+    if val == '':
+        meta[key] = None
+    elif tp == 'numeric':
+        meta[key] = util.handle_string_numeric(val)
+    elif tp == 'string':
+        meta[key] = val
+    elif tp in ['date', 'datetime']:
+        meta[key] = _handle_bel_date(val)
+    elif tp == 'time':
+        meta[key] = val
+    elif tp == 'timedelta':
+        meta[key] = val
+
+    if unit_key:
+        text, unit = _handle_bel_dat_string_units(text)
+        if key == 'temperature':
+            meta[unit_key] = unit_parsing.parse_temperature_unit(unit)
+        else:
+            meta[unit_key] = unit
+
+
+def _read_block(buffer, pos, spans):
+    """Locate a data block, which ends with a line starting with 0."""
+    if buffer[pos:pos + 1] == b'0':
+        end = pos
+    else:
+        end = buffer.find(b'\n0', pos)
+        if end == -1:
+            raise ParsingError('Could not find the end of a data block.')
+        end += 1
+    spans.append((pos, end))
+    _, pos = util.read_line(buffer, end)  # 0 0 0 0 0 - discard
+    return pos
+
+
 def _handle_bel_dat_string_units(text):
     # TODO find a more elegant way of replacing JIS characters
     text = text.replace("／", "/")
@@ -1,19 +1,20 @@
 # -*- coding: utf-8 -*-
 """Parse BEL Excel(.xls) output files."""
 
-from itertools import product
-
-import xlrd
-
 from adsorption_file_parser import ParsingError
 from adsorption_file_parser.bel_common import _META_DICT
+from adsorption_file_parser.bel_common import _META_INDEX
 from adsorption_file_parser.bel_common import _check
 from adsorption_file_parser.bel_common import _parse_header
 
 from .utils import common_utils as util
+from .utils import instrumentation
+from .utils.layout_cache import xlrd_layout
+from .utils.layout_cache import xlrd_text
 
 
-def parse(path):
+@instrumentation.instrumented
+def parse(path, as_arrays=False):
     """
     Parse an xls file generated by BEL software.
 
@@ -21,6 +22,8 @@ def parse(path):
     ----------
     path: str
         Path to the file to be read.
+    as_arrays : bool, optional
+        Return data columns as numpy arrays instead of lists.
 
     Returns
     -------
@@ -29,70 +32,70 @@ def parse(path):
     data : dict
         Isotherm data.
     """
+    import xlrd
+
     meta = {}
     data = {}
 
-    # open the workbook
-    workbook = xlrd.open_workbook(path, encoding_override='latin-1')
-    sheet = workbook.sheet_by_name('AdsDes')
-
-    # local for efficiency
-    meta_dict = _META_DICT.copy()
-
-    # iterate over all cells in the notebook
-    for row, col in product(range(sheet.nrows), range(sheet.ncols)):
-
-        # check if empty
-        cell_value = sheet.cell(row, col).value
-        if not isinstance(cell_value, str) or cell_value == '':
-            continue
-
-        # check if we are in the data section
-        if cell_value != 'No':
-            cell_value = cell_value.strip().lower()
-            try:
-                key = util.search_key_in_def_dict(cell_value, meta_dict)
-            except StopIteration:
-                continue
-
-            ref = meta_dict[key]['xl_ref']
-            tp = meta_dict[key]['type']
-            unit_key = meta_dict[key].get('unit')
-
-            val = sheet.cell(row + ref[0], col + ref[1]).value
-            if val == '':
-                meta[key] = None
-            elif tp == 'numeric':
-                meta[key] = util.handle_string_numeric(val)
-            elif tp == 'string':
-                meta[key] = util.handle_excel_string(val)
-            elif tp == 'datetime':
-                meta[key] = util.handle_xlrd_datetime(val, sheet)
-            elif tp == 'date':
-                meta[key] = util.handle_xlrd_date(val, sheet)
-            elif tp == 'time':
-                meta[key] = util.handle_xlrd_time(val, sheet)
-            elif tp == 'timedelta':
-                meta[key] = _handle_bel_xl_timedelta(val)
-
-            if unit_key:
-                unit = sheet.cell(row + ref[0], col + ref[1] + 1).value.strip('[]')
-                meta[unit_key] = unit
-
-            del meta_dict[key]  # delete for efficiency
-
-        else:  # If "data" section
-
-            header_list = _get_header(sheet, row)
-            head, units = _parse_header(header_list)  # header
-            meta.update(units)
-
-            (ads_start, ads_end, des_start, des_end) = _parse_data(sheet, row, col)
-            data['branch'] = [0] * (ads_end - ads_start) + [1] * (des_end - des_start)
-            for i, item in enumerate(head[1:]):
-                ads_points = [sheet.cell(r, i).value for r in range(ads_start, ads_end)]
-                des_points = [sheet.cell(r, i).value for r in range(des_start, des_end)]
-                data[item] = ads_points + des_points
+    # open the workbook, only loading the sheet we need
+    workbook = xlrd.open_workbook(path, encoding_override='latin-1', on_demand=True)
+    try:
+        sheet = workbook.sheet_by_name('AdsDes')
+
+        # metadata and data positions, cached for files with the same layout
+        instrumentation.mark('metadata')
+        events = xlrd_layout('bel', workbook, sheet, _scan, _layout_fits)
+        found = set()
+
+        for row, col, key in events:
+
+            # check if we are in the data section
+            if key is not None:
+                if key in found:
+                    continue
+
+                ref = _META_DICT[key]['xl_ref']
+                tp = _META_DICT[key]['type']
+                unit_key = _META_DICT[key].get('unit')
+
+                val = sheet.cell_value(row + ref[0], col + ref[1])
+                if val == '':
+                    meta[key] = None
+                elif tp == 'numeric':
+                    meta[key] = util.handle_string_numeric(val)
+                elif tp == 'string':
+                    meta[key] = util.handle_excel_string(val)
+                elif tp == 'datetime':
+                    meta[key] = util.handle_xlrd_datetime(val, sheet)
+                elif tp == 'date':
+                    meta[key] = util.handle_xlrd_date(val, sheet)
+                elif tp == 'time':
+                    meta[key] = util.handle_xlrd_time(val, sheet)
+                elif tp == 'timedelta':
+                    meta[key] = _handle_bel_xl_timedelta(val)
+
+                if unit_key:
+                    unit = sheet.cell_value(row + ref[0], col + ref[1] + 1).strip('[]')
+                    meta[unit_key] = unit
+
+                found.add(key)
+
+            else:  # If "data" section
+
+                instrumentation.mark('header')
+                header_list = _get_header(sheet, row)
+                head, units = _parse_header(header_list)  # header
+                meta.update(units)
+
+                instrumentation.mark('data')
+                (ads_start, ads_end, des_start, des_end) = _parse_data(sheet, row, col)
+                data['branch'] = util.pack_branch((ads_end - ads_start, des_end - des_start), as_arrays)
+                for i, item in enumerate(head[1:]):
+                    points = sheet.col_values(i, ads_start, ads_end) + sheet.col_values(i, des_start, des_end)
+                    data[item] = util.pack_column(points, as_arrays)
+                instrumentation.mark('metadata')
+    finally:
+        workbook.release_resources()
 
     _check(meta, data, path)
 
@@ -102,46 +105,77 @@ def parse(path):
     return meta, data
 
 
+def _scan(sheet):
+    """Find the position of all metadata labels and data block headers."""
+    events = []
+
+    # keys already found are removed from the index
+    meta_index = _META_INDEX.copy()
+    data_found = False
+
+    # iterate over all text cells in the sheet, row by row
+    for row in range(sheet.nrows):
+
+        # stop if there is nothing left to find
+        if data_found and not meta_index:
+            break
+
+        for col, cell_value in util.xlrd_text_cells(sheet, row):
+
+            # check if we are in the data section
+            if cell_value != 'No':
+                key = meta_index.find(cell_value.strip().lower())
+                if key is None:
+                    continue
+                events.append([row, col, key])
+                meta_index.remove(key)
+
+            else:  # If "data" section
+
+                data_found = True
+                events.append([row, col, None])
+
+    return events
+
+
+def _layout_fits(sheet, events):
+    """Check that the cells of a cached layout hold the same labels in the sheet."""
+    for row, col, key in events:
+        text = xlrd_text(sheet, row, col)
+        if text is None:
+            return False
+        if key is None:
+            if text != 'No':
+                return False
+        elif _META_INDEX.find(text.strip().lower()) != key:
+            return False
+    return True
+
+
 def _get_header(sheet, row):
     """Return list of data headers."""
-    return [
-        sheet.cell(row, rcol).value.strip()
-        for rcol in range(sheet.ncols)
-        if sheet.cell(row, rcol).value.strip() != ''
-    ]
+    return [value.strip() for value in sheet.row_values(row) if value.strip() != '']
 
 
 def _parse_data(sheet, row, col):
     """Return start and stop points for adsorption and desorption."""
-    rowc = 1
+    values = sheet.col_values(col)
 
     # Check for adsorption branch
-    if sheet.cell(row + rowc, col).value != 'ADS':
-        raise ParsingError
-    ads_start_row = row + rowc + 1
-    ads_final_row = ads_start_row
-    point = sheet.cell(ads_final_row, col).value
-
-    while point != 'DES':
-        ads_final_row += 1
-        point = sheet.cell(ads_final_row, col).value
+    if values[row + 1] != 'ADS':
+        raise ParsingError('Could not find the adsorption branch.')
+    ads_start_row = row + 2
 
     # Check for desorption branch
-    if sheet.cell(ads_final_row, col).value != 'DES':
-        raise ParsingError
+    try:
+        ads_final_row = values.index('DES', ads_start_row)
+    except ValueError as err:
+        raise ParsingError('Could not find the desorption branch.') from err
     des_start_row = ads_final_row + 1
     des_final_row = des_start_row
 
-    if des_final_row < sheet.nrows:
-
-        point = sheet.cell(des_final_row, col).value
-
-        while str(point).strip():
-            des_final_row += 1
-            if des_final_row < sheet.nrows:
-                point = sheet.cell(des_final_row, col).value
-            else:
-                point = None
+    while des_final_row < len(values) and str(values[des_final_row]).strip():
+        des_final_row += 1
 
     return (ads_start_row, ads_final_row, des_start_row, des_final_row)
 
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent cache of parsed files.
+
+When enabled with ``configure_result_cache``, ``read`` stores the
+``(meta, data)`` of each parsed file in a cache directory, and returns
+the stored result the next time the same content is read with the same
+parser, options and package version.
+
+Entries are keyed by a hash of the file content. To avoid hashing a file
+at each read, the hash is remembered together with the size and
+modification time of the file, and only recomputed when these change.
+
+Only files are cached: other inputs, such as the text of a CSV file
+given to the generic parser, are always parsed.
+
+The cache is bounded in size, the least recently used entries and
+content hash records being removed first. The size of the directory is
+kept up to date as entries are written and checked again from time to
+time, so that eviction does not scan the directory at each parse.
+Entries are written atomically and eviction is done under a file lock,
+so several processes can share the same directory.
+
+.. warning::
+
+    Results are stored as pickles. They are loaded with an unpickler
+    which only accepts the types that parsers return (builtin types,
+    ``datetime`` objects and numpy arrays), so that an entry cannot run
+    code when loaded. Even so, anyone who can write to the cache
+    directory can change the results returned by ``read``: only use
+    a directory which is not writable by untrusted users.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+from adsorption_file_parser import logger
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, eviction is then unlocked
+    fcntl = None
+
+_ENTRY_SUFFIX = '.pickle'
+_PATH_SUFFIX = '.path'
+_HASH_CHUNK = 1 << 20
+# the directory is scanned again after this many writes, to account for
+# entries written by other processes
+_RESCAN_WRITES = 256
+# eviction removes entries down to this fraction of the maximum size,
+# so that it is not needed again at the next write
+_EVICT_TO = 0.9
+# content keys remembered by path, parser and options, least recently used
+# first, so that unchanged files are not hashed again
+_MAX_KEYS = 4096
+
+# globals which may be loaded from an entry, by module
+_SAFE_GLOBALS = {
+    'datetime': {'date', 'datetime', 'time', 'timedelta', 'timezone'},
+    'numpy': {'dtype', 'ndarray'},
+    'numpy.core.multiarray': {'_reconstruct', 'scalar'},
+    'numpy._core.multiarray': {'_reconstruct', 'scalar'},
+    'numpy.core.numeric': {'_frombuffer'},
+    'numpy._core.numeric': {'_frombuffer'},
+}
+
+
+class ResultCache():
+    """
+    Cache of parse results in a directory.
+
+    Parameters
+    ----------
+    directory : str
+        Directory where results are stored, created if needed.
+    max_size : int
+        Maximum total size of the stored results in bytes.
+    """
+    def __init__(self, directory, max_size=512 * 1024 * 1024):
+        self.directory = os.fspath(directory)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+        # total size of the directory, None until scanned
+        self._size = None
+        self._writes = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def read(self, path, parser, options, parse):
+        """
+        Return the cached result of a parser, parsing the file on a miss.
+
+        Parameters
+        ----------
+        path : str
+            The file to read.
+        parser : str
+            Identifier of the parser, part of the key.
+        options : dict
+            Parser options, part of the key.
+        parse : callable
+            The parse function, called as ``parse(path, **options)`` on a miss.
+
+        Returns
+        -------
+        tuple
+            ``(meta, data)``
+        """
+        if not _is_file(path):
+            return parse(path, **options)
+
+        key = self._key(path, parser, options)
+        entry = os.path.join(self.directory, key + _ENTRY_SUFFIX)
+        try:
+            with open(entry, 'rb') as file:
+                result = _SafeUnpickler(file).load()
+        except FileNotFoundError:
+            pass
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError, ValueError) as err:
+            logger.debug(f'Discarding unreadable cache entry {entry}: {err}')
+        else:
+            self.hits += 1
+            _touch(entry)
+            return result
+
+        self.misses += 1
+        result = parse(path, **options)
+        self._write(entry, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        return result
+
+    def evict(self):
+        """Remove the least recently used entries and hash records above the maximum size."""
+        with self._lock, _FileLock(os.path.join(self.directory, '.lock')):
+            entries = []
+            total = 0
+            with os.scandir(self.directory) as it:
+                for item in it:
+                    if not item.name.endswith((_ENTRY_SUFFIX, _PATH_SUFFIX)):
+                        continue
+                    try:
+                        stat = item.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, item.path))
+                    total += stat.st_size
+            if total > self.max_size:
+                entries.sort()
+                for _, size, entry in entries:
+                    if total <= self.max_size * _EVICT_TO:
+                        break
+                    try:
+                        os.remove(entry)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+            self._size = total
+            self._writes = 0
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._lock, _FileLock(os.path.join(self.directory, '.lock')):
+            with os.scandir(self.directory) as it:
+                for item in it:
+                    if item.name.endswith((_ENTRY_SUFFIX, _PATH_SUFFIX)):
+                        try:
+                            os.remove(item.path)
+                        except FileNotFoundError:
+                            pass
+            self._keys.clear()
+            self.hits = self.misses = 0
+            self._size = 0
+            self._writes = 0
+
+    def stats(self):
+        """Return the hit/miss counters, the number of entries and the size of the directory."""
+        count = size = 0
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if item.name.endswith((_ENTRY_SUFFIX, _PATH_SUFFIX)):
+                    count += item.name.endswith(_ENTRY_SUFFIX)
+                    size += item.stat().st_size
+        return {'hits': self.hits, 'misses': self.misses, 'entries': count, 'size': size, 'max_size': self.max_size}
+
+    def _key(self, path, parser, options):
+        """Key of a result: content, parser, options and package version."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        params = (path, parser, repr(sorted(options.items())))
+
+        # the key is reused while the file size and mtime are unchanged
+        with self._lock:
+            known = self._keys.get(params)
+            if known is not None:
+                self._keys.move_to_end(params)
+        if known is not None and known[0] == signature:
+            return known[1]
+
+        from adsorption_file_parser import __version__
+        digest = self._digest(path, signature)
+        key = repr((digest, params[1:], __version__))
+        key = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        with self._lock:
+            self._keys[params] = (signature, key)
+            self._keys.move_to_end(params)
+            while len(self._keys) > _MAX_KEYS:
+                self._keys.popitem(last=False)
+        return key
+
+    def _digest(self, path, signature):
+        """Hash of the file content, shared with other processes by path."""
+        record = os.path.join(self.directory, hashlib.sha1(path.encode('utf-8')).hexdigest() + _PATH_SUFFIX)
+        try:
+            with open(record, 'r', encoding='utf-8') as file:
+                size, mtime, digest = file.read().split()
+            if (int(size), int(mtime)) == signature:
+                _touch(record)
+                return digest
+        except (OSError, ValueError):
+            pass
+
+        digest = _hash_file(path)
+        self._write(record, f'{signature[0]} {signature[1]} {digest}'.encode('utf-8'))
+        return digest
+
+    def _write(self, target, content):
+        """Write a file atomically, evicting entries if the cache is full."""
+        tmp = f'{target}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp, 'wb') as file:
+                file.write(content)
+            os.replace(tmp, target)
+        except OSError as err:
+            logger.warning(f'Could not write to the result cache: {err}')
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._writes += 1
+            if self._size is not None:
+                self._size += len(content)
+            full = self._size is None or self._size > self.max_size or self._writes >= _RESCAN_WRITES
+        if full:
+            self.evict()
+
+
+class _SafeUnpickler(pickle.Unpickler):
+    """Unpickler which only loads the types of parse results."""
+    def find_class(self, module, name):
+        if name in _SAFE_GLOBALS.get(module, ()):
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f'Cache entries cannot hold {module}.{name}.')
+
+
+class _FileLock():
+    """Exclusive lock on a file, shared between processes."""
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self.file = open(self.path, 'a')  # pylint: disable=consider-using-with
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *args):
+        if self.file is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+            self.file = None
+
+
+def _is_file(path):
+    """Whether the input of a parser is the path of an existing file."""
+    try:
+        return os.path.isfile(path)
+    except TypeError:
+        return False
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(_HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _touch(path):
+    """Mark an entry as recently used."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+_CACHE = None
+
+
+def get_result_cache():
+    """Return the result cache used by ``read``, None if disabled."""
+    return _CACHE
+
+
+def configure_result_cache(directory=None, max_size=512 * 1024 * 1024):
+    """
+    Enable or disable the result cache used by ``read``.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Directory where results are stored. If None, the cache is disabled.
+    max_size : int
+        Maximum total size of the stored results in bytes.
+
+    Returns
+    -------
+    ResultCache
+        The new cache, or None.
+    """
+    global _CACHE  # pylint: disable=global-statement
+    _CACHE = None if directory is None else ResultCache(directory, max_size=max_size)
+    return _CACHE
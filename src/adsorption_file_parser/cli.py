@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+The ``afp`` command line tool.
+
+``afp convert`` parses files, or all files in directories, in parallel
+and writes them as JSON, JSON lines or CSV columns. ``afp inspect``
+prints the format and metadata of files, and ``afp bench`` times the
+parsing of files. See ``afp <command> --help``.
+
+The parsers and the libraries they need are only imported when a file is
+parsed, so that the tool starts quickly.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from adsorption_file_parser import ParsingError
+from adsorption_file_parser import logger
+
+_OUTPUT_FORMATS = ('json', 'jsonl', 'csv')
+
+
+def main(argv=None):
+    """
+    Run the command line tool.
+
+    Parameters
+    ----------
+    argv : list[str], optional
+        The arguments, by default those of the process.
+
+    Returns
+    -------
+    int
+        The exit status: 0 on success, 1 if some files could not be
+        parsed, 2 for invalid arguments.
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+
+    # the parser messages are kept out of the output, which may be piped
+    redirected = [
+        handler for handler in logger.handlers
+        if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout
+    ]
+    for handler in redirected:
+        handler.setStream(sys.stderr)
+
+    try:
+        try:
+            options = dict(_parse_option(option) for option in args.option)
+            paths = list(_walk(args.paths, args.recursive, args.suffix))
+        except ParsingError as err:
+            parser.error(str(err))
+        if not paths:
+            parser.error('No files found.')
+        return args.command(args, paths, options)
+    finally:
+        for handler in redirected:
+            handler.setStream(sys.stdout)
+
+
+def _parser():
+    parser = argparse.ArgumentParser(prog='afp', description='Parse adsorption instrument files.')
+    commands = parser.add_subparsers(title='commands', required=True, metavar='command')
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('paths', nargs='+', help='files, or directories whose files are read')
+    common.add_argument('-m', '--manufacturer', help='manufacturer of the apparatus, detected if not given')
+    common.add_argument('-f', '--fmt', help='format of the files, detected if not given')
+    common.add_argument(
+        '--option',
+        action='append',
+        default=[],
+        metavar='NAME=VALUE',
+        help='parser option, the value read as JSON if possible, e.g. lang=JPN or tolerant=true',
+    )
+    common.add_argument('--no-recursive', dest='recursive', action='store_false', help='do not read subdirectories')
+    common.add_argument('--suffix', action='append', help='only read files with this extension, e.g. .xls')
+
+    convert = commands.add_parser('convert', parents=[common], help='parse files in parallel and write them out')
+    convert.add_argument('-o', '--output', required=True, help='output directory, or file for jsonl')
+    convert.add_argument('-t', '--to', choices=_OUTPUT_FORMATS, default='json', help='output format (default: %(default)s)')
+    convert.add_argument('-w', '--workers', type=int, help='number of parallel workers (default: number of CPUs)')
+    convert.add_argument('--threads', action='store_true', help='use threads instead of processes')
+    convert.set_defaults(command=_convert)
+
+    inspect = commands.add_parser('inspect', parents=[common], help='print the format and metadata of files')
+    inspect.set_defaults(command=_inspect)
+
+    bench = commands.add_parser('bench', parents=[common], help='time the parsing of files')
+    bench.add_argument('-r', '--repeat', type=int, default=3, help='runs of each file, the best is kept (default: %(default)s)')
+    bench.add_argument('--phases', action='store_true', help='also show the time of each parsing phase')
+    bench.set_defaults(command=_bench)
+    return parser
+
+
+def _convert(args, paths, options):
+    """Parse files in parallel and write them out, reporting throughput and failures."""
+    from adsorption_file_parser import read_many
+
+    if args.to == 'jsonl':
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        open(args.output, 'w', encoding='utf-8').close()
+    else:
+        os.makedirs(args.output, exist_ok=True)
+
+    # files which would write the same output, e.g. with the same name in
+    # two directories given, are refused rather than overwritten
+    items, targets, written = [], [], {}
+    failures = 0
+    for path, root in paths:
+        target = None
+        if args.to != 'jsonl':
+            target = _target(path, root, args.output, args.to)
+            key = os.path.normcase(os.path.abspath(target))
+            if key in written:
+                failures += 1
+                print(f'error: {path} is not converted, {target} is already written from {written[key]}.', file=sys.stderr)
+                continue
+            written[key] = path
+        items.append((path, args.manufacturer, args.fmt, options))
+        targets.append(target)
+
+    start = time.perf_counter()
+    size = points = 0
+    executor = 'thread' if args.threads else 'process'
+    for result in read_many(items, workers=args.workers, executor=executor):
+        if result.error is not None:
+            failures += 1
+            print(f'error: {result.error}', file=sys.stderr)
+        else:
+            size += os.path.getsize(result.path)
+            points += _count_points(result.data)
+        _write(result, targets[result.index], args.output, args.to)
+    elapsed = time.perf_counter() - start
+
+    parsed = len(paths) - failures
+    print(
+        f'Converted {parsed} of {len(paths)} files in {elapsed:.2f} s: '
+        f'{parsed / elapsed:.1f} files/s, {size / 1e6 / elapsed:.2f} MB/s, {points / elapsed:.0f} points/s.'
+    )
+    if failures:
+        print(f'{failures} files could not be converted.', file=sys.stderr)
+    return 1 if failures else 0
+
+
+def _inspect(args, paths, options):
+    """Print the format and metadata of each file as JSON."""
+    from adsorption_file_parser import read
+    from adsorption_file_parser.detect import resolve
+    from adsorption_file_parser.utils.exports import json_default
+
+    failures = 0
+    for path, _ in paths:
+        try:
+            manufacturer, fmt, file_options = resolve(path, args.manufacturer, args.fmt, options)
+            meta, _ = read(path, manufacturer, fmt, **file_options)
+        except Exception as err:  # pylint: disable=broad-except
+            failures += 1
+            print(f'error: Could not parse {path}: {err}', file=sys.stderr)
+            continue
+        content = {'path': path, 'manufacturer': manufacturer, 'fmt': fmt, 'meta': meta}
+        print(json.dumps(content, default=json_default, indent=2, ensure_ascii=False))
+    return 1 if failures else 0
+
+
+def _bench(args, paths, options):
+    """Print the best parsing time and throughput of each file."""
+    from adsorption_file_parser import read
+    from adsorption_file_parser.detect import resolve
+    from adsorption_file_parser.utils import instrumentation
+
+    print(f'{"file":40} {"parser":14} {"points":>9} {"MB":>8} {"detect ms":>10} {"parse ms":>10} {"MB/s":>8} {"points/s":>10}')
+    failures = 0
+    for path, _ in paths:
+        try:
+            start = time.perf_counter()
+            manufacturer, fmt, file_options = resolve(path, args.manufacturer, args.fmt, options)
+            detection = time.perf_counter() - start
+            best = float('inf')
+            for _ in range(max(1, args.repeat)):
+                start = time.perf_counter()
+                _, data = read(path, manufacturer, fmt, **file_options)
+                best = min(best, time.perf_counter() - start)
+            if args.phases:
+                with instrumentation.collect() as stats:
+                    read(path, manufacturer, fmt, **file_options)
+        except Exception as err:  # pylint: disable=broad-except
+            failures += 1
+            print(f'error: Could not parse {path}: {err}', file=sys.stderr)
+            continue
+
+        size = os.path.getsize(path) / 1e6
+        points = _count_points(data)
+        print(
+            f'{_shorten(path, 40):40} {manufacturer + ":" + fmt:14} {points:>9} {size:>8.3f} {detection * 1e3:>10.2f} '
+            f'{best * 1e3:>10.2f} {size / best:>8.2f} {points / best:>10.0f}'
+        )
+        if args.phases:
+            total = sum(wall for wall, _ in stats.phases.values()) or 1
+            print('    ' + ', '.join(f'{name} {wall / total:.0%}' for name, (wall, _) in stats.phases.items()))
+    return 1 if failures else 0
+
+
+def _walk(paths, recursive=True, suffixes=None):
+    """
+    The files to read, with the directory given for them.
+
+    Yields
+    ------
+    tuple
+        The path of each file, and the directory it was found in,
+        None for files given directly.
+    """
+    from adsorption_file_parser.utils.exports import is_ignored
+
+    suffixes = tuple(suffix.lower() for suffix in suffixes) if suffixes else None
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, subdirectories, names in os.walk(path):
+                if recursive:
+                    subdirectories[:] = sorted(name for name in subdirectories if not is_ignored(name))
+                else:
+                    subdirectories[:] = []
+                for name in sorted(names):
+                    if not is_ignored(name) and (suffixes is None or name.lower().endswith(suffixes)):
+                        yield os.path.join(directory, name), path
+        elif os.path.isfile(path):
+            yield path, None
+        else:
+            raise ParsingError(f'No such file or directory: {path}')
+
+
+def _target(path, root, output, to):
+    """The output file of a file, keeping the directory structure below the root given."""
+    name = os.path.relpath(path, root) if root is not None else os.path.basename(path)
+    return os.path.join(output, name) + '.' + to
+
+
+def _write(result, target, output, to):
+    """Write a result to its target, or to the output for jsonl."""
+    from adsorption_file_parser.utils.exports import result_to_json
+
+    if to == 'jsonl':
+        with open(output, 'a', encoding='utf-8') as file:
+            file.write(result_to_json(result) + '\n')
+        return
+    if result.error is not None:
+        return
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if to == 'json':
+        with open(target, 'w', encoding='utf-8') as file:
+            file.write(result_to_json(result))
+    else:
+        _write_csv(target, result.data)
+
+
+def _write_csv(target, data):
+    """Write data columns to a CSV file, shorter columns being padded with empty values."""
+    import csv
+    from itertools import zip_longest
+
+    with open(target, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(data.keys())
+        writer.writerows(zip_longest(*data.values(), fillvalue=''))
+
+
+def _parse_option(option):
+    """A ``name=value`` option, the value read as JSON if possible."""
+    name, separator, value = option.partition('=')
+    if not separator or not name:
+        raise ParsingError(f'Options must be given as NAME=VALUE, got {option!r}.')
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
+
+def _count_points(data):
+    """Number of points in the data, the length of the longest column."""
+    return max(map(len, data.values()), default=0)
+
+
+def _shorten(text, width):
+    return text if len(text) <= width else '...' + text[-width + 3:]
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Detect the manufacturer and format of a file from its content.
+
+Only the start of the file is read: the first 64 KB of an Excel 97 (.xls)
+workbook, whose sheet names and first strings are stored near the start,
+the zip directory and workbook part of an .xlsx file, and the first 4 KB
+of a text file.
+"""
+
+from collections import namedtuple
+
+from adsorption_file_parser import ParsingError
+
+Detection = namedtuple('Detection', ['manufacturer', 'fmt', 'options', 'confidence'])
+Detection.__doc__ = """
+Result of a format detection.
+
+``manufacturer`` and ``fmt`` are the arguments to pass to ``read``,
+``options`` any extra parser arguments (e.g. ``lang`` for BEL files),
+and ``confidence`` a score between 0 and 1.
+"""
+
+_OLE2_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+_ZIP_MAGIC = b'PK\x03\x04'
+
+_TEXT_HEAD = 4096
+_OLE2_HEAD = 65536
+
+# strings found in the shared string table or sheet names of .xls reports
+_XLS_SIGNATURES = (
+    ('Isotherm Tabular Report', 'mic', 'xl'),
+    ('AdsDes', 'bel', 'xl'),
+    ('_exptl_', 'generic', 'xls'),
+)
+
+# sheet names of .xlsx reports
+_XLSX_SHEETS = (
+    ('DVS Data', 'smsdvs', 'xlsx'),
+    ('Isotherm', '3p', 'xl'),
+)
+
+# first words of BEL text files, in Japanese the files are Shift JIS encoded
+_BEL_CSV_START = {'File Name,': 'ENG', 'ファイル名,': 'JPN'}
+_BEL_DAT_JPN = ('装置', '測定', '吸着')
+
+
+def detect_format(path):
+    """
+    Detect the manufacturer and format of a file.
+
+    Parameters
+    ----------
+    path: str
+        The location of the file.
+
+    Returns
+    -------
+    Detection
+        The ``manufacturer``, ``fmt``, extra ``options`` and ``confidence``.
+
+    Raises
+    ------
+    ParsingError
+        If the file is not a known format.
+    """
+    try:
+        with open(path, 'rb') as file:
+            head = file.read(_TEXT_HEAD)
+            if head.startswith(_OLE2_MAGIC):
+                head += file.read(_OLE2_HEAD - _TEXT_HEAD)
+    except OSError as err:
+        raise ParsingError(f'Could not read {path}: {err}') from err
+
+    if head.startswith(_OLE2_MAGIC):
+        detection = _detect_xls(path, head)
+    elif head.startswith(_ZIP_MAGIC):
+        detection = _detect_xlsx(path)
+    else:
+        detection = _detect_text(head)
+
+    if detection is None:
+        raise ParsingError(f'Could not detect the format of {path}.')
+    return detection
+
+
+def resolve(path, manufacturer=None, fmt=None, options=None):
+    """
+    Fill in a missing manufacturer or format by detection.
+
+    Options found during detection are overridden by those given.
+
+    Returns
+    -------
+    tuple
+        The ``manufacturer``, ``fmt`` and ``options`` to use.
+    """
+    options = options or {}
+    if manufacturer is not None and fmt is not None:
+        return manufacturer, fmt, options
+    detection = detect_format(path)
+    if manufacturer is not None and manufacturer != detection.manufacturer:
+        raise ParsingError(
+            f"File {path} looks like a '{detection.manufacturer}' file, "
+            f"specify the format to read it as '{manufacturer}'."
+        )
+    return detection.manufacturer, fmt or detection.fmt, {**detection.options, **options}
+
+
+def _detect_xls(path, head):
+    """Excel 97 workbooks, from strings near the start of the file."""
+    for text, manufacturer, fmt in _XLS_SIGNATURES:
+        # strings are stored either as latin-1 or as UTF-16
+        if text.encode('latin-1') in head or text.encode('utf-16-le') in head:
+            return Detection(manufacturer, fmt, {}, 0.9)
+
+    # otherwise the sheet names are read from the workbook globals
+    import xlrd
+    try:
+        workbook = xlrd.open_workbook(path, on_demand=True)
+        names = workbook.sheet_names()
+        workbook.release_resources()
+    except xlrd.XLRDError:
+        return None
+    if 'AdsDes' in names:
+        return Detection('bel', 'xl', {}, 0.9)
+    if 'data' in names and 'metadata' in names:
+        return Detection('generic', 'xls', {}, 0.8)
+    # Micromeritics exports often have a single unnamed sheet
+    return Detection('mic', 'xl', {}, 0.3)
+
+
+def _detect_xlsx(path):
+    """Excel 2007+ workbooks, from their sheet names."""
+    import zipfile
+    try:
+        with zipfile.ZipFile(path) as archive:
+            workbook = archive.read('xl/workbook.xml').decode('utf-8')
+    except (zipfile.BadZipFile, KeyError):
+        return None
+    for sheet, manufacturer, fmt in _XLSX_SHEETS:
+        if f'name="{sheet}"' in workbook:
+            return Detection(manufacturer, fmt, {}, 1.0)
+    return None
+
+
+def _detect_text(head):
+    """Text files, from their first lines."""
+    if b'_parser_version' in head[:64]:
+        return Detection('generic', 'csv', {}, 1.0)
+
+    if b'Quantachrome' in head:
+        return Detection('qnt', 'txt-raw', {}, 0.9)
+
+    text = head.decode('shift_jis', errors='ignore').lstrip('﻿')
+    for start, lang in _BEL_CSV_START.items():
+        if text.startswith(start):
+            return Detection('bel', 'csv', {'lang': lang}, 1.0)
+
+    if text.startswith('====='):
+        lang = 'JPN' if any(word in text for word in _BEL_DAT_JPN) else 'ENG'
+        return Detection('bel', 'dat', {'lang': lang}, 0.9)
+
+    return None
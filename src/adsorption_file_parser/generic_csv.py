@@ -6,14 +6,21 @@ and is used to check for any deprecations.
 
 """
 
-from io import StringIO
+from contextlib import contextmanager
+from itertools import islice
+from itertools import repeat
 
 import adsorption_file_parser.utils.common_utils as util
 from adsorption_file_parser import ParsingError
 from adsorption_file_parser import logger
+from adsorption_file_parser.utils import instrumentation
+from adsorption_file_parser.utils.keyword_index import KeywordIndex
 
 _parser_version = "1.0"
 
+# data lines converted at once
+_BATCH_LINES = 10000
+
 _META_DICT = {
     'adsorbate': {
         'text': ('_exptl_adsorptive', ),
@@ -69,8 +76,11 @@ _META_DICT = {
     },
 }
 
+_META_INDEX = KeywordIndex(_META_DICT)
+
 
-def parse(str_or_path, separator=','):
+@instrumentation.instrumented
+def parse(str_or_path, separator=',', as_arrays=False):
     """
     Load an isotherm from a CSV file.
 
@@ -81,6 +91,8 @@ def parse(str_or_path, separator=','):
         to where one can be read.
     separator : str, optional
         Separator used int the csv file. Defaults to `,`.
+    as_arrays : bool, optional
+        Return data columns as numpy arrays instead of lists.
     isotherm_parameters :
         Any other options to be overridden in the isotherm creation.
 
@@ -90,86 +102,144 @@ def parse(str_or_path, separator=','):
         The isotherm contained in the csv string or file.
 
     """
-    try:
-        with open(str_or_path, encoding='utf-8') as f:
-            raw_csv = StringIO(f.read())
-    except OSError:
-        try:
-            raw_csv = StringIO(str_or_path)
-        except Exception as err:
-            raise ParsingError(
-                "Could not parse CSV isotherm. "
-                "The `str_or_path` is invalid or does not exist. "
-            ) from err
-
     meta = {}
-    head = []
-    data = []
 
-    # local for efficiency
-    meta_dict = _META_DICT.copy()
+    # keys already found are removed from the index
+    meta_index = _META_INDEX.copy()
 
-    # metadata section
-    #
-    for line in raw_csv:
-        # break if we reach the end of the metadata
-        if line.startswith('data') or line == "":
-            break
+    with _open_lines(str_or_path) as lines:
 
-        try:
-            values = line.strip().split(sep=separator)
-            key, val = values[:2]  # just in case the CSV contains empty vals
-            try:
-                key = util.search_key_in_def_dict(key, meta_dict)
-            except StopIteration:
-                if val:
-                    key = key.replace(' ', '_')
-                    meta[key] = val
-                continue
+        # metadata section
+        #
+        instrumentation.mark('metadata')
+        for line in lines:
+            instrumentation.count('lines')
+            # break if we reach the end of the metadata
+            if line.startswith('data') or line == "":
+                break
 
-            tp = meta_dict[key]['type']
+            try:
+                values = line.strip().split(sep=separator)
+                text, val = values[:2]  # just in case the CSV contains empty vals
+                key = meta_index.find(text)
+                if key is None:
+                    if val:
+                        key = text.replace(' ', '_')
+                        meta[key] = val
+                    continue
+
+                tp = _META_DICT[key]['type']
+
+                if tp == 'date':
+                    meta[key] = util.handle_string_date(val)
+                else:  # assume numeric/string
+                    meta[key] = util.cast_string(val)
+
+                meta_index.remove(key)
+
+            except Exception as err:
+                raise ParsingError(
+                    "Could not parse CSV isotherm. "
+                    f"The format may be wrong, check for errors in line {line}."
+                ) from err
+
+        # version check
+        version = meta.pop("_parser_version", None)
+        if not version or float(version) < float(_parser_version):
+            logger.warning(
+                f"The file version is {version} while the parser uses version {_parser_version}. "
+                "Strange things might happen, so double check your data."
+            )
+
+        # data section
+        #
+        # data headers
+        instrumentation.mark('header')
+        line = next(lines, '')
+        head = [str.strip(s) for s in line.strip().split(separator)]
+
+        # data, converted column-wise in batches of lines
+        instrumentation.mark('data')
+        data = _read_columns(head, lines, separator, as_arrays)
 
-            if tp == 'date':
-                meta[key] = util.handle_string_date(val)
-            else:  # assume numeric/string
-                meta[key] = util.cast_string(val)
+    return meta, data
 
-            del meta_dict[key]  # delete for efficiency
 
-        except Exception as err:
+@contextmanager
+def _open_lines(str_or_path):
+    """Iterate over the lines of a file, or of a CSV string."""
+    try:
+        file = open(str_or_path, encoding='utf-8')  # pylint: disable=consider-using-with
+    except OSError as err:
+        if not isinstance(str_or_path, str):
             raise ParsingError(
                 "Could not parse CSV isotherm. "
-                f"The format may be wrong, check for errors in line {line}."
+                "The `str_or_path` is invalid or does not exist. "
             ) from err
-
-    # version check
-    version = meta.pop("_parser_version", None)
-    if not version or float(version) < float(_parser_version):
-        logger.warning(
-            f"The file version is {version} while the parser uses version {_parser_version}. "
-            "Strange things might happen, so double check your data."
-        )
-
-    # data section
-    #
-    # data headers
-    line = raw_csv.readline()
-    head = [str.strip(s) for s in line.strip().split(separator)]
-
-    # data
-    line = raw_csv.readline()
-    while line:
-        data.append(line.strip().split(separator))
-        line = raw_csv.readline()
-
-    # pack data
-    data = dict(zip(head, map(lambda *x: list(x), *data)))
-
-    # process isotherm branches if they exist
-    for col in data:
-        if col == 'branch':
-            data['branch'] = [0 if s == 'ads' else 1 for s in data['branch']]
-        else:
-            data[col] = [float(s) for s in data[col]]
-
-    return meta, data
+        yield _string_lines(str_or_path)
+        return
+    with file:
+        yield iter(file)
+
+
+def _string_lines(text):
+    """Lines of a string, without a copy of the whole string."""
+    start = 0
+    size = len(text)
+    while start < size:
+        end = text.find('\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end + 1]
+        start = end + 1
+
+
+def _read_columns(head, lines, separator, as_arrays):
+    """Convert the data lines to columns, a batch of lines at a time."""
+    if as_arrays:
+        np = util.import_numpy()
+    columns = [[] for _ in head]
+
+    while True:
+        batch = list(islice(lines, _BATCH_LINES))
+        if not batch:
+            break
+        instrumentation.count('lines', len(batch))
+        values = _batch_values(batch, separator)
+        if len(values) < len(head):
+            raise ParsingError("Could not parse CSV isotherm. Some data lines have missing values.")
+
+        for name, column, value in zip(head, columns, values):
+            if name == 'branch':
+                value = [0 if s.strip() == 'ads' else 1 for s in value]
+            else:
+                value = list(map(float, value))
+            if as_arrays:
+                column.append(np.array(value, dtype='int8' if name == 'branch' else np.float64))
+            else:
+                column.extend(value)
+
+    if as_arrays:
+        columns = [
+            np.concatenate(column) if column else np.empty(0, dtype='int8' if name == 'branch' else np.float64)
+            for name, column in zip(head, columns)
+        ]
+    return dict(zip(head, columns))
+
+
+def _batch_values(batch, separator):
+    """Split a batch of data lines into columns of values."""
+    width = batch[0].count(separator) + 1 if separator else 0
+    if width and set(map(str.count, batch, repeat(separator))) == {width - 1}:
+        # a single split of the whole batch, the lines having
+        # the same number of values, taken one every ``width``
+        values = ''.join(batch).replace('\n', separator).split(separator)
+        if batch[-1].endswith('\n'):
+            values.pop()
+        return [values[i::width] for i in range(width)]
+
+    # blank lines are skipped
+    instrumentation.fallback('csv_rows')
+    rows = [line.strip().split(separator) for line in batch]
+    return list(zip(*(row for row in rows if row != [''])))
@@ -4,9 +4,8 @@ Parse to and from a Excel format for isotherms.
 This is based on work by Paul Iacomi (https://raw.githubusercontent.com/pauliacomi/pyGAPS/master/src/pygaps/parsing/excel.py)
 """
 
-import xlrd
-
 from adsorption_file_parser.utils import common_utils as util
+from adsorption_file_parser.utils import instrumentation
 
 _META_DICT = {
     'isotherm_data': {
@@ -18,7 +17,8 @@ _META_DICT = {
 }
 
 
-def parse(path):
+@instrumentation.instrumented
+def parse(path, as_arrays=False):
     """
     Load an isotherm from a pyGAPS Excel file.
 
@@ -26,6 +26,8 @@ def parse(path):
     ----------
     path : str
         Path to the file to be read.
+    as_arrays : bool, optional
+        Return data columns as numpy arrays instead of lists.
     isotherm_parameters :
         Any other options to be overridden in the isotherm creation.
 
@@ -35,6 +37,7 @@ def parse(path):
         The isotherm contained in the excel file.
 
     """
+    import xlrd
 
     # isotherm type (point/model)
 
@@ -48,6 +51,7 @@ def parse(path):
         sht = wb.sheet_by_index(0)
 
     # read the main isotherm parameters
+    instrumentation.mark('metadata')
     for field in _META_DICT.values():
         valc = sht.cell(field['row'], field['column'] + 1)
         if valc.ctype == xlrd.XL_CELL_EMPTY:
@@ -75,6 +79,7 @@ def parse(path):
             final_row += 1
 
         # read the data in
+        instrumentation.mark('data')
         header_col = 0
         head = []
         data = {}
@@ -97,14 +102,20 @@ def parse(path):
         # process isotherm branches if they exist
         for col in data:
             if col == 'branch':
-                data['branch'] = [0 if s == 'ads' else 1 for s in data['branch']]
+                branch = [0 if s == 'ads' else 1 for s in data['branch']]
+                if as_arrays:
+                    branch = util.import_numpy().array(branch, dtype='int8')
+                data['branch'] = branch
             else:
-                data[col] = [float(s) for s in data[col]]
+                data[col] = util.pack_column(map(float, data[col]), as_arrays)
 
     # read the secondary isotherm metadata
+    instrumentation.mark('metadata')
+    instrumentation.count('cells', sht.nrows * sht.ncols)
     meta = {}
     if 'metadata' in wb.sheet_names():
         sht = wb.sheet_by_name('metadata')
+        instrumentation.count('cells', sht.nrows * 2)
         row_index = 0
         while row_index < sht.nrows:
             namec = sht.cell(row_index, 0)
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+A compact form of parsed isotherms.
+
+``read`` returns a ``meta`` dictionary and a ``data`` dictionary of
+lists, which is convenient for a few files but costly when many parsed
+isotherms are kept in memory: every metadata key is stored again in
+each dictionary and every value of a list column is a separate float
+object.
+
+An ``Isotherm`` holds the same content in less memory:
+
+* the metadata fields common to all parsers (material, adsorbate,
+  temperature, pressure, loading and material units and bases...)
+  are attributes with ``__slots__``, other fields being kept in an
+  ``extra`` dictionary;
+* numeric columns are stored as ``array('d')`` (or ``array('q')`` for
+  integers), and numpy arrays as they are;
+* the ``branch`` column is stored as the index where each branch starts.
+
+It converts losslessly to and from the ``(meta, data)`` tuple, which it
+also unpacks to, so code written for ``read`` keeps working.
+
+.. code:: python
+
+    from adsorption_file_parser.isotherm import Isotherm
+    isotherm = Isotherm.read("path/to/file")
+    isotherm.material, isotherm.columns['pressure']
+    meta, data = isotherm
+"""
+
+from array import array
+
+from adsorption_file_parser.utils.common_utils import import_numpy
+
+BRANCH = 'branch'
+
+# metadata fields stored in slots, those of ``unit_parsing`` and the most common
+FIELDS = (
+    'material',
+    'adsorbate',
+    'temperature',
+    'temperature_unit',
+    'pressure_mode',
+    'pressure_unit',
+    'loading_basis',
+    'loading_unit',
+    'material_basis',
+    'material_unit',
+    'material_mass',
+    'material_mass_unit',
+    'date',
+    'operator',
+    'apparatus',
+)
+
+_INT_MIN = -(1 << 63)
+_INT_MAX = (1 << 63) - 1
+
+
+class Isotherm():
+    """
+    A parsed isotherm, in compact form.
+
+    A metadata field in ``FIELDS`` which is not present in the file is
+    not set, use ``get`` to read a field which may be missing.
+
+    Parameters
+    ----------
+    meta : dict
+        The metadata, as returned by ``read``.
+    data : dict
+        The data, as returned by ``read``.
+
+    Attributes
+    ----------
+    extra : dict
+        Metadata fields not in ``FIELDS``.
+    columns : dict
+        Data columns other than the branch, as ``array``, numpy arrays,
+        or lists for columns which are not numeric.
+    branches : tuple
+        The ``(start, branch)`` of each run of points of the same
+        branch, e.g. ``((0, 0), (20, 1))`` for 20 adsorption points
+        followed by desorption points, empty if there is no branch column.
+    """
+
+    __slots__ = FIELDS + ('extra', 'columns', 'branches', '_meta_order', '_branch_position', '_branch_dtype', '_size')
+
+    def __init__(self, meta, data):
+        extra = {}
+        for key, value in meta.items():
+            if key in FIELDS:
+                setattr(self, key, value)
+            else:
+                extra[key] = value
+        self.extra = extra
+        self._meta_order = tuple(meta)
+
+        self.columns = {}
+        self.branches = ()
+        self._branch_position = None
+        self._branch_dtype = None
+        self._size = 0
+        for position, (key, column) in enumerate(data.items()):
+            if key == BRANCH:
+                self.branches = _runs(column)
+                self._branch_position = position
+                self._branch_dtype = getattr(column, 'dtype', None)
+                self._size = len(column)
+            else:
+                self.columns[key] = _compact(column)
+
+    @classmethod
+    def read(cls, path, manufacturer=None, fmt=None, **options):
+        """Parse a file, see ``read``, and return it as an ``Isotherm``."""
+        from adsorption_file_parser import read
+        return cls(*read(path, manufacturer, fmt, **options))
+
+    def get(self, key, default=None):
+        """A metadata field, or ``default`` if it is not present."""
+        if key in FIELDS:
+            return getattr(self, key, default)
+        return self.extra.get(key, default)
+
+    @property
+    def meta(self):
+        """The metadata, as a dictionary, in the order of the parser."""
+        meta = {}
+        # fields set or removed since are added at the end, or left out
+        for key in self._meta_order + FIELDS + tuple(self.extra):
+            if key in meta:
+                continue
+            if key in FIELDS:
+                try:
+                    meta[key] = getattr(self, key)
+                except AttributeError:
+                    continue
+            elif key in self.extra:
+                meta[key] = self.extra[key]
+        return meta
+
+    @property
+    def data(self):
+        """The data, as a dictionary of columns as returned by ``read``."""
+        data = {}
+        for position, (key, column) in enumerate(self.columns.items()):
+            if position == self._branch_position:
+                data[BRANCH] = self._branch_column()
+            data[key] = column.tolist() if isinstance(column, array) else column
+        if self._branch_position is not None and BRANCH not in data:
+            data[BRANCH] = self._branch_column()
+        return data
+
+    def to_tuple(self):
+        """The ``(meta, data)`` tuple, as returned by ``read``."""
+        return self.meta, self.data
+
+    def __iter__(self):
+        return iter(self.to_tuple())
+
+    def __len__(self):
+        """Number of points, the length of the longest column."""
+        return max(self._size, max(map(len, self.columns.values()), default=0))
+
+    def __eq__(self, other):
+        if not isinstance(other, Isotherm):
+            return NotImplemented
+        return _equal(self.to_tuple(), other.to_tuple())
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'Isotherm(material={self.get("material")!r}, adsorbate={self.get("adsorbate")!r}, points={len(self)})'
+
+    def _branch_column(self):
+        """The branch column, rebuilt from the runs."""
+        column = []
+        ends = [start for start, _ in self.branches[1:]] + [self._size]
+        for (start, branch), end in zip(self.branches, ends):
+            column.extend([branch] * (end - start))
+        if self._branch_dtype is not None:
+            np = import_numpy()
+            return np.array(column, dtype=self._branch_dtype)
+        return column
+
+
+def _runs(column):
+    """The ``(start, value)`` of each run of equal values."""
+    runs = []
+    previous = None
+    for index, value in enumerate(column.tolist() if hasattr(column, 'tolist') else column):
+        if not runs or value != previous:
+            runs.append((index, value))
+            previous = value
+    return tuple(runs)
+
+
+def _compact(column):
+    """A list of floats or of ints as an array, other columns as they are."""
+    if not isinstance(column, list) or not column:
+        return column
+    types = set(map(type, column))
+    if types == {float}:
+        return array('d', column)
+    if types == {int} and _INT_MIN <= min(column) and max(column) <= _INT_MAX:
+        return array('q', column)
+    return column
+
+
+def _equal(first, second):
+    """Equality of ``(meta, data)`` tuples, which may hold numpy arrays."""
+    (meta, data), (other_meta, other_data) = first, second
+    if meta != other_meta or list(data) != list(other_data):
+        return False
+    for key, column in data.items():
+        other = other_data[key]
+        if hasattr(column, 'tolist') or hasattr(other, 'tolist'):
+            if type(column) is not type(other) or column.tolist() != other.tolist():
+                return False
+        elif column != other:
+            return False
+    return True
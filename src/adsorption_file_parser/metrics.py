@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+Metrics of the files parsed by this process.
+
+``read`` and the batch functions record the files parsed, by parser and
+outcome, the bytes and data points processed and the parsing time, and
+the parser modules count their fallbacks to slower code paths. The
+metrics can be exported in the Prometheus text format, served on a local
+HTTP port with ``serve_metrics`` or written to a file with
+``write_metrics``, e.g. for the textfile collector of node_exporter.
+
+.. code:: python
+
+    from adsorption_file_parser.metrics import serve_metrics
+    serve_metrics(9464)  # http://localhost:9464/metrics
+
+Labels are limited to the manufacturer and format of registered parsers,
+other values being reported as ``unknown``, the outcome (``ok`` or
+``error``) and the names of the fallbacks, so that the number of series
+stays bounded. Updates are a few dictionary operations under a lock,
+cheap enough to be always on, but metrics can be disabled with
+``configure_metrics(enabled=False)``.
+
+Files parsed by ``read_many``, ``aread_many`` and ``Watcher`` are recorded
+in the calling process, whatever the executor. Files parsed by ``read``
+or ``aread`` in worker processes are recorded in those processes.
+"""
+
+import os
+import threading
+from bisect import bisect_left
+
+from adsorption_file_parser import registry
+
+PREFIX = 'adsorption_file_parser_'
+
+# parsing times in seconds, from small text files to large workbooks
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+UNKNOWN = 'unknown'
+
+
+class Counter():
+    """
+    Values which only increase, one per combination of labels.
+
+    Parameters
+    ----------
+    name : str
+        Name of the metric.
+    documentation : str
+        Description of the metric.
+    labelnames : tuple
+        Names of the labels.
+    """
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), value=1):
+        """Add to the value of some labels."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + value
+
+    def value(self, labels=()):
+        """Current value of some labels."""
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        """``(name, labels, value)`` of each series."""
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield self.name, dict(zip(self.labelnames, labels)), value
+
+
+class Histogram():
+    """
+    Distribution of observed values in buckets, one per combination of labels.
+
+    Parameters
+    ----------
+    name : str
+        Name of the metric.
+    documentation : str
+        Description of the metric.
+    labelnames : tuple
+        Names of the labels.
+    buckets : tuple
+        Increasing upper bounds of the buckets, an infinite bound is added.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels: [count in each bucket, ..., sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        """Record a value of some labels."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, labels=()):
+        """Number of values observed for some labels."""
+        series = self._values.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        """``(name, labels, value)`` of each series, with cumulative buckets."""
+        with self._lock:
+            values = sorted((labels, list(series)) for labels, series in self._values.items())
+        for labels, series in values:
+            labels = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'), ), series):
+                cumulative += count
+                yield self.name + '_bucket', dict(labels, le=_format_value(bound)), cumulative
+            yield self.name + '_sum', labels, series[-1]
+            yield self.name + '_count', labels, cumulative
+
+
+class MetricsRegistry():
+    """The metrics recorded by ``read`` and the parsers."""
+    def __init__(self):
+        self.files = Counter(PREFIX + 'files_total', 'Files parsed.', ('manufacturer', 'fmt', 'outcome'))
+        self.bytes = Counter(PREFIX + 'bytes_total', 'Size of the files parsed.', ('manufacturer', 'fmt'))
+        self.points = Counter(PREFIX + 'points_total', 'Data points read.', ('manufacturer', 'fmt'))
+        self.seconds = Histogram(PREFIX + 'parse_seconds', 'Time to parse a file.', ('manufacturer', 'fmt'))
+        self.fallbacks = Counter(PREFIX + 'fallbacks_total', 'Fallbacks to slower code paths.', ('name', ))
+        self.metrics = (self.files, self.bytes, self.points, self.seconds, self.fallbacks)
+
+    def record_read(self, manufacturer, fmt, outcome, seconds=None, path=None, data=None):
+        """
+        Record a parsed file.
+
+        Parameters
+        ----------
+        manufacturer, fmt : str
+            The parser used, None if it could not be detected.
+        outcome : {'ok', 'error'}
+            Whether the file was parsed.
+        seconds : float, optional
+            Time taken to parse the file.
+        path : str, optional
+            The file, whose size is added to the bytes processed.
+        data : dict, optional
+            The data read, whose length is added to the points.
+        """
+        labels = _parser_labels(manufacturer, fmt)
+        self.files.inc(labels + (outcome, ))
+        if seconds is not None:
+            self.seconds.observe(labels, seconds)
+        if path is not None:
+            try:
+                self.bytes.inc(labels, os.path.getsize(path))
+            except (OSError, TypeError, ValueError):
+                pass
+        if data:
+            try:
+                self.points.inc(labels, max(map(len, data.values())))
+            except (AttributeError, TypeError):
+                pass  # registered parsers may return other data
+
+    def record_result(self, result):
+        """Record the ``BatchResult`` of a file."""
+        outcome = 'ok' if result.error is None else 'error'
+        self.record_read(result.manufacturer, result.fmt, outcome, result.seconds, result.path, result.data)
+
+    def exposition(self):
+        """
+        The metrics in the Prometheus text format.
+
+        Returns
+        -------
+        str
+            The exposition, ending with a new line.
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                if labels:
+                    text = ','.join(f'{label}="{_escape(text)}"' for label, text in labels.items())
+                    name = f'{name}{{{text}}}'
+                lines.append(f'{name} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _parser_labels(manufacturer, fmt):
+    """Labels of a parser, registered ones only to bound the number of series."""
+    if (manufacturer, fmt) in registry._REGISTRY:
+        return (manufacturer, fmt)
+    return (UNKNOWN, UNKNOWN)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    return '+Inf' if value == float('inf') else str(value)
+
+
+_METRICS = MetricsRegistry()
+
+
+def get_metrics():
+    """Return the metrics recorded by ``read``, None if disabled."""
+    return _METRICS
+
+
+def configure_metrics(enabled=True):
+    """
+    Enable or disable the metrics, resetting them.
+
+    Parameters
+    ----------
+    enabled : bool
+        Whether ``read`` and the parsers record metrics.
+
+    Returns
+    -------
+    MetricsRegistry
+        The new metrics, or None.
+    """
+    global _METRICS  # pylint: disable=global-statement
+    _METRICS = MetricsRegistry() if enabled else None
+    return _METRICS
+
+
+def fallback(name):
+    """Count a fallback of a parser to a slower code path."""
+    metrics = _METRICS
+    if metrics is not None:
+        metrics.fallbacks.inc((name, ))
+
+
+def write_metrics(path):
+    """
+    Write the metrics to a file in the Prometheus text format.
+
+    The file is replaced atomically, so that a collector never reads it
+    half written.
+
+    Parameters
+    ----------
+    path : str
+        The file to write.
+    """
+    metrics = get_metrics() or MetricsRegistry()
+    path = os.fspath(path)
+    temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        file.write(metrics.exposition())
+    os.replace(temporary, path)
+
+
+def serve_metrics(port=9464, host='127.0.0.1'):
+    """
+    Serve the metrics in the Prometheus text format over HTTP, from a background thread.
+
+    Parameters
+    ----------
+    port : int, optional
+        The port to listen on, 0 for any free port.
+    host : str, optional
+        The address to listen on, by default only local connections.
+
+    Returns
+    -------
+    http.server.ThreadingHTTPServer
+        The server, whose ``server_address`` holds the port used.
+        Call its ``shutdown`` method to stop serving.
+    """
+    from http.server import BaseHTTPRequestHandler
+    from http.server import ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802 pylint: disable=invalid-name
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = (get_metrics() or MetricsRegistry()).exposition().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass  # scrapes are not worth a log line
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='adsorption-metrics', daemon=True)
+    thread.start()
+    return server
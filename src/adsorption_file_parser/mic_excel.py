@@ -1,13 +1,13 @@
 # -*- coding: utf-8 -*-
 """Parse Micromeritics Excel(.xls) report files."""
 
-from itertools import product
-
-import xlrd
-
 from adsorption_file_parser import logger
 from adsorption_file_parser.utils import common_utils as util
+from adsorption_file_parser.utils import instrumentation
 from adsorption_file_parser.utils import unit_parsing
+from adsorption_file_parser.utils.keyword_index import KeywordIndex
+from adsorption_file_parser.utils.layout_cache import xlrd_layout
+from adsorption_file_parser.utils.layout_cache import xlrd_text
 
 _META_DICT = {
     'material': {
@@ -80,8 +80,12 @@ _DATA_DICT = {
     },
 }
 
+_META_INDEX = KeywordIndex(_META_DICT)
+_DATA_INDEX = KeywordIndex(_DATA_DICT)
 
-def parse(path):
+
+@instrumentation.instrumented
+def parse(path, as_arrays=False):
     """
     Parse an xls file generated by micromeritics software.
 
@@ -89,6 +93,8 @@ def parse(path):
     ----------
     path: str
         Path to the file to be read.
+    as_arrays : bool, optional
+        Return numeric data columns as numpy arrays instead of lists.
 
     Returns
     -------
@@ -97,119 +103,180 @@ def parse(path):
     data : dict
         Isotherm data.
     """
+    import xlrd
+
     meta = {}
     data = {}
     errors = []
 
-    # open the workbook
-    workbook = xlrd.open_workbook(path, encoding_override='latin-1')
+    # open the workbook, only loading the sheet we need
+    workbook = xlrd.open_workbook(path, encoding_override='latin-1', on_demand=True)
     try:
-        sheet = workbook.sheet_by_name("Isotherm Tabular Report")
-    except Exception:
-        sheet = workbook.sheet_by_index(0)
-
-    # local for efficiency
-    meta_dict = _META_DICT.copy()
-
-    # iterate over all cells in the notebook
-    for row, col in product(range(sheet.nrows), range(sheet.ncols)):
-
-        # check if empty
-        cell_value = sheet.cell(row, col).value
-        if not isinstance(cell_value, str) or cell_value == '':
-            continue
-
-        # check if we are in the data section
-        if cell_value not in ['Isotherm Tabular Report']:
-            cell_value = cell_value.strip().lower()
-            try:
-                key = util.search_key_starts_def_dict(cell_value, meta_dict)
-            except StopIteration:
-                continue
-
-            ref = meta_dict[key]['xl_ref']
-            tp = meta_dict[key]['type']
-
-            val = sheet.cell(row + ref[0], col + ref[1]).value
-            if val == '':
-                meta[key] = None
-            elif tp == 'numeric':
-                val = val.replace(',', '.')  # bad way of dealing with french locale
-                nb, unit = unit_parsing.parse_number_unit_string(val)
-                meta[key] = nb
-                meta[f'{key}_unit'] = unit
-            elif tp == 'string':
-                if key == 'operator' and val == 'XXXX':
+        try:
+            sheet = workbook.sheet_by_name("Isotherm Tabular Report")
+        except Exception:
+            instrumentation.fallback('first_sheet')
+            sheet = workbook.sheet_by_index(0)
+
+        # metadata and data positions, cached for files with the same layout
+        instrumentation.mark('metadata')
+        events = xlrd_layout('mic', workbook, sheet, _scan, _layout_fits)
+        found = set()
+
+        for row, col, key in events:
+
+            # check if we are in the data section
+            if key is not None:
+                if key in found:
                     continue
-                meta[key] = util.handle_excel_string(val)
-            elif tp == 'datetime':
-                meta[key] = util.handle_string_date(val)
-            elif tp == 'date':
-                meta[key] = util.handle_xlrd_date(val, sheet)
-            elif tp == 'time':
-                meta[key] = util.handle_xlrd_time(val, sheet)
-            elif tp == 'timedelta':
-                meta[key] = val
-            elif tp == 'error':
-                errors += _parse_errors(sheet, row, col)
-
-            del meta_dict[key]  # delete for efficiency
-
-        else:  # If "data" section
-
-            header_list = _get_header(sheet, row, col)
-            head, units = _parse_header(header_list)  # header
-            meta.update(units)
-
-            for i, h in enumerate(head[1:]):
-                points = _parse_data(sheet, row, col + i)
-
-                if h == 'time_total':
-                    data[h] = list(map(util.handle_string_time_minutes, points[1:]))
-                elif h == 'pressure_saturation':
-                    data[h] = [float(x) for x in points[1:]]
-                elif h.startswith('pressure') or h.startswith('loading'):
-                    data[h] = [float(x) for x in points]
-                else:
-                    data[h] = points
-
-    if errors:
-        meta['errors'] = errors
-
-    _check(meta, data, path)
-
-    # Set extra metadata
-    if meta.get('comment'):
-        meta['comment'] = meta['comment'].replace('Comments: ', '')
-    if not meta.get('operator'):
-        meta['operator'] = None
-
-    # Get instrument from absolute position
-    meta['apparatus'] = str(sheet.cell(1, 0).value)
-    meta['apparatus_details'] = str(sheet.cell(2, 1).value)
+
+                ref = _META_DICT[key]['xl_ref']
+                tp = _META_DICT[key]['type']
+
+                val = sheet.cell_value(row + ref[0], col + ref[1])
+                if val == '':
+                    meta[key] = None
+                elif tp == 'numeric':
+                    val = val.replace(',', '.')  # bad way of dealing with french locale
+                    nb, unit = unit_parsing.parse_number_unit_string(val)
+                    meta[key] = nb
+                    meta[f'{key}_unit'] = unit
+                elif tp == 'string':
+                    if key == 'operator' and val == 'XXXX':
+                        continue
+                    meta[key] = util.handle_excel_string(val)
+                elif tp == 'datetime':
+                    meta[key] = util.handle_string_date(val)
+                elif tp == 'date':
+                    meta[key] = util.handle_xlrd_date(val, sheet)
+                elif tp == 'time':
+                    meta[key] = util.handle_xlrd_time(val, sheet)
+                elif tp == 'timedelta':
+                    meta[key] = val
+                elif tp == 'error':
+                    errors += _parse_errors(sheet, row, col)
+
+                found.add(key)
+
+            else:  # If "data" section
+
+                instrumentation.mark('header')
+                header_list = _get_header(sheet, row, col)
+                head, units = _parse_header(header_list)  # header
+                meta.update(units)
+
+                instrumentation.mark('data')
+                for i, h in enumerate(head[1:]):
+                    points = _parse_data(sheet, row, col + i)
+
+                    if h == 'time_total':
+                        data[h] = list(map(util.handle_string_time_minutes, points[1:]))
+                    elif h == 'pressure_saturation':
+                        data[h] = [float(x) for x in points[1:]]
+                    elif h.startswith('pressure') or h.startswith('loading'):
+                        data[h] = [float(x) for x in points]
+                    else:
+                        data[h] = points
+                instrumentation.mark('metadata')
+
+        if errors:
+            meta['errors'] = errors
+
+        _check(meta, data, path)
+
+        if as_arrays:
+            instrumentation.mark('data')
+            data = {k: util.pack_column(v, as_arrays) for k, v in data.items()}
+
+        # Set extra metadata
+        instrumentation.mark('metadata')
+        if meta.get('comment'):
+            meta['comment'] = meta['comment'].replace('Comments: ', '')
+        if not meta.get('operator'):
+            meta['operator'] = None
+
+        # Get instrument from absolute position
+        meta['apparatus'] = str(sheet.cell_value(1, 0))
+        meta['apparatus_details'] = str(sheet.cell_value(2, 1))
+    finally:
+        workbook.release_resources()
 
     return meta, data
 
 
+def _scan(sheet):
+    """Find the position of all metadata labels and data block titles."""
+    events = []
+
+    # keys already found are removed from the index
+    meta_index = _META_INDEX.copy()
+    data_found = False
+
+    # iterate over all text cells in the sheet, row by row
+    for row in range(sheet.nrows):
+
+        # stop if there is nothing left to find
+        if data_found and not meta_index:
+            break
+
+        for col, cell_value in util.xlrd_text_cells(sheet, row):
+
+            # check if we are in the data section
+            if cell_value not in ['Isotherm Tabular Report']:
+                key = meta_index.find_start(cell_value.strip().lower())
+                if key is None:
+                    continue
+                events.append([row, col, key])
+                if not _is_placeholder(sheet, row, col, key):
+                    meta_index.remove(key)
+
+            else:  # If "data" section
+
+                data_found = True
+                events.append([row, col, None])
+
+    return events
+
+
+def _layout_fits(sheet, events):
+    """Check that the cells of a cached layout hold the same labels in the sheet."""
+    for row, col, key in events:
+        text = xlrd_text(sheet, row, col)
+        if text is None:
+            return False
+        if key is None:
+            if text != 'Isotherm Tabular Report':
+                return False
+        elif _META_INDEX.find_start(text.strip().lower()) != key:
+            return False
+    return True
+
+
+def _is_placeholder(sheet, row, col, key):
+    """A placeholder operator is skipped, a later one may be valid."""
+    if key != 'operator':
+        return False
+    ref = _META_DICT[key]['xl_ref']
+    return sheet.cell_value(row + ref[0], col + ref[1]) == 'XXXX'
+
+
 def _get_header(sheet, row, col):
     """Locate all column labels for data collected during the experiment."""
     final_column = col
     header_row = 2
-    # Abstract this sort of thing
-    header = sheet.cell(row + header_row, final_column).value.lower()
-    header_options = []
-    for option in _DATA_DICT.values():
-        header_options.extend(option['text'])
-    while any(header.startswith(label) for label in header_options):
+    header_values = sheet.row_values(row + header_row)
+    header = header_values[final_column].lower()
+    while _DATA_INDEX.find_start(header) is not None:
         final_column += 1
         if final_column > sheet.ncols - 1:
             break
-        header = sheet.cell(row + header_row, final_column).value.lower()
+        header = header_values[final_column].lower()
 
     if col == final_column:
         # this means no header exists, can happen in some older files
         # the units might not be standard! TODO should check
         logger.warning('Default data headers supplied for file.')
+        instrumentation.fallback('default_header')
         return [
             'Relative Pressure (P/Po)',
             'Absolute Pressure (kPa)',
@@ -218,7 +285,7 @@ def _get_header(sheet, row, col):
             'Saturation Pressure (kPa)',
         ]
 
-    return [sheet.cell(row + header_row, i).value for i in range(col, final_column)]
+    return header_values[col:final_column]
 
 
 def _parse_header(header_split):
@@ -227,10 +294,8 @@ def _parse_header(header_split):
     units = {}
 
     for h in header_split:
-        try:
-            text = h.lower()
-            header = util.search_key_starts_def_dict(text, _DATA_DICT)
-        except StopIteration:
+        header = _DATA_INDEX.find_start(h.lower())
+        if header is None:
             header = h
 
         headers.append(header)
@@ -261,28 +326,28 @@ def _parse_header(header_split):
 def _parse_data(sheet, row, col):
     """Return all collected data points for a given column."""
     rowc = 3
+    # the whole column below the header, positions are relative to its start
+    values = sheet.col_values(col, row + rowc)
+    last = len(values) - 1
     # Data can start on two different rows. Try first option and then next row.
-    if sheet.cell(row + rowc, col).value:
-        start_row = row + rowc
-        final_row = row + rowc
+    if values[0]:
+        start_row = 0
     else:
-        start_row = row + (rowc + 1)
-        final_row = row + (rowc + 1)
-    point = sheet.cell(final_row, col).value
+        start_row = 1
+    final_row = start_row
+    point = values[final_row]
     while point:
         final_row += 1
-        if final_row > sheet.nrows - 1:
+        if final_row > last:
             break
-        point = sheet.cell(final_row, col).value
+        point = values[final_row]
         # sometimes 1-row gaps are left for P0 measurement
         if not point:
             final_row += 1
-            if final_row > sheet.nrows - 1:
+            if final_row > last:
                 break
-            point = sheet.cell(final_row, col).value
-    return [
-        sheet.cell(i, col).value for i in range(start_row, final_row) if sheet.cell(i, col).value
-    ]
+            point = values[final_row]
+    return [v for v in values[start_row:final_row] if v]
 
 
 def _parse_errors(sheet, row, col):
@@ -291,15 +356,11 @@ def _parse_errors(sheet, row, col):
     (are below a cell labelled primary data).
     """
     ref = _META_DICT['error']['xl_ref']
-    val = sheet.cell(row + ref[0], col + ref[1]).value
-    if not val:
-        return []
-    final_row = row + ref[0]
-    error = sheet.cell(final_row, col + ref[1]).value
-    while error:
+    values = sheet.col_values(col + ref[1], row + ref[0])
+    final_row = 0
+    while final_row < len(values) and values[final_row]:
         final_row += 1
-        error = sheet.cell(final_row, col + ref[1]).value
-    return [sheet.cell(i, col + ref[1]).value for i in range(row + ref[0], final_row)]
+    return values[:final_row]
 
 
 def _check(meta, data, path):
@@ -3,7 +3,9 @@
 import re
 
 import adsorption_file_parser.utils.common_utils as util
+from adsorption_file_parser.utils import instrumentation
 from adsorption_file_parser.utils import unit_parsing
+from adsorption_file_parser.utils.keyword_index import KeywordIndex
 
 _META_DICT = {
     'adsorbate': {
@@ -115,8 +117,12 @@ _DATA_DICT = {
     },
 }
 
+_META_INDEX = KeywordIndex(_META_DICT)
+_DATA_INDEX = KeywordIndex(_DATA_DICT)
 
-def parse(path):
+
+@instrumentation.instrumented
+def parse(path, as_arrays=False, tolerant=False, decimal='.'):
     """
     Get the isotherm and sample data from a Quantachrome .txt file.
 
@@ -124,6 +130,14 @@ def parse(path):
     ----------
     path : str
         Path to the file to be read.
+    as_arrays : bool, optional
+        Return data columns as numpy arrays instead of lists.
+    tolerant : bool, optional
+        Read data values which cannot be converted as NaN, listing
+        their location in ``meta['data_errors']``, instead of raising.
+    decimal : str, optional
+        Decimal mark of the numbers, ``','`` for files written in
+        some locales.
 
     Returns
     -------
@@ -135,52 +149,63 @@ def parse(path):
 
     meta = {}
     head = []
-    data = []
 
-    # local for efficiency
-    meta_dict = _META_DICT.copy()
+    # keys already found are removed from the index
+    meta_index = _META_INDEX.copy()
+
+    # only the header lines are decoded, the data block
+    # at the end is converted from bytes at once
+    with util.map_file(path) as buffer:
 
-    with open(path, 'r', encoding='cp1252') as file:
+        def readline():
+            nonlocal pos
+            line, pos = util.read_line(buffer, pos)
+            return line.decode('cp1252')
+
+        pos = 0
+        instrumentation.mark('metadata')
 
         # We skip the header
         for _ in range(6):
-            file.readline()
+            readline()
 
         # metadata section
         #
         # first four lines are always the same
-        line7 = file.readline()
+        line7 = readline()
         vals = find_key_vals_from_keys(line7, ['Operator:', 'Date:', 'Operator:', 'Date:'])
         meta['operator'] = vals[0]
         meta['date'] = vals[1]
         meta['report_operator'] = vals[2]
         meta['report_date'] = vals[3]
 
-        line8 = file.readline()
+        line8 = readline()
         vals = find_key_vals_from_keys(line8, ['Sample ID:', 'Filename:'])
         meta['material'] = vals[0]
         meta['filename'] = vals[1]
 
-        line9 = file.readline()
+        line9 = readline()
         vals = find_key_vals_from_keys(line9, ['Sample Desc:', 'Comment:'])
         meta['material_description'] = vals[0]
         meta['comment'] = vals[1]
 
         # next lines are variable
-        for line in file:
+        while pos < len(buffer):
+            line = readline()
             # break if we reach the end of the metadata
             if line == '\n':
                 break
 
             components = []
             line_lower = line.lower()
-            for key, names in meta_dict.items():
-                # pos = line_lower.find(names["text"])
-                for text in names['text']:
-                    pos = line_lower.find(text)
-                    if pos != -1:
-                        components.append((pos, key, text))
+            # keys can be anywhere in the line, so a plain search is needed
+            for key, texts in meta_index.items():
+                for text in texts:
+                    found = line_lower.find(text)
+                    if found != -1:
+                        components.append((found, key, text))
                         break
+            instrumentation.count('keyword_lookups')
             if components:
                 components.sort(key=lambda x: x[0])
                 vals = find_key_vals_from_position(
@@ -190,23 +215,26 @@ def parse(path):
                 )
                 for x, y in zip(components, vals):
                     meta[x[1]] = y
-                    del meta_dict[x[1]]
+                    meta_index.remove(x[1])
+            else:
+                instrumentation.count('keyword_misses')
 
         # data section
         #
         # data headers
-        line = file.readline()
+        instrumentation.mark('header')
+        line = readline()
         file_headers = re.split(r'\s{2,}', line.strip())
         file_header_locations = [line.find(' ' + header) + 1 for header in file_headers]
         for h in file_headers:
-            txt = next((k for k, v in _DATA_DICT.items() if h.lower() in v['text']), h)
-            head.append(txt)
+            key = _DATA_INDEX.find(h.lower())
+            head.append(h if key is None else key)
 
         # skip line
-        file.readline()
+        readline()
 
         # data header units
-        line = file.readline()
+        line = readline()
         all_units = []
         stated_units = re.split(r'\s{2,}', line.strip())
         for loc in file_header_locations:
@@ -217,18 +245,22 @@ def parse(path):
             all_units.append(unit)
 
         # skip line
-        file.readline()
+        readline()
 
-        # data
-        line = file.readline()
-        while line:
-            data.append(list(map(float, line.split())))
-            line = file.readline()
+        # data, up to the end of the file
+        instrumentation.mark('data')
+        if instrumentation.active() is not None:
+            instrumentation.count('lines', util.count_lines(buffer))
+        errors = [] if tolerant else None
+        data = util.pack_block(head, buffer, [(pos, len(buffer))], decimal=decimal, as_arrays=as_arrays, errors=errors)
+        if tolerant:
+            meta['data_errors'] = errors
 
     # Elaborate and clarify some metadata
+    instrumentation.mark('metadata')
     mass, mass_unit = meta['material_mass'].split()
     temp, temp_unit = meta['temperature'].split()
-    mass, temp = map(float, (mass, temp))
+    mass, temp = (float(value.replace(decimal, '.')) for value in (mass, temp))
 
     # takes care of pressure, loading and other units
     meta['material_mass'] = mass
@@ -256,9 +288,6 @@ def parse(path):
     if meta.get('date'):
         meta['date'] = util.handle_string_date(meta['date'])
 
-    # pack data
-    data = dict(zip(head, map(lambda *x: list(x), *data)))
-
     return meta, data
 
 
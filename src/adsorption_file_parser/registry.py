@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Registry of the available parsers.
+
+Each parser is registered under a ``(manufacturer, fmt)`` key with the
+location of its ``parse`` function, which is only imported when the parser
+is used, and the capabilities it supports.
+
+Parsers from other packages are discovered through the
+``adsorption_file_parser.parsers`` entry point group, where the entry
+point name is ``manufacturer.fmt`` and its value the parse function,
+for example in ``pyproject.toml``::
+
+    [project.entry-points."adsorption_file_parser.parsers"]
+    "acme.txt" = "acme_parser.reader:parse"
+
+Entry points are only read when a parser is not found among the built-in
+ones, or when all parsers are listed.
+"""
+
+from collections import namedtuple
+from importlib import import_module
+
+from adsorption_file_parser import ParsingError
+from adsorption_file_parser import logger
+
+ENTRY_POINT_GROUP = 'adsorption_file_parser.parsers'
+
+# capabilities
+ARRAYS = 'arrays'  # accepts ``as_arrays=True``
+DECIMAL = 'decimal'  # accepts a ``decimal`` option for the decimal mark of numbers
+DETECT = 'detect'  # recognised by ``detect``
+LAYOUT_CACHE = 'layout_cache'  # reuses the layout of previous files
+LANG = 'lang'  # accepts a ``lang`` option for the file encoding
+TOLERANT = 'tolerant'  # accepts ``tolerant=True``, reading bad data values as NaN
+
+
+class ParserSpec(namedtuple('ParserSpec', ['manufacturer', 'fmt', 'target', 'capabilities'])):
+    """
+    Description of a registered parser.
+
+    Parameters
+    ----------
+    manufacturer : str
+        Manufacturer of the apparatus.
+    fmt : str
+        Format of the file.
+    target : str or callable
+        The parse function, or its location as ``'module:function'``.
+    capabilities : frozenset
+        Capabilities of the parser.
+    """
+
+    __slots__ = ()
+
+    def load(self):
+        """Import and return the parse function."""
+        if callable(self.target):
+            return self.target
+        module, _, function = self.target.partition(':')
+        return getattr(import_module(module), function)
+
+    def supports(self, capability):
+        """Whether the parser has a capability."""
+        return capability in self.capabilities
+
+
+_BUILTIN = (
+    ('smsdvs', 'xlsx', 'sms_dvs_excel', (ARRAYS, DETECT)),
+    ('bel', 'csv', 'bel_csv', (ARRAYS, DECIMAL, DETECT, LANG, TOLERANT)),
+    ('bel', 'xl', 'bel_excel', (ARRAYS, DETECT, LAYOUT_CACHE)),
+    ('bel', 'dat', 'bel_dat', (ARRAYS, DETECT, LANG, TOLERANT)),
+    ('mic', 'xl', 'mic_excel', (ARRAYS, DETECT, LAYOUT_CACHE)),
+    ('3p', 'xl', 'trp_excel', (ARRAYS, DETECT)),
+    ('qnt', 'txt-raw', 'qnt_txt', (ARRAYS, DECIMAL, DETECT, TOLERANT)),
+    ('generic', 'csv', 'generic_csv', (ARRAYS, DETECT)),
+    ('generic', 'xls', 'generic_excel', (ARRAYS, DETECT)),
+)
+
+_REGISTRY = {}
+_entry_points_loaded = False
+
+
+def register(manufacturer, fmt, target, capabilities=(), replace=False):
+    """
+    Register a parser.
+
+    Parameters
+    ----------
+    manufacturer : str
+        Manufacturer of the apparatus.
+    fmt : str
+        Format of the file.
+    target : str or callable
+        The parse function, or its location as ``'module:function'``
+        to import it only when used. It is called as
+        ``parse(path, **options)`` and returns ``(meta, data)``.
+    capabilities : iterable, optional
+        Capabilities of the parser, e.g. ``registry.ARRAYS``.
+    replace : bool, optional
+        Whether to replace an existing parser with the same key.
+
+    Returns
+    -------
+    ParserSpec
+        The registered parser.
+    """
+    key = (manufacturer, fmt)
+    if key in _REGISTRY and not replace:
+        raise ParsingError(f"A parser is already registered for '{manufacturer}' '{fmt}'.")
+    spec = ParserSpec(manufacturer, fmt, target, frozenset(capabilities))
+    _REGISTRY[key] = spec
+    return spec
+
+
+def unregister(manufacturer, fmt):
+    """Remove a registered parser."""
+    _REGISTRY.pop((manufacturer, fmt), None)
+
+
+def get_parser(manufacturer, fmt):
+    """
+    Return the parser registered for a manufacturer and format.
+
+    Raises
+    ------
+    ParsingError
+        If no parser is registered.
+    """
+    spec = _REGISTRY.get((manufacturer, fmt))
+    if spec is None and not _entry_points_loaded:
+        _load_entry_points()
+        spec = _REGISTRY.get((manufacturer, fmt))
+    if spec is not None:
+        return spec
+
+    formats = supported_formats()
+    if manufacturer not in formats:
+        raise ParsingError(f'Currently available manufacturers are {list(formats.keys())})')
+    raise ParsingError(f'Currently available formats are {formats[manufacturer]}')
+
+
+def parsers(capability=None):
+    """
+    List all registered parsers, including those from entry points.
+
+    Parameters
+    ----------
+    capability : str, optional
+        Only list parsers with this capability.
+
+    Returns
+    -------
+    list
+        The ``ParserSpec`` of each parser.
+    """
+    if not _entry_points_loaded:
+        _load_entry_points()
+    return [spec for spec in _REGISTRY.values() if capability is None or spec.supports(capability)]
+
+
+def supported_formats():
+    """Return the formats available for each manufacturer."""
+    formats = {}
+    for spec in parsers():
+        formats[spec.manufacturer] = formats.get(spec.manufacturer, ()) + (spec.fmt, )
+    return formats
+
+
+def _load_entry_points():
+    """Register parsers declared by other packages."""
+    global _entry_points_loaded  # pylint: disable=global-statement
+    _entry_points_loaded = True
+
+    from importlib.metadata import entry_points
+    eps = entry_points()
+    if hasattr(eps, 'select'):
+        eps = eps.select(group=ENTRY_POINT_GROUP)
+    else:  # python < 3.10
+        eps = eps.get(ENTRY_POINT_GROUP, [])
+
+    for ep in eps:
+        manufacturer, _, fmt = ep.name.rpartition('.')
+        if not manufacturer or not fmt:
+            logger.warning(f"Ignoring parser entry point '{ep.name}', its name must be 'manufacturer.fmt'.")
+            continue
+        if (manufacturer, fmt) in _REGISTRY:
+            logger.warning(f"Ignoring parser entry point '{ep.name}', the format is already registered.")
+            continue
+        register(manufacturer, fmt, ep.value)
+
+
+for _manufacturer, _fmt, _module, _capabilities in _BUILTIN:
+    register(_manufacturer, _fmt, f'adsorption_file_parser.{_module}:parse', _capabilities)
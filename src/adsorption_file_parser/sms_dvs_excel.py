@@ -1,9 +1,25 @@
 # -*- coding: utf-8 -*-
-"""Parse SMS DVS (.xlsx) output files."""
-import dateutil.parser
-import openpyxl
-
+"""
+Parse SMS DVS (.xlsx) output files.
+
+The isotherm comes from the 'Iso Report' sheet and the metadata from the
+'DVS Data' sheet. Below the metadata, this sheet holds the kinetics: the
+mass, pressures and temperatures recorded during the whole measurement,
+which is the bulk of the file. They are only read with ``kinetics``, and
+are streamed row by row, as values only, into a column per quantity, so
+that memory does not depend on the length of the sheet besides the
+columns returned, which can be reduced by keeping one row in
+``kinetics_every`` or a single row per pressure step.
+"""
+from array import array
+from collections import deque
+from itertools import chain
+
+from adsorption_file_parser import ParsingError
 from adsorption_file_parser.utils import common_utils as util
+from adsorption_file_parser.utils import instrumentation
+from adsorption_file_parser.utils.date_parsing import parse_date
+from adsorption_file_parser.utils.keyword_index import KeywordIndex
 from adsorption_file_parser.utils.unit_parsing import parse_temperature_string
 
 _META_DICT = {
@@ -106,8 +122,17 @@ _META_DICT = {
 
 _DATA_DICT = {}
 
+_KINETICS_START = 'Time [minutes]'
+_KINETICS_MODES = ('all', 'steps')
+# columns holding the set point of each step, by pressure mode
+_KINETICS_TARGETS = ('Target Relative Pressure [%]', 'Target Pressure [Torr]')
+NAN = float('nan')
+
+_META_INDEX = KeywordIndex(_META_DICT)
 
-def parse(path):
+
+@instrumentation.instrumented
+def parse(path, as_arrays=False, kinetics=None, kinetics_every=1):
     """
     Parse an xlsx file analysed through SMS DVS software
     to obtain the isotherm.
@@ -116,6 +141,17 @@ def parse(path):
     ----------
     path: str
         The location of a processed isotherm in Excel.
+    as_arrays : bool, optional
+        Return data columns as numpy arrays instead of lists.
+    kinetics : {None, 'all', 'steps'}, optional
+        Also read the kinetics into ``meta['kinetics']``, a dictionary
+        of columns named by their header in the sheet. With ``'all'``
+        every recorded row is returned, with ``'steps'`` only the last
+        row of each pressure step, with its ``step_start`` time and
+        number of ``step_rows``. Columns are lists, or numpy arrays
+        with ``as_arrays``.
+    kinetics_every : int, optional
+        With ``kinetics='all'``, only keep one row in this many.
 
     Returns
     -------
@@ -124,51 +160,67 @@ def parse(path):
     data : dict
         Isotherm data.
     """
+    import openpyxl
+
+    if kinetics is not None and kinetics not in _KINETICS_MODES:
+        raise ParsingError(f'Kinetics must be one of {_KINETICS_MODES} or None, not {kinetics!r}.')
+    if kinetics_every < 1:
+        raise ParsingError('Kinetics must keep at least one row in `kinetics_every`.')
+
     meta = {}
     data = {}
 
     # open the workbook
     workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
 
-    # local for efficiency
-    meta_dict = _META_DICT.copy()
+    # keys already found are removed from the index
+    meta_index = _META_INDEX.copy()
 
     # First get metadata/kinetics
+    instrumentation.mark('metadata')
     rawdata_sheet = workbook['DVS Data']
-    # we know data is left-aligned
-    # so we only iterate rows
-    for row in rawdata_sheet.rows:
-
-        # if first cell is not filled -> blank row
-        cell_value = row[0]
-        if not cell_value.value:
-            continue
-
-        # We do not take kinetics for the moment
-        if cell_value.value == 'Time [minutes]':  # If "kinetic data" section
-            break
-
-        key = cell_value.value.lower()
-        try:
-            key = util.search_key_in_def_dict(key, meta_dict)
-        except StopIteration:
-            continue
-
-        ref = meta_dict[key]['xl_ref']
-        tp = meta_dict[key]['type']
-
-        # handle different data types
-        val = rawdata_sheet.cell(cell_value.row + ref[0], cell_value.column + ref[1]).value
-        if val == '':
-            meta[key] = None
-        elif tp == 'numeric':
-            meta[key] = val
-        elif tp == 'string':
-            meta[key] = util.handle_excel_string(val)
-        elif tp == 'date':
-            meta[key] = _handle_dvs_date(val)
-
-        del meta_dict[key]  # delete for efficiency
+    # read-only sheets are parsed again on each random access,
+    # so each sheet is read in a single pass over the row values
+    rows = rawdata_sheet.iter_rows(values_only=True)
+    try:
+        # we know data is left-aligned
+        # so we only iterate rows
+        for values in rows:
+            instrumentation.count('cells', len(values))
+
+            # if first cell is not filled -> blank row
+            label = _cell(values, 0)
+            if not label:
+                continue
+
+            if label == _KINETICS_START:  # If "kinetic data" section
+                if kinetics is not None:
+                    meta['kinetics'] = _parse_kinetics(rows, values, kinetics, kinetics_every, as_arrays)
+                break
+
+            key = meta_index.find(label.lower())
+            if key is None:
+                continue
+
+            # values are on the row of their label
+            ref = _META_DICT[key]['xl_ref']
+            tp = _META_DICT[key]['type']
+
+            # handle different data types
+            val = _cell(values, ref[1])
+            if val == '':
+                meta[key] = None
+            elif tp == 'numeric':
+                meta[key] = val
+            elif tp == 'string':
+                meta[key] = util.handle_excel_string(val)
+            elif tp == 'date':
+                meta[key] = _handle_dvs_date(val)
+
+            meta_index.remove(key)
+    finally:
+        # the rest of the sheet is not parsed
+        rows.close()
 
     # Then get data and some remaining metadata
     book = None
@@ -182,27 +234,42 @@ def parse(path):
     iso_sheet = workbook[book]
 
     # data is randomly distributed
-    # all has to be iterated
-    for row in iso_sheet.rows:
-        for cell in row:
-            if not cell.value:
-                continue
-
-            if cell.value == 'Temp:':
-                temp = iso_sheet.cell(cell.row, cell.column + 1).value
-                comp = temp.split()
-                meta['temperature'] = float(comp[0])
-                meta['temperature_unit'] = parse_temperature_string(comp[1])
-
-            elif cell.value == 'Cycle 1':
-                head, unit = _parse_header(iso_sheet, cell.row - 2, cell.column + 1)
-                meta.update(unit)
-                data = _parse_data(iso_sheet, cell.row, head)
-                data = _sort_data(data, head)
-
-                # TODO other cycles
-                # Finished for now
+    # all has to be iterated, the header is kept
+    # as the two rows above the first data row
+    above = deque(maxlen=2)
+    rows = iso_sheet.iter_rows(values_only=True)
+    try:
+        for values in rows:
+            instrumentation.count('cells', len(values))
+            for col, value in enumerate(values):
+                if not value:
+                    continue
+
+                if value == 'Temp:':
+                    temp = _cell(values, col + 1)
+                    comp = temp.split()
+                    meta['temperature'] = float(comp[0])
+                    meta['temperature_unit'] = parse_temperature_string(comp[1])
+
+                elif value == 'Cycle 1':
+                    instrumentation.mark('header')
+                    head, unit = _parse_header(above, col + 1)
+                    meta.update(unit)
+                    instrumentation.mark('data')
+                    data = _parse_data(values, rows, head)
+                    data = _sort_data(data, head)
+                    break
+
+            # TODO other cycles
+            # Finished for now
+            if data and 'temperature' in meta:
                 break
+            above.append(values)
+    finally:
+        rows.close()
+
+    if as_arrays:
+        data = _pack_arrays(data)
 
     # Set extra metadata
     meta['material_mass_unit'] = 'mg'
@@ -212,19 +279,21 @@ def parse(path):
     return meta, data
 
 
-def _parse_header(sheet, row, col):
+def _parse_header(rows, col):
     """
     Parse a header DVS header.
 
-    Starts at the upper left corner (at "Target").
+    Takes the two rows above the data, the first one holding "Target"
+    in column ``col``.
 
     """
+    rows = [()] * (2 - len(rows)) + list(rows)
 
     headers = {}
     units = {}
 
     # determine pressure mode
-    pressure_mode = sheet.cell(row + 1, col).value
+    pressure_mode = _cell(rows[1], col)
     if pressure_mode == '% P/Po':
         units['pressure_mode'] = 'relative%'
         units['pressure_unit'] = None
@@ -234,7 +303,7 @@ def _parse_header(sheet, row, col):
     headers['pressure_target'] = col
 
     # determine target/actual display
-    pressure_output = sheet.cell(row, col + 1).value
+    pressure_output = _cell(rows[0], col + 1)
     if pressure_output == 'Actual':
         headers['pressure_actual_ads'] = col + 1
         headers['loading_ads'] = col + 2
@@ -251,23 +320,20 @@ def _parse_header(sheet, row, col):
     return headers, units
 
 
-def _parse_data(sheet, row, head):
-    """Return start and stop points for adsorption and desorption."""
+def _parse_data(first, rows, head):
+    """Read the data rows, from the ``first`` until the pressure target column is empty."""
 
     data = {k: [] for k in head}
 
     # pressure_target column
     col = head['pressure_target']
-    while True:
-        text = sheet.cell(row, col).value
-        if text is None:
-            break
-
-        rowdata = sheet[row]
+    values = first
+    while _cell(values, col) is not None:
         for key, kcol in head.items():
-            data[key].append(rowdata[kcol - 1].value)
+            data[key].append(_cell(values, kcol))
 
-        row += 1
+        values = next(rows, ())
+        instrumentation.count('cells', len(values))
 
     return data
 
@@ -295,7 +361,109 @@ def _sort_data(data, head):
     return ds
 
 
+def _parse_kinetics(rows, head, mode, every, as_arrays):
+    """
+    Stream the kinetics block, the rows after its ``head``, into columns.
+
+    Columns are typed on the first row: numbers are collected in
+    ``array('d')``, with NaN for missing values, text columns in lists.
+    They are returned as lists, or numpy arrays with ``as_arrays``.
+    The block ends at the first row without a time, blank or
+    a warning that the rest of the kinetics were not exported.
+    """
+    names = [(index, name) for index, name in enumerate(head) if name]
+    return _read_kinetics(rows, names, mode, every, as_arrays)
+
+
+def _read_kinetics(rows, names, mode, every, as_arrays):
+    """Read kinetics columns from an iterator of row values."""
+    first = next(rows, None) or ()
+    numeric = [index >= len(first) or first[index] is None or _is_number(first[index]) for index, _ in names]
+    columns = [array('d') if is_numeric else [] for is_numeric in numeric]
+    fields = list(zip(names, numeric, columns))
+
+    def append(values):
+        width = len(values)
+        for (index, _), is_numeric, column in fields:
+            value = values[index] if index < width else None
+            if is_numeric and type(value) is not float:
+                value = _to_float(value)
+            column.append(value)
+
+    rows = chain((first, ), rows)
+    if mode == 'all':
+        for count, values in enumerate(rows):
+            if not values or not _is_number(values[0]):
+                break
+            instrumentation.count('cells', len(values))
+            if count % every == 0:
+                append(values)
+        kinetics = {name: column for (_, name), column in zip(names, columns)}
+    else:
+        target = next((index for index, name in names if name in _KINETICS_TARGETS), None)
+        if target is None:
+            raise ParsingError(f'Kinetics steps require one of the columns {_KINETICS_TARGETS}.')
+        starts = array('d')
+        sizes = array('q')
+        last = None
+        for values in rows:
+            if not values or not _is_number(values[0]):
+                break
+            instrumentation.count('cells', len(values))
+            if last is None or _cell(values, target) != _cell(last, target):
+                # a new step, the previous one ended on the last row
+                if last is not None:
+                    append(last)
+                starts.append(_to_float(values[0]))
+                sizes.append(0)
+            sizes[-1] += 1
+            last = values
+        if last is not None:
+            append(last)
+        kinetics = {name: column for (_, name), column in zip(names, columns)}
+        kinetics['step_start'] = starts
+        kinetics['step_rows'] = sizes
+
+    if as_arrays:
+        np = util.import_numpy()
+        return {
+            name: np.array(column, dtype=np.int64 if column.typecode == 'q' else np.float64)
+            if isinstance(column, array) else column
+            for name, column in kinetics.items()
+        }
+    # lists, which can be written to JSON like the data
+    return {name: column.tolist() if isinstance(column, array) else column for name, column in kinetics.items()}
+
+
+def _cell(values, col):
+    """The value of a column of a row, None past the end of the row."""
+    return values[col] if col < len(values) else None
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _to_float(value):
+    """A numeric cell as a float, NaN if empty or not a number."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+def _pack_arrays(data):
+    """Convert data columns to numpy arrays, keeping the branch as integers."""
+    packed = {}
+    for key, values in data.items():
+        if key == 'branch':
+            packed[key] = util.pack_branch((values.count(0), values.count(1)), True)
+        else:
+            packed[key] = util.pack_column(values, True)
+    return packed
+
+
 def _handle_dvs_date(text):
     if text == 'N/A':
         return None
-    return dateutil.parser.parse(text.replace(' UTC ', '')).isoformat()
+    return parse_date(text.replace(' UTC ', ''))
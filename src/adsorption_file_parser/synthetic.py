@@ -0,0 +1,562 @@
+# -*- coding: utf-8 -*-
+"""
+Generate files of each supported format with any number of points.
+
+The files are meant for benchmarks and scaling tests, and are read back
+by the matching parser with exactly the requested number of points.
+Every writer is called as::
+
+    writer(path, points, meta_fields=0, branches='ads-des')
+
+where ``meta_fields`` is a number of extra metadata fields, labelled
+``Extra field 1``, ``Extra field 2``... with values ``value 1``...,
+and ``branches`` the layout of the isotherm: ``'ads-des'`` for
+an adsorption branch followed by a desorption branch with half
+of the points, or ``'ads'`` for an adsorption branch only.
+
+The content is deterministic, so a generated file can be reused
+between runs. Writers for all parsers are listed in ``WRITERS``,
+and ``write`` selects one by parser name.
+"""
+
+import datetime
+import math
+
+SATURATION = 101.3  # kPa
+
+# branch layouts
+ADS_DES = 'ads-des'
+ADS = 'ads'
+BRANCHES = (ADS_DES, ADS)
+
+
+def isotherm(points, branches=ADS_DES):
+    """
+    Relative pressure and loading of a type I isotherm.
+
+    Parameters
+    ----------
+    points : int
+        Total number of points.
+    branches : str
+        Branch layout, see ``BRANCHES``.
+
+    Returns
+    -------
+    n_ads : int
+        Number of adsorption points, the first ones.
+    relative : list
+        Relative pressures, adsorption then desorption.
+    loading : list
+        Loading at each pressure.
+    """
+    if branches == ADS_DES:
+        n_ads = math.ceil(points / 2)
+    elif branches == ADS:
+        n_ads = points
+    else:
+        raise ValueError(f'Unknown branch layout {branches!r}, must be one of {BRANCHES}.')
+    n_des = points - n_ads
+    ads = [0.99 * (i + 1) / n_ads for i in range(n_ads)]
+    des = [0.99 * (i + 1) / (n_des + 1) for i in range(n_des)][::-1]
+    relative = ads + des
+    loading = [10 * p / (0.05 + p) + (0.2 * p if i >= n_ads else 0) for i, p in enumerate(relative)]
+    return n_ads, relative, loading
+
+
+def extra_fields(meta_fields):
+    """Labels and values of the extra metadata fields."""
+    return [(f'Extra field {i}', f'value {i}') for i in range(1, meta_fields + 1)]
+
+
+def bel_dat(path, points, meta_fields=0, branches=ADS_DES, lang='ENG'):
+    """BEL .DAT file, in English (cp1252) or Japanese (shift_jis) with ``lang='JPN'``."""
+    n_ads, relative, loading = isotherm(points, branches)
+    if lang == 'ENG':
+        encoding = 'cp1252'
+        lines = [
+            '====================',
+            ' System property Ver1.2.6',
+            '====================',
+            '"Instrument S/N:"\t00218',
+            '"Vs/ml:"\t27.698',
+            '=======================',
+            ' Measurement condition',
+            '=======================',
+            '"Adsorptive:"\tN2',
+            '"Meas. Temp./K:"\t77.00',
+            '"Equilibrium time/sec:"\t300',
+            '====================',
+            ' Sample information',
+            '====================',
+            '"Sample weight/g:"\t0.10000',
+            '"Comment1:"\t"synthetic"',
+            '"Comment2:"\t"benchmark"',
+        ]
+        times = [
+            '====================',
+            ' Time and dead volume',
+            '====================',
+            '"Date of measurement:"\t20/06/03',
+            '"Time of measurement:"\t12:00:00',
+        ]
+        titles = ('Adsorption data', 'Desorption data')
+    elif lang == 'JPN':
+        encoding = 'shift_jis'
+        lines = [
+            '====================',
+            ' 装置情報 BELSORP-max Ver1.3.1',
+            '====================',
+            '"装置Ｓ／Ｎ："\t00356',
+            '"基準容積／ml："\t27.531',
+            '====================',
+            ' 測定条件',
+            '====================',
+            '"吸着質名称："\tN2',
+            '"吸着温度／Ｋ："\t77.00',
+            '"平衡時間／sec："\t300',
+            '====================',
+            ' サンプル情報',
+            '====================',
+            '"試料重量／g："\t0.10000',
+            '"コメント１："\t"synthetic"',
+            '"コメント２："\t"benchmark"',
+        ]
+        times = [
+            '====================',
+            ' 時間、死容積など',
+            '====================',
+            '"測定開始日："\t20/06/03',
+            '"測定時間："\t12:00:00',
+        ]
+        titles = ('吸着データ', '脱着データ')
+    else:
+        raise ValueError("Unknown language/encoding option.")
+
+    lines += [f'"{label}:"\t"{value}"' for label, value in extra_fields(meta_fields)]
+    lines += times
+    header = '"No."\t"Pe/kPa"\t"P0/kPa"\t"Vd/ml"\t"V/ml(STP) g-1"'
+    for title, start, stop in ((titles[0], 0, n_ads), (titles[1], n_ads, points)):
+        lines += ['====================', f' {title}', '====================', header]
+        lines += [
+            f'{i - start + 1}\t{relative[i] * SATURATION:.4E}\t{SATURATION:.2f}\t41.331\t{loading[i]:.4E}'
+            for i in range(start, stop)
+        ]
+        lines.append('0\t0\t0\t0\t0')
+    _write_lines(path, lines, encoding)
+
+
+def bel_csv(path, points, meta_fields=0, branches=ADS_DES):
+    """BEL .csv file, in English."""
+    n_ads, relative, loading = isotherm(points, branches)
+    lines = [
+        'File Name,synthetic.DAT',
+        'Date of measurement,23.08.2019',
+        'Time of measurement,32:50:14',
+        'COMMENT1,synthetic',
+        'COMMENT2,benchmark',
+        'S/N,HP-102',
+        'Sample weight,0.1000,[g]',
+        'Standard volume,24.847,[cm^3]',
+        'Dead volume,15.669,[cm^3]',
+        'Equilibrium time,300,[SEC]',
+        'Adsorptive,N2',
+        'Adsorption temperature,77.000,[K]',
+        f'Saturated vapor pressure,{SATURATION},[kPa]',
+    ]
+    lines += [f'{label},{value}' for label, value in extra_fields(meta_fields)]
+    lines += [
+        '',
+        'No,pi/ kPa,pe/ kPa,pe2/ kPa,p0/ kPa,p/p0,Va/cm^3(STP) g^-1',
+        'ADS',
+    ]
+    for i in range(points):
+        if i == n_ads:
+            lines.append('DES')
+        pressure = relative[i] * SATURATION
+        lines.append(
+            f'{i + 1},{pressure * 1.1:.5G},{pressure:.5G},{pressure:.5G},{SATURATION},{relative[i]:.4E},{loading[i]:.5G}'
+        )
+    if n_ads == points:
+        lines.append('DES')
+    _write_lines(path, lines, 'ISO-8859-1')
+
+
+def bel_xl(path, points, meta_fields=0, branches=ADS_DES):
+    """BEL .xls report, with an 'AdsDes' sheet."""
+    import xlwt
+
+    n_ads, relative, loading = isotherm(points, branches)
+    _check_xls_rows(points + meta_fields + 24)
+    book = xlwt.Workbook()
+    sheet = book.add_sheet('AdsDes')
+    date_style = xlwt.easyxf(num_format_str='yyyy/mm/dd')
+    rows = (
+        ('[Adsorption / desorption isotherm]', ),
+        ('File Name', None, 'synthetic.DAT'),
+        ('Date of measurement', None, datetime.datetime(2018, 6, 11)),
+        ('Time of measurement', None, 0.8211458333333334),
+        ('COMMENT1', None, 'synthetic'),
+        ('COMMENT2', None, 'benchmark'),
+        ('COMMENT3', ),
+        ('COMMENT4', ),
+        ('Serial number', None, '00218'),
+    ) + tuple((label, None, value) for label, value in extra_fields(meta_fields)) + (
+        (),
+        (),
+        ('Sample weight', None, 0.1, '[g]'),
+        ('Standard volume', None, 9.057, '[cm3]'),
+        ('Dead volume', None, 11.242, '[cm3]'),
+        ('Equilibrium time', None, 300, '[sec]'),
+        ('Adsorptive', None, 'N2'),
+        ('Adsorption temperature', None, 77.0, '[K]'),
+        (),
+        (),
+        ('No', ' pi /kPa', ' pe /kPa', ' pe2 /kPa', ' p0 /kPa', 'p/p0', 'Va/cm3(STP) g-1'),
+        ('ADS', ),
+    )
+    for row, values in enumerate(rows):
+        for col, value in enumerate(values):
+            if isinstance(value, datetime.datetime):
+                sheet.write(row, col, value, date_style)
+            elif value is not None:
+                sheet.write(row, col, value)
+
+    row = len(rows)
+    for i in range(points):
+        if i == n_ads:
+            sheet.write(row, 0, 'DES')
+            row += 1
+        pressure = relative[i] * SATURATION
+        for col, value in enumerate((i + 1, 0.0, pressure, 0.0, SATURATION, relative[i], loading[i])):
+            sheet.write(row, col, value)
+        row += 1
+    if n_ads == points:
+        sheet.write(row, 0, 'DES')
+    book.save(str(path))
+
+
+def mic_xl(path, points, meta_fields=0, branches=ADS_DES):
+    """Micromeritics .xls report, with an 'Isotherm Tabular Report' block."""
+    import xlwt
+
+    _, relative, loading = isotherm(points, branches)
+    _check_xls_rows(max(points + 29, meta_fields + 21))
+    book = xlwt.Workbook()
+    sheet = book.add_sheet('Sheet1')
+    cells = (
+        (0, 0, 'Micromeritics Instrument Corporation'),
+        (1, 0, 'TriStar II 3020 3.02'),
+        (1, 1, 'TriStar II 3020 Version 3.02'),
+        (2, 1, 'Serial # 1105  Unit 1  Port 1'),
+        (5, 0, 'Sample:'),
+        (5, 1, 'synthetic'),
+        (6, 0, 'Operator:'),
+        (6, 1, 'benchmark'),
+        (11, 0, 'Started:'),
+        (11, 1, '6/17/2017 12:27:21 PM'),
+        (11, 2, 'Analysis Adsorptive:'),
+        (11, 3, 'N2'),
+        (12, 0, 'Completed:'),
+        (12, 1, '6/17/2017 8:07:48 PM'),
+        (12, 2, 'Analysis Bath Temp.:'),
+        (12, 3, '77.300 K'),
+        (13, 0, 'Report Time:'),
+        (13, 1, '6/17/2017 8:07:48 PM'),
+        (14, 0, 'Sample Mass:'),
+        (14, 1, '0.1013 g'),
+        (20, 0, 'Comments: A synthetic sample'),
+        (25, 5, 'Isotherm Tabular Report'),
+        (27, 5, 'Relative Pressure (P/Po)'),
+        (27, 6, 'Absolute Pressure (mmHg)'),
+        (27, 7, 'Quantity Adsorbed (cm³/g STP)'),
+        (27, 8, 'Elapsed Time (h:min)'),
+        (27, 9, 'Saturation Pressure (mmHg)'),
+        (28, 8, '00:30'),
+        (28, 9, 760.0),
+    )
+    for row, col, value in cells:
+        sheet.write(row, col, value)
+    # extra fields go below the comments, left of the data block
+    for row, (label, value) in enumerate(extra_fields(meta_fields), start=21):
+        sheet.write(row, 0, f'{label}:')
+        sheet.write(row, 1, value)
+    for i in range(points):
+        row = 29 + i
+        minutes = 32 + 2 * i
+        for col, value in enumerate(
+            (relative[i], relative[i] * 760.0, loading[i] * 20, f'{minutes // 60:02d}:{minutes % 60:02d}', 760.0),
+            start=5,
+        ):
+            sheet.write(row, col, value)
+    book.save(str(path))
+
+
+def qnt_txt(path, points, meta_fields=0, branches=ADS_DES):
+    """Quantachrome raw data .txt file."""
+    _, relative, loading = isotherm(points, branches)
+    lines = [
+        '                       Quantachrome NovaWin - Data Acquisition and Reduction',
+        '                                        for NOVA instruments',
+        '                                ©1994-2013, Quantachrome Instruments',
+        '                                           version 11.03',
+        '',
+        'Analysis                                          Report',
+        'Operator:      synthetic      Date:2020/07/01     Operator: synthetic           Date:2021/02/18',
+        'Sample ID:     synthetic           Filename:      synthetic.qps',
+        'Sample Desc:                       Comment:',
+        'Sample weight: 0.032 g             Sample Volume: 1 cc',
+        'Outgas Time:   20.0 hrs            OutgasTemp:    120.0 C',
+        'Analysis gas:  Nitrogen            Bath Temp:     77.3 K',
+        'Press. Tolerance:0.100/0.100 (ads/des)Equil time: 120/120 sec (ads/des)Equil timeout:240/240 sec (ads/des)',
+        'Analysis Time: 748.4 min           End of run:    2020/07/01 4:16:54  Instrument:    Nova Station C',
+        'Cell ID:       0',
+    ]
+    lines += [f'{label + ":":<15}{value}' for label, value in extra_fields(meta_fields)]
+    lines += [
+        '',
+        '              P/Po                             Po                         Volume @ STP',
+        '',
+        '                                              Torr                             cc',
+        '',
+    ]
+    lines += [f'{relative[i]:>23.6f}{760.0:>28.2f}{loading[i]:>34.4f}' for i in range(points)]
+    _write_lines(path, lines, 'cp1252')
+
+
+def sms_dvs_xlsx(path, points, meta_fields=0, branches=ADS_DES, kinetics=5):
+    """SMS DVS .xlsx file, with ``kinetics`` recorded rows per isotherm point."""
+    import openpyxl
+
+    n_ads, relative, loading = isotherm(points, branches)
+    book = openpyxl.Workbook(write_only=True)
+
+    sheet = book.create_sheet('Iso Report')
+    for _ in range(2):
+        sheet.append([])
+    sheet.append([None, None, 'DVS Isotherm Analysis Report'])
+    for _ in range(6):
+        sheet.append([])
+    sheet.append([None, None, 'Temp:', '30.0 °C'])
+    for _ in range(2):
+        sheet.append([])
+    sheet.append([None, None, None, 'Target', 'Actual', 'Sorp Mass', 'Actual', 'Desorp Mass'])
+    sheet.append([None, None, None, '% P/Po', '% P/Po', 'Change (%)', '% P/Po', 'Change (%)', 'Hysteresis'])
+    # each row holds one adsorption and one desorption point at the same target
+    for i in range(n_ads):
+        target = relative[i] * 100
+        row = [None, None, 'Cycle 1' if i == 0 else None, target, target * 1.001, loading[i]]
+        j = points - 1 - i
+        if j >= n_ads:
+            row += [target * 0.999, loading[j], loading[j] - loading[i]]
+        else:
+            # write-only sheets are unsized, the last column keeps rows full width
+            row += [None, None, 0.0]
+        sheet.append(row)
+
+    sheet = book.create_sheet('DVS Data')
+    meta = (
+        ('DVS-Vacuum-Data-File', ),
+        ('File Version:', '1.2'),
+        ('Method Name:', 'synthetic'),
+        ('Sample Name:', 'synthetic'),
+        ('Initial Mass [mg]:', 32.6372),
+        ('Raw Data File Created:', '2020-08-03 16:23:44 UTC +01:00'),
+        ('User Name:', 'benchmark'),
+        ('Vapour:', 'Water 30C'),
+        ('Vapour Pressure [Torr]:', 31.8),
+        ('Ref. Mass', 31.7852),
+    ) + tuple((f'{label}:', value) for label, value in extra_fields(meta_fields)) + (
+        ('Time [minutes]', 'Mass [mg]', 'Target Relative Pressure [%]', 'Actual Relative Pressure [%]'),
+    )
+    for row in meta:
+        sheet.append(row)
+    for step in range(points):
+        for k in range(kinetics):
+            minute = (step * kinetics + k) * 0.5
+            sheet.append([minute, 31.7852 * (1 + loading[step] / 100), relative[step] * 100, relative[step] * 100])
+    book.save(path)
+
+
+def trp_xl(path, points, meta_fields=0, branches=ADS_DES):
+    """3P .xlsx export, with 'Summary' and 'Isotherm' sheets."""
+    import openpyxl
+
+    n_ads, relative, loading = isotherm(points, branches)
+    book = openpyxl.Workbook(write_only=True)
+    sheet = book.create_sheet('Summary')
+    for row in (
+        ('Project', ''),
+        ('Sample', 'synthetic'),
+        ('Charge Name', 'ICC-00064'),
+        ('Adsorbate', 'N2'),
+        ('Sample Weight', '0,0304(g)'),
+        ('Started Time', '2022-07-06 10:52:04'),
+        ('Stoped Time', '2022-07-06 16:08:23'),
+    ) + tuple(extra_fields(meta_fields)):
+        sheet.append(row)
+
+    sheet = book.create_sheet('Isotherm')
+    sheet.append(['Charge NumberICC-00064'])
+    sheet.append(['ID', 'p (kPa)', 'p/p0', 'V (cm³/g STP)', 'p0 (kPa)', 'Time'])
+    for i in range(points):
+        if i == n_ads:
+            sheet.append(['---'] * 6)
+        seconds = 40000 + 30 * i
+        clock = f'{seconds // 3600 % 24:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}'
+        sheet.append([i + 1, relative[i] * SATURATION, relative[i], loading[i] * 20, SATURATION, clock])
+    book.save(path)
+
+
+def trp_xml(path, points, meta_fields=0, branches=ADS_DES):
+    """3P .jwgbt (XML) file."""
+    from xml.sax.saxutils import escape
+    from xml.sax.saxutils import quoteattr
+
+    n_ads, relative, _ = isotherm(points, branches)
+    extra = ''.join(
+        f'<{label.title().replace(" ", "")}>{escape(value)}</{label.title().replace(" ", "")}>'
+        for label, value in extra_fields(meta_fields)
+    )
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>',
+        '<doc Ver="1">',
+        '    <General Ver="1"><GeneralConfig><AdsorbGas>N2</AdsorbGas><AdsorbTemp>77,35</AdsorbTemp></GeneralConfig></General>',
+        '    <StationConfig Ver="1"><Station><Name>sync440</Name><Model>Sync440A</Model></Station></StationConfig>',
+        '    <Config Ver="1">',
+        '        <Base><StartTime>2022-07-06 10:52:04</StartTime><CompletedTime>2022-07-06 16:08:23</CompletedTime></Base>',
+        '        <SampleInfo><SampleName>synthetic</SampleName><SampleNum>ICC-00064</SampleNum>'
+        '<DegasCondition>vac 250</DegasCondition><SampleWeight>0.030400</SampleWeight>'
+        f'<Operator>benchmark</Operator>{extra}</SampleInfo>',
+        '    </Config>',
+        '    <Data>',
+    ]
+    for tag, start, stop in (('Adsorb', 0, n_ads), ('Doff', n_ads, points)):
+        lines.append(f'        <{tag}>')
+        for i in range(start, stop):
+            seconds = 40000 + 30 * i
+            attributes = {
+                'ID': f'{i + 1}_1',
+                'Pd': f'{relative[i] * SATURATION:.16f}',
+                'Pcd': '0.0909305451248286',
+                'PdT': '26.1886015106431671',
+                'PcdT': '26.1886015106431671',
+                'Day': '2022-07-06',
+                'Time': f'{seconds // 3600 % 24:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}',
+                'P0': f'{SATURATION:.16f}',
+                'Balance': '0',
+                'SubIndex': '1',
+            }
+            text = ' '.join(f'{k}={quoteattr(v)}' for k, v in attributes.items())
+            lines.append(f'            <Item {text}/>')
+        lines.append(f'        </{tag}>')
+    lines += ['    </Data>', '</doc>']
+    _write_lines(path, lines, 'utf-8')
+
+
+def generic_csv(path, points, meta_fields=0, branches=ADS_DES):
+    """Generic CSV isotherm file."""
+    n_ads, relative, loading = isotherm(points, branches)
+    lines = [
+        '_parser_version,1.0',
+        '_exptl_adsorptive,nitrogen',
+        '_exptl_temperature,77.0',
+        '_adsnt_material_id,synthetic',
+        '_mode_pressure,absolute',
+        '_basis_material,mass',
+        '_units_pressure,bar',
+        '_basis_loading,molar',
+        '_units_loading,mmol',
+        '_units_mass,g',
+        '_units_temperature,K',
+    ]
+    lines += [f'{_generic_key(label)},{value}' for label, value in extra_fields(meta_fields)]
+    lines += [
+        'data:[pressure,loading,branch]',
+        'pressure,loading,branch',
+    ]
+    lines += [
+        f'{relative[i]:.6g},{loading[i]:.6g},{"ads" if i < n_ads else "des"}'
+        for i in range(points)
+    ]
+    _write_lines(path, lines, 'utf-8')
+
+
+def generic_xl(path, points, meta_fields=0, branches=ADS_DES):
+    """Generic .xls isotherm file, with 'data' and 'metadata' sheets."""
+    import xlwt
+
+    n_ads, relative, loading = isotherm(points, branches)
+    _check_xls_rows(max(points + 2, meta_fields + 5))
+    book = xlwt.Workbook()
+    sheet = book.add_sheet('data')
+    sheet.write(0, 0, 'isotherm type')
+    sheet.write(0, 1, 'data')
+    for col, header in enumerate(('pressure', 'pressure_saturation', 'loading', 'branch')):
+        sheet.write(1, col, header)
+    for i in range(points):
+        for col, value in enumerate((relative[i], 1.0, loading[i], 'ads' if i < n_ads else 'des')):
+            sheet.write(i + 2, col, value)
+
+    sheet = book.add_sheet('metadata')
+    for row, (name, value) in enumerate((
+        ('_exptl_adsorptive', 'nitrogen'),
+        ('_exptl_temperature', 77.0),
+        ('_units_pressure', 'bar'),
+        ('_units_loading', 'mmol/g'),
+        ('_adsnt_material_id', 'synthetic'),
+    ) + tuple((_generic_key(label), value) for label, value in extra_fields(meta_fields))):
+        sheet.write(row, 0, name)
+        sheet.write(row, 1, value)
+    book.save(str(path))
+
+
+# parser module, writer and file extension, with the largest file
+# a format can hold (the xls row limit)
+WRITERS = {
+    'bel_dat': (bel_dat, '.DAT', None),
+    'bel_csv': (bel_csv, '.csv', None),
+    'bel_excel': (bel_xl, '.xls', 65000),
+    'mic_excel': (mic_xl, '.xls', 65000),
+    'qnt_txt': (qnt_txt, '.txt', None),
+    'sms_dvs_excel': (sms_dvs_xlsx, '.xlsx', None),
+    'trp_excel': (trp_xl, '.xlsx', None),
+    'trp_xml': (trp_xml, '.jwgbt', None),
+    'generic_csv': (generic_csv, '.csv', None),
+    'generic_excel': (generic_xl, '.xls', 65000),
+}
+
+
+def write(parser, path, points, **options):
+    """
+    Write a file read by a parser.
+
+    Parameters
+    ----------
+    parser : str
+        Name of the parser module, one of ``WRITERS``.
+    path : str
+        Where the file is written. Its extension is not checked.
+    points : int
+        Number of points of the isotherm.
+    options :
+        Writer options, e.g. ``meta_fields`` or ``branches``.
+    """
+    if parser not in WRITERS:
+        raise ValueError(f'No file generator for {parser!r}, available ones are {list(WRITERS)}.')
+    WRITERS[parser][0](path, points, **options)
+
+
+def _generic_key(label):
+    return '_' + label.lower().replace(' ', '_')
+
+
+def _write_lines(path, lines, encoding):
+    with open(path, 'w', encoding=encoding, newline='\n') as file:
+        file.write('\n'.join(lines))
+        file.write('\n')
+
+
+def _check_xls_rows(rows):
+    if rows > 65536:
+        raise ValueError(f'An xls sheet cannot hold {rows} rows.')
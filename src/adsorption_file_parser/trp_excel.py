@@ -1,11 +1,11 @@
 # -*- coding: utf-8 -*-
 """Parse 3P xlsx output files."""
 
-import openpyxl
-
 from adsorption_file_parser import logger
 from adsorption_file_parser.utils import common_utils as util
+from adsorption_file_parser.utils import instrumentation
 from adsorption_file_parser.utils import unit_parsing
+from adsorption_file_parser.utils.keyword_index import KeywordIndex
 
 _META_DICT = {
     'material': {
@@ -47,8 +47,12 @@ _DATA_DICT = {
     },
 }
 
+_META_INDEX = KeywordIndex(_META_DICT)
+_DATA_INDEX = KeywordIndex(_DATA_DICT)
+
 
-def parse(path):
+@instrumentation.instrumented
+def parse(path, as_arrays=False):
     """
     Parse an xls file generated by 3P software.
 
@@ -56,6 +60,8 @@ def parse(path):
     ----------
     path: str
         The location of an xls file generated by a 3P instrument.
+    as_arrays : bool, optional
+        Return numeric data columns as numpy arrays instead of lists.
 
     Returns
     -------
@@ -64,17 +70,20 @@ def parse(path):
     data : dict
         Isotherm data.
     """
+    import openpyxl
+
     meta = {}
     data = {}
 
     # open the workbook
     workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
 
-    # local for efficiency
-    meta_dict = _META_DICT.copy()
+    # keys already found are removed from the index
+    meta_index = _META_INDEX.copy()
 
     # Metadata
     # Sheet may be named 'Info' or 'Summary'
+    instrumentation.mark('metadata')
     try:
         info_sheet = workbook['Info']
     except KeyError:
@@ -82,6 +91,7 @@ def parse(path):
     # we know data is left-aligned
     # so we only iterate rows
     for row in info_sheet.rows:
+        instrumentation.count('cells', len(row))
 
         # if first cell is not filled -> blank row
         first_cell = row[0]
@@ -90,15 +100,14 @@ def parse(path):
 
         cell_value = first_cell.value.lower()
         val = row[1].value
-        try:
-            key = util.search_key_in_def_dict(cell_value, meta_dict)
-        except StopIteration:
+        key = meta_index.find(cell_value)
+        if key is None:
             if val:
                 key = cell_value.replace(' ', '_')
                 meta[key] = val
             continue
 
-        tp = meta_dict[key]['type']
+        tp = _META_DICT[key]['type']
 
         if val is None:
             meta[key] = None
@@ -109,9 +118,10 @@ def parse(path):
         elif tp == 'string':
             meta[key] = util.handle_excel_string(val)
 
-        del meta_dict[key]  # delete for efficiency
+        meta_index.remove(key)
 
     # Data
+    instrumentation.mark('header')
     data_sheet = workbook['Isotherm']
     # Data headers
     data_val = data_sheet.values
@@ -121,8 +131,11 @@ def parse(path):
     head, units = _parse_header(list(row))
     meta.update(units)
     # Parse and pack data
-    data = _parse_data(data_val)
-    data = dict(zip(head, map(lambda *x: list(x), *data)))
+    instrumentation.mark('data')
+    branches, rows = _parse_data(data_val)
+    instrumentation.count('cells', len(head) * len(rows))
+    columns = [util.pack_column(column, as_arrays) for column in zip(*rows)]
+    data = dict(zip(head, [util.pack_branch(branches, as_arrays)] + columns))
     # Check data integrity (parser-specific)
     _check(meta, data, path)
 
@@ -140,10 +153,8 @@ def _parse_header(header_list):
     units = {}
 
     for h in header_list:
-        try:
-            text = h.lower()
-            header = util.search_key_starts_def_dict(text, _DATA_DICT)
-        except StopIteration:
+        header = _DATA_INDEX.find_start(h.lower())
+        if header is None:
             header = h
 
         headers.append(header)
@@ -166,15 +177,18 @@ def _parse_header(header_list):
 
 
 def _parse_data(data_rows):
-    data = []
-    branch = 0
-    for row in list(data_rows):
+    """Return the number of points in each branch and the data rows."""
+    rows = []
+    branches = [0]
+    for row in data_rows:
         # If we reached the desorption branch we change
         if row[0] == '---':
-            branch = 1
+            if len(branches) == 1:
+                branches.append(0)
             continue
-        data.append([branch] + list(row))
-    return data
+        rows.append(row)
+        branches[-1] += 1
+    return branches, rows
 
 
 def _check(meta, data, path):
@@ -184,7 +198,7 @@ def _check(meta, data, path):
     Also logs a warning for errors found in file.
     """
     if 'loading' in data:
-        empties = (k for k, v in data.items() if not v)
+        empties = (k for k, v in data.items() if len(v) == 0)
         for empty in empties:
             logger.info(f'No data collected for {empty} in file {path}.')
     if 'errors' in meta:
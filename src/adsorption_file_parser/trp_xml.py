@@ -21,6 +21,9 @@ uptake is added in a latter manufacturer format change.
 
 import xml.etree.ElementTree as ET
 
+from adsorption_file_parser.utils import common_utils as util
+from adsorption_file_parser.utils import instrumentation
+
 _DATA_DICT = {
     'measurement': {
         'text': ('ID', ),
@@ -49,7 +52,8 @@ _DATA_DICT = {
 }
 
 
-def parse(path):
+@instrumentation.instrumented
+def parse(path, as_arrays=False):
     """
     Parse an XML file generated by 3P software.
 
@@ -57,6 +61,8 @@ def parse(path):
     ----------
     path: str
         The location of an XML file generated by a 3P instrument.
+    as_arrays : bool, optional
+        Return numeric data columns as numpy arrays instead of lists.
 
     Returns
     -------
@@ -73,6 +79,7 @@ def parse(path):
     root = tree.getroot()
 
     # Metadata
+    instrumentation.mark('metadata')
     meta_raw = {}
     general_config = root.find('General').find('GeneralConfig')
     meta_raw["adsorbate"] = general_config.find('AdsorbGas')
@@ -95,13 +102,18 @@ def parse(path):
     meta_raw['_exptl_operator'] = config_sample.find('Operator')
 
     # Data
+    instrumentation.mark('header')
     data_element = root.find('Data').find('Adsorb')
     data = _parse_header(data_element)
+    instrumentation.mark('data')
     data = _parse_data(data_element, data)
     data_element = root.find('Data').find('Doff')
     data = _parse_data(data_element, data)
+    instrumentation.count('cells', sum(map(len, data.values())))
     # data needs trimming and conversions
     data = _process_data(data)
+    if as_arrays:
+        data = {k: util.pack_column(v, as_arrays) for k, v in data.items()}
     # Check data integrity (parser-specific)
     _check(meta, data, path)
 
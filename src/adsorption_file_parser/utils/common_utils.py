@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
 """Common python utilities."""
 import ast
+import mmap
 import re
-
-import dateutil.parser
+from contextlib import contextmanager
+from itertools import chain
+from itertools import repeat
 
 from adsorption_file_parser import ParsingError
 from adsorption_file_parser import logger
+from adsorption_file_parser.utils import instrumentation
+from adsorption_file_parser.utils.date_parsing import parse_date
 
 # regexes
 
@@ -17,18 +21,14 @@ RE_SUPERSCRIPT2 = re.compile('²')
 RE_SUPERSCRIPT3 = re.compile('³')
 RE_BRACKETS = re.compile(r'[\{\[\(\)\]\}]')  # all bracket type
 
-RE_ONLY_NUMBERS = re.compile(r'^(-)?\d+(.|,)?\d+')
-RE_BETWEEN_BRACKETS = re.compile(r'(?<=\().+?(?=\))')
-
-
-def search_key_in_def_dict(key, def_dict):
-    """Finds key in the dictionary, provided it exists in the value ["text"] list"""
-    return next(k for k, v in def_dict.items() if any(key == n for n in v.get('text', [])))
+# text cell type in xlrd (xlrd.XL_CELL_TEXT)
+_XL_CELL_TEXT = 1
 
+# size of the pieces of a numeric data block converted at once
+_BLOCK_CHUNK = 1 << 20
 
-def search_key_starts_def_dict(key, def_dict):
-    """Finds key in the dictionary, provided it starts in the value ["text"] list"""
-    return next(k for k, v in def_dict.items() if any(key.startswith(n) for n in v.get('text', [])))
+RE_ONLY_NUMBERS = re.compile(r'^(-)?\d+(.|,)?\d+')
+RE_BETWEEN_BRACKETS = re.compile(r'(?<=\().+?(?=\))')
 
 
 def _is_none(s: str) -> bool:
@@ -118,12 +118,9 @@ def handle_string_numeric(text):
 def handle_string_date(text):
     """Convert general date string to ISO format."""
     try:
-        return dateutil.parser.parse(text).isoformat()
-    except dateutil.parser.ParserError:
-        if '午' in text:
-            text = text.replace('下午', '')
-            text = text.replace('上午', '')
-            return handle_string_date(text)
+        return parse_date(text)
+    except ValueError:
+        instrumentation.fallback('date_text')
         logger.warning(f"Could not parse date '{text}'")
         return text
 
@@ -153,6 +150,30 @@ def handle_xlrd_timedelta(text, sheet):
     return f'{dt[3]}:{dt[4]}:{dt[5]}'
 
 
+def xlrd_text_cells(sheet, row):
+    """
+    Iterate over the non-empty text cells in a row of an xlrd sheet.
+
+    Cell types are searched as bytes, so rows without text,
+    like most data rows, are skipped without a Python-level loop.
+
+    Yields
+    ------
+    tuple
+        Column index and value of each cell.
+    """
+    types = bytes(sheet.row_types(row))
+    col = types.find(_XL_CELL_TEXT)
+    if col == -1:
+        return
+    values = sheet.row_values(row)
+    while col != -1:
+        value = values[col]
+        if value:
+            yield col, value
+        col = types.find(_XL_CELL_TEXT, col + 1)
+
+
 def handle_excel_string(text):
     """
     Replace any newline found.
@@ -168,3 +189,208 @@ def handle_string_time_minutes(text):
     """Convert time points from HH:MM format to minutes."""
     hours, mins = str(text).split(':')
     return int(hours) * 60 + int(mins)
+
+
+def import_numpy():
+    """Import numpy, only required for array output."""
+    try:
+        import numpy
+    except ImportError as err:
+        raise ParsingError('Array output (`as_arrays=True`) requires numpy to be installed.') from err
+    return numpy
+
+
+def pack_branch(sizes, as_arrays=False):
+    """
+    Create the branch column from the number of points in each branch.
+
+    Branches are numbered in order, 0 for adsorption and 1 for desorption.
+    """
+    if as_arrays:
+        np = import_numpy()
+        return np.repeat(np.arange(len(sizes), dtype=np.int8), sizes)
+    return list(chain.from_iterable(repeat(branch, size) for branch, size in enumerate(sizes)))
+
+
+def pack_column(values, as_arrays=False):
+    """
+    Create a data column from a sequence of values.
+
+    In array mode, numeric columns become float64 numpy arrays (with None as NaN),
+    while columns which cannot be converted (e.g. text) are left as lists.
+    """
+    if not as_arrays:
+        return list(values)
+    np = import_numpy()
+    if not isinstance(values, list):
+        values = list(values)
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        instrumentation.fallback('column_not_numeric')
+        return values
+
+
+def pack_lines(head, lines, branches=None, separator=None, decimal='.', as_arrays=False, errors=None):
+    """
+    Convert the text lines of a numeric data block into a dictionary of columns.
+
+    Parameters
+    ----------
+    head : list[str]
+        Column names. If ``branches`` is passed, the first name
+        is the one of the branch column.
+    lines : list[str]
+        Lines of the data block, each containing one float per column.
+    branches : list[int], optional
+        Number of consecutive lines belonging to each branch.
+    separator : str, optional
+        Value separator, by default any whitespace.
+    decimal : str, optional
+        Decimal mark, ``','`` for files written in some locales.
+    as_arrays : bool, optional
+        Return float64 numpy arrays instead of lists.
+    errors : list, optional
+        If given, values which cannot be read become NaN and
+        are reported in this list instead of raising an error.
+
+    Returns
+    -------
+    dict
+        Data columns by name.
+    """
+    if branches is None:
+        blocks = [(0, ''.join(lines))]
+    else:
+        starts = [sum(branches[:i]) for i in range(len(branches) + 1)]
+        blocks = [(i, ''.join(lines[starts[i]:starts[i + 1]])) for i in range(len(branches))]
+    return _pack_blocks(head, blocks, branches is not None, separator, decimal, as_arrays, errors)
+
+
+@contextmanager
+def map_file(path):
+    """
+    Map a file in memory, read-only.
+
+    The mapping behaves like a ``bytes`` object, and pages of the file
+    are only read when accessed. An empty file, which cannot be mapped,
+    gives empty bytes.
+    """
+    with open(path, 'rb') as file:
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            yield b''
+            return
+        try:
+            yield buffer
+        finally:
+            buffer.close()
+
+
+def read_line(buffer, pos):
+    """
+    Read the line starting at ``pos`` in a bytes buffer.
+
+    Returns the line, ending with ``b'\\n'`` unless it is the last one of
+    the buffer, and the position of the next line. Like text mode files,
+    ``b'\\r\\n'`` line ends are returned as ``b'\\n'``.
+    """
+    end = buffer.find(b'\n', pos)
+    if end == -1:
+        return buffer[pos:], len(buffer)
+    if end > pos and buffer[end - 1] == 13:  # \r
+        return buffer[pos:end - 1] + b'\n', end + 1
+    return buffer[pos:end + 1], end + 1
+
+
+def count_lines(buffer):
+    """Number of line ends in a bytes buffer, counted a piece at a time."""
+    return sum(buffer[pos:pos + _BLOCK_CHUNK].count(b'\n') for pos in range(0, len(buffer), _BLOCK_CHUNK))
+
+
+def pack_block(head, buffer, spans, branched=False, decimal='.', as_arrays=False, errors=None):
+    """
+    Convert numeric data blocks of a bytes buffer into a dictionary of columns.
+
+    The blocks are never decoded: values are converted to floats directly
+    from bytes, a large piece of the block at a time.
+
+    Parameters
+    ----------
+    head : list[str]
+        Column names. If ``branched``, the first name is
+        the one of the branch column.
+    buffer : bytes or mmap.mmap
+        The file content.
+    spans : list[tuple[int, int]]
+        Start and end offsets of each block, whose lines contain
+        one whitespace separated value per column.
+    branched : bool, optional
+        Whether each block is a branch, numbered in order.
+    decimal : str, optional
+        Decimal mark, ``','`` for files written in some locales.
+    as_arrays : bool, optional
+        Return float64 numpy arrays instead of lists.
+    errors : list, optional
+        If given, values which cannot be read become NaN and
+        are reported in this list instead of raising an error.
+
+    Returns
+    -------
+    dict
+        Data columns by name.
+    """
+    return _pack_blocks(head, _block_pieces(buffer, spans), branched, None, decimal, as_arrays, errors)
+
+
+def _block_pieces(buffer, spans):
+    """Pieces of each block, ending on a line end, with the index of the block."""
+    for index, (start, end) in enumerate(spans):
+        pos = start
+        while pos < end:
+            stop = min(pos + _BLOCK_CHUNK, end)
+            if stop < end:
+                newline = buffer.rfind(b'\n', pos, stop)
+                if newline == -1:
+                    newline = buffer.find(b'\n', stop, end)
+                stop = end if newline == -1 else newline + 1
+            yield index, buffer[pos:stop]
+            pos = stop
+
+
+def _pack_blocks(head, blocks, branched, separator, decimal, as_arrays, errors):
+    """Convert ``(branch, block)`` pairs to columns, see ``pack_lines``."""
+    from adsorption_file_parser.utils.numeric_block import tokenize
+
+    value_head = head[1:] if branched else head
+    ncols = len(value_head)
+    pieces = [[] for _ in value_head]
+    sizes = []
+    nrows = 0
+
+    for branch, block in blocks:
+        while len(sizes) <= branch:
+            sizes.append(0)
+        result = tokenize(block, ncols, separator, decimal, tolerant=errors is not None, as_arrays=as_arrays, first_row=nrows)
+        for piece, column in zip(pieces, result.columns):
+            piece.append(column)
+        for row, col, token in result.errors:
+            if token is None:
+                errors.append(f"Missing value in data row {row}, column '{value_head[col]}'.")
+            else:
+                errors.append(f"Could not read {token!r} in data row {row}, column '{value_head[col]}'.")
+        size = len(result.columns[0]) if ncols else 0
+        sizes[branch] += size
+        nrows += size
+
+    if as_arrays:
+        np = import_numpy()
+        columns = [np.concatenate(piece) if piece else np.empty(0, dtype=np.float64) for piece in pieces]
+    else:
+        columns = [list(chain.from_iterable(piece)) for piece in pieces]
+
+    if branched:
+        columns.insert(0, pack_branch(sizes, as_arrays))
+
+    return dict(zip(head, columns))
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Parse date strings, learning their format.
+
+Dates written by one instrument always have the same format, but
+``dateutil.parser.parse`` works out the format again for each string.
+Here, the first string parsed by dateutil is used to infer an equivalent
+``strptime`` format, which is then tried first on the following strings.
+
+A learned format is only kept if it gives back the dateutil result for the
+string it was learned from, and a result is only accepted from a learned
+format when dateutil would resolve the day and month in the same order.
+Anything else (month names, fractional seconds, named time zones) always
+goes through dateutil, so the result is the same as ``dateutil.parser.parse``.
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from adsorption_file_parser.utils import instrumentation
+
+# Chinese/Japanese morning/afternoon markers, removed before parsing
+_AMPM_TABLE = str.maketrans(dict.fromkeys('上下午', None))
+
+# number of formats remembered for each set of parsing options
+_MAX_FORMATS = 16
+
+_TOKENS = re.compile(r'\d+|[^\W\d_]+|[\W_]+')
+_TIMEZONE = re.compile(r'(?:[+-]\d\d:?\d\d|Z)$')
+_AMPM = ('am', 'pm')
+
+# orders of the date fields which are learned:
+# ``dateutil`` resolves an ambiguous day and month as month first
+# and, with ``yearfirst``, a leading two-digit number as the year
+_DATE_ORDERS = (('Y', 'm', 'd'), ('m', 'd', 'Y'), ('d', 'm', 'Y'))
+_DATE_ORDERS_YEARFIRST = _DATE_ORDERS + (('y', 'm', 'd'), )
+
+# learned formats, by ``yearfirst``, as (format, day before month, two-digit year)
+_FORMATS = {False: [], True: []}
+_STATS = {'learned': 0, 'fast': 0, 'dateutil': 0}
+
+
+@lru_cache(maxsize=1024)
+def parse_date(text: str, yearfirst: bool = False) -> str:
+    """
+    Convert a date string to ISO format.
+
+    Equivalent to ``dateutil.parser.parse(text, yearfirst=yearfirst).isoformat()``,
+    but learned formats are tried first. Chinese/Japanese morning/afternoon
+    markers are removed. Results are memoised for each string.
+
+    Parameters
+    ----------
+    text : str
+        The date string.
+    yearfirst : bool
+        Whether a leading two-digit number is the year.
+
+    Returns
+    -------
+    str
+        The date in ISO format.
+
+    Raises
+    ------
+    ValueError
+        If the string cannot be parsed.
+    """
+    with instrumentation.phase('dates'):
+        if '午' in text:
+            text = text.translate(_AMPM_TABLE)
+
+        formats = _FORMATS[yearfirst]
+        for fmt in formats:
+            date = _try_format(text, *fmt)
+            if date is not None:
+                _STATS['fast'] += 1
+                return date.isoformat()
+
+        import dateutil.parser
+        instrumentation.fallback('dateutil')
+        date = dateutil.parser.parse(text, yearfirst=yearfirst)
+        _STATS['dateutil'] += 1
+
+        fmt = _learn_format(text, date, yearfirst)
+        if fmt is not None and fmt not in formats:
+            _STATS['learned'] += 1
+            formats.insert(0, fmt)
+            del formats[_MAX_FORMATS:]
+
+        return date.isoformat()
+
+
+def date_cache_info():
+    """
+    Return statistics of the date parser.
+
+    Returns
+    -------
+    dict
+        Number of formats learned, strings parsed with a learned format or
+        with dateutil, and the per-string cache info.
+    """
+    return {**_STATS, 'formats': sum(map(len, _FORMATS.values())), 'strings': parse_date.cache_info()}
+
+
+def date_cache_clear():
+    """Forget learned formats, memoised strings and statistics."""
+    parse_date.cache_clear()
+    for formats in _FORMATS.values():
+        formats.clear()
+    for key in _STATS:
+        _STATS[key] = 0
+
+
+def _try_format(text, fmt, day_first, short_year):
+    """Parse with a learned format, None if it fails or dateutil would disagree."""
+    try:
+        date = datetime.strptime(text, fmt)
+    except ValueError:
+        return None
+    # dateutil reads an ambiguous day and month as month first
+    if day_first and date.day <= 12 and date.day != date.month:
+        return None
+    # dateutil puts two-digit years in the century closest to now
+    if short_year:
+        year = _convert_year(date.year % 100)
+        if year != date.year:
+            try:
+                date = date.replace(year=year)
+            except ValueError:
+                return None
+    return date
+
+
+def _convert_year(year):
+    """Two-digit year conversion of dateutil."""
+    this_year = datetime.now().year
+    century = this_year // 100 * 100
+    year += century
+    if year >= this_year + 50:
+        year -= 100
+    elif year < this_year - 50:
+        year += 100
+    return year
+
+
+def _learn_format(text, date, yearfirst):
+    """Infer a strptime format giving ``date`` from ``text``, or None."""
+    if date.microsecond:
+        return None
+
+    timezone = _TIMEZONE.search(text)
+    if date.tzinfo is not None:
+        if timezone is None:
+            return None
+        text = text[:timezone.start()]
+    elif timezone is not None:
+        return None
+
+    tokens = _TOKENS.findall(text)
+    numbers = [i for i, token in enumerate(tokens) if token.isdigit()]
+    words = [i for i, token in enumerate(tokens) if token.isalpha()]
+    if len(numbers) not in (3, 5, 6):
+        return None
+    if len(words) > 1 or any(tokens[i].lower() not in _AMPM for i in words):
+        return None
+    if words and len(numbers) == 3:
+        return None
+
+    # date fields, there must be a single possible order
+    date_fields = [tokens[i] for i in numbers[:3]]
+    orders = [
+        order for order in (_DATE_ORDERS_YEARFIRST if yearfirst else _DATE_ORDERS)
+        if all(_date_field_matches(field, token, date) for field, token in zip(order, date_fields))
+    ]
+    if len(orders) != 1:
+        return None
+    order = orders[0]
+
+    # time fields, in hour/minute/second order
+    hour = '%I' if words else '%H'
+    directives = dict(zip(numbers, [f'%{field}' for field in order] + [hour, '%M', '%S']))
+    for i in words:
+        directives[i] = '%p'
+
+    fmt = ''.join(directives.get(i, token.replace('%', '%%')) for i, token in enumerate(tokens))
+    if timezone is not None:
+        fmt += '%z'
+    short_year = 'y' in order
+    day_first = order.index('d') < order.index('m')
+    learned = (fmt, day_first, short_year)
+
+    # check that the format reproduces the dateutil result
+    full_text = text + timezone.group() if timezone is not None else text
+    check = _try_format(full_text, *learned)
+    if check is None or check.isoformat() != date.isoformat():
+        return None
+    return learned
+
+
+def _date_field_matches(field, token, date):
+    """Whether a number from the string can be a date field."""
+    if field == 'Y':
+        return len(token) == 4 and int(token) == date.year
+    if field == 'y':
+        return len(token) == 2 and int(token) == date.year % 100
+    if len(token) > 2:
+        return False
+    if field == 'm':
+        return int(token) == date.month
+    return int(token) == date.day
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Helpers for the tools processing directories of instrument exports."""
+
+import datetime
+import json
+import os
+
+# files left by editors and office applications while writing
+IGNORED_PREFIXES = ('.', '~$')
+
+
+def is_ignored(name):
+    """Whether a file or directory name is one left by editors, or hidden."""
+    return name.startswith(IGNORED_PREFIXES)
+
+
+def result_to_json(result, **kwargs):
+    """
+    A ``BatchResult`` as a JSON document.
+
+    The document holds the ``path``, ``manufacturer``, ``fmt``, ``meta``,
+    ``data`` and ``error`` of the file, see ``json_default`` for values
+    which are converted. Other arguments are passed to ``json.dumps``.
+    """
+    content = {
+        'path': os.fspath(result.path),
+        'manufacturer': result.manufacturer,
+        'fmt': result.fmt,
+        'meta': result.meta,
+        'data': result.data,
+        'error': str(result.error) if result.error is not None else None,
+    }
+    return json.dumps(content, default=json_default, **kwargs)
+
+
+def json_default(value):
+    """Dates and numpy arrays or numbers, which the json module cannot write."""
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in instrumentation of the parsers.
+
+Inside ``collect``, every parse function reports into a ``ParseStats``
+where the time goes and how much work is done:
+
+* the wall and CPU time of each phase, where phases are ``open`` (opening
+  the file or workbook), ``metadata`` (the metadata lines or grid scan),
+  ``header`` (column headers and units), ``dates`` and ``data`` (the
+  conversion of the data columns). A parser marks the start of each
+  phase, which lasts until the next mark; ``dates`` is timed apart
+  from the phase during which the dates are read.
+* counters, such as the ``files`` parsed, the ``lines`` or ``cells``
+  scanned, the metadata ``keyword_lookups`` and ``keyword_misses``,
+  the ``fallbacks`` to slower code paths, detailed by their names as
+  ``fallback.<name>``, and the data ``points`` produced.
+
+The stats are held in a context variable, so that each thread and each
+asyncio task has its own. Outside ``collect``, reporting only costs a
+lookup of this variable.
+
+.. code:: python
+
+    from adsorption_file_parser.utils import instrumentation
+    with instrumentation.collect() as stats:
+        read("path/to/file")
+    print(stats.as_dict())
+
+Batches can collect the stats of each file with ``read_many(stats=True)``
+and sum them by parser with ``aggregate``.
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from adsorption_file_parser import metrics
+
+_STATS = ContextVar('adsorption_file_parser_stats', default=None)
+
+
+class ParseStats():
+    """
+    Time per phase and work counters of one or more parsed files.
+
+    Attributes
+    ----------
+    phases : dict
+        ``[wall, cpu]`` seconds spent in each phase.
+    counters : dict
+        Value of each counter.
+    """
+
+    __slots__ = ('phases', 'counters', '_phase', '_wall', '_cpu')
+
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self._phase = None
+        self._wall = 0.0
+        self._cpu = 0.0
+
+    def count(self, name, value=1):
+        """Add to a counter."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, other):
+        """Add the times and counters of other stats to these."""
+        for name, (wall, cpu) in other.phases.items():
+            times = self.phases.setdefault(name, [0.0, 0.0])
+            times[0] += wall
+            times[1] += cpu
+        for name, value in other.counters.items():
+            self.count(name, value)
+        return self
+
+    def as_dict(self):
+        """The phase times and counters, as a dictionary."""
+        return {
+            'phases': {name: {'wall': wall, 'cpu': cpu} for name, (wall, cpu) in self.phases.items()},
+            'counters': dict(self.counters),
+        }
+
+    def _switch(self, name):
+        """End the current phase and start another, None for no phase."""
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        if self._phase is not None:
+            times = self.phases.setdefault(self._phase, [0.0, 0.0])
+            times[0] += wall - self._wall
+            times[1] += cpu - self._cpu
+        self._phase = name
+        self._wall = wall
+        self._cpu = cpu
+
+    def __repr__(self):
+        return f'ParseStats({self.as_dict()!r})'
+
+
+@contextmanager
+def collect(stats=None):
+    """
+    Collect the stats of the files parsed in this context.
+
+    Parameters
+    ----------
+    stats : ParseStats, optional
+        Stats to add to, by default new ones.
+
+    Yields
+    ------
+    ParseStats
+        The stats, complete when the context exits.
+    """
+    if stats is None:
+        stats = ParseStats()
+    token = _STATS.set(stats)
+    try:
+        yield stats
+    finally:
+        _STATS.reset(token)
+
+
+def active():
+    """The stats being collected, or None. Parsers use it to skip work only needed for the stats."""
+    return _STATS.get()
+
+
+def mark(name):
+    """Start a phase of the parsing, which lasts until the next one."""
+    stats = _STATS.get()
+    if stats is not None:
+        stats._switch(name)
+
+
+@contextmanager
+def phase(name):
+    """Time a phase within another, which resumes afterwards."""
+    stats = _STATS.get()
+    if stats is None:
+        yield
+        return
+    outer = stats._phase
+    stats._switch(name)
+    try:
+        yield
+    finally:
+        stats._switch(outer)
+
+
+def count(name, value=1):
+    """Add to a counter."""
+    stats = _STATS.get()
+    if stats is not None:
+        stats.count(name, value)
+
+
+def fallback(name):
+    """Count a fallback to a slower code path, also in the process metrics."""
+    metrics.fallback(name)
+    stats = _STATS.get()
+    if stats is not None:
+        stats.count('fallbacks')
+        stats.count(f'fallback.{name}')
+
+
+def instrumented(parse):
+    """
+    Report a parse function: the phases start with ``open``, and the
+    files parsed, failures and data points produced are counted.
+    """
+    @functools.wraps(parse)
+    def wrapper(*args, **kwargs):
+        stats = _STATS.get()
+        if stats is None:
+            return parse(*args, **kwargs)
+
+        outer = stats._phase
+        stats._switch('open')
+        try:
+            meta, data = parse(*args, **kwargs)
+        except Exception:
+            stats.count('failures')
+            raise
+        finally:
+            stats._switch(outer)
+        stats.count('files')
+        stats.count('points', max(map(len, data.values()), default=0))
+        return meta, data
+
+    return wrapper
+
+
+def aggregate(results):
+    """
+    Sum the stats of batch results by parser.
+
+    Parameters
+    ----------
+    results : iterable
+        ``BatchResult`` from ``read_many(..., stats=True)``.
+
+    Returns
+    -------
+    dict
+        ``ParseStats`` by ``'manufacturer:fmt'``.
+    """
+    totals = {}
+    for result in results:
+        if result.stats is not None:
+            key = f'{result.manufacturer}:{result.fmt}'
+            totals.setdefault(key, ParseStats()).merge(result.stats)
+    return totals
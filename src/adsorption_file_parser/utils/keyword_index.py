@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Precompiled keyword lookup for the parser definition dictionaries."""
+
+from adsorption_file_parser.utils import instrumentation
+
+_END = ''  # marks the end of an alias in the trie, cannot be a character
+
+
+class KeywordIndex():
+    """
+    Find keys of a definition dictionary from one of their ``text`` aliases.
+
+    The index is built once per parser module from its ``_META_DICT`` or
+    ``_DATA_DICT``. ``find`` returns the key with an alias equal to the
+    text, ``find_start`` the key with an alias the text starts with.
+    Exact matches use a hash map and "starts with" matches use a prefix trie,
+    so a lookup costs at most one step per character instead of a scan of
+    every alias. A miss returns None.
+
+    When several keys match, the first one in the dictionary is returned.
+    Keys which have already been found can be removed to skip them in
+    later lookups; use ``copy`` to obtain an index with its own removals
+    for each parsed file.
+
+    Parameters
+    ----------
+    def_dict : dict
+        Definition dictionary, with a ``text`` tuple of aliases for each key.
+    """
+
+    __slots__ = ('_order', '_aliases', '_exact', '_trie', '_removed')
+
+    def __init__(self, def_dict):
+        self._order = {}
+        self._aliases = {}
+        self._exact = {}
+        self._trie = {}
+        self._removed = set()
+
+        for order, (key, definition) in enumerate(def_dict.items()):
+            self._order[key] = order
+            texts = tuple(definition.get('text', ()))
+            self._aliases[key] = texts
+            for text in texts:
+                keys = self._exact.setdefault(text, [])
+                if key not in keys:
+                    keys.append(key)
+                node = self._trie
+                for char in text:
+                    node = node.setdefault(char, {})
+                keys = node.setdefault(_END, [])
+                if key not in keys:
+                    keys.append(key)
+
+    def copy(self):
+        """
+        Return an index sharing the lookup tables, with its own removed keys.
+
+        When instrumentation stats are collected, lookups in the copy are counted.
+        """
+        cls = KeywordIndex if instrumentation.active() is None else _CountingKeywordIndex
+        new = cls.__new__(cls)
+        new._order = self._order
+        new._aliases = self._aliases
+        new._exact = self._exact
+        new._trie = self._trie
+        new._removed = set(self._removed)
+        return new
+
+    def find(self, text):
+        """Return the key which has ``text`` as an alias, or None."""
+        keys = self._exact.get(text)
+        if keys is None:
+            return None
+        for key in keys:
+            if key not in self._removed:
+                return key
+        return None
+
+    def find_start(self, text):
+        """Return the first key which has an alias ``text`` starts with, or None."""
+        best = None
+        node = self._trie
+        for char in text:
+            keys = node.get(_END)
+            if keys:
+                best = self._earliest(keys, best)
+            node = node.get(char)
+            if node is None:
+                return best
+        keys = node.get(_END)
+        if keys:
+            best = self._earliest(keys, best)
+        return best
+
+    def _earliest(self, keys, best):
+        """Choose between the current best match and a new set of keys."""
+        for key in keys:
+            if key not in self._removed:
+                if best is None or self._order[key] < self._order[best]:
+                    return key
+                return best
+        return best
+
+    def remove(self, key):
+        """Skip a key in subsequent lookups."""
+        if key in self._aliases:
+            self._removed.add(key)
+
+    def items(self):
+        """Iterate over remaining keys and their aliases, in dictionary order."""
+        return ((k, v) for k, v in self._aliases.items() if k not in self._removed)
+
+    def __contains__(self, key):
+        return key in self._aliases and key not in self._removed
+
+    def __len__(self):
+        return len(self._aliases) - len(self._removed)
+
+
+class _CountingKeywordIndex(KeywordIndex):
+    """Index counting its lookups and misses in the instrumentation stats."""
+
+    __slots__ = ()
+
+    def find(self, text):
+        return _counted(KeywordIndex.find(self, text))
+
+    def find_start(self, text):
+        return _counted(KeywordIndex.find_start(self, text))
+
+
+def _counted(key):
+    instrumentation.count('keyword_lookups')
+    if key is None:
+        instrumentation.count('keyword_misses')
+    return key
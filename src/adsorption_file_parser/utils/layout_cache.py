@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Cache of the resolved layout of Excel reports.
+
+Instrument software writes the same report layout over and over, so the
+position of the metadata labels and of the data blocks found while scanning
+one file can be reused for the next file with the same layout. A layout is
+stored under a fingerprint of the workbook (sheet names, width and the cell
+types of the first rows). When it is reused, only the cached cells are read
+to check that they still hold the same labels, and the parser falls back to
+the full scan of the sheet if any of them does not.
+
+Labels which a file holds in other cells than the cached file, such as an
+optional field or an extra data block, are not seen when the layout is
+reused. The cache is therefore disabled by default, and is meant for runs
+over many files written by the same instrument software, where it saves the
+scan of every row of the sheet: enable it with ``configure_layout_cache``.
+
+The cache is an in-process LRU, which can optionally be persisted to a
+JSON file to be shared between runs.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from adsorption_file_parser import logger
+from adsorption_file_parser.utils import instrumentation
+from adsorption_file_parser.utils.common_utils import _XL_CELL_TEXT
+
+# rows used as anchor cells in the fingerprint, this covers the metadata
+# region of all known report layouts
+_ANCHOR_ROWS = 32
+
+
+class LayoutCache():
+    """
+    LRU cache of report layouts, keyed by workbook fingerprint.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of layouts held, 0 disables the cache.
+    path : str, optional
+        JSON file where layouts are persisted between runs.
+    """
+    def __init__(self, maxsize=256, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.mismatches = 0
+        self._layouts = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = path is None
+
+    def get(self, fingerprint):
+        """Return the layout stored for a fingerprint, or None."""
+        if not self.maxsize:
+            return None
+        key = _hash(fingerprint)
+        with self._lock:
+            self._load()
+            layout = self._layouts.get(key)
+            if layout is None:
+                self.misses += 1
+                return None
+            self._layouts.move_to_end(key)
+            self.hits += 1
+            return layout
+
+    def put(self, fingerprint, layout):
+        """Store the layout of a fingerprint, evicting the oldest if full."""
+        if not self.maxsize:
+            return
+        key = _hash(fingerprint)
+        with self._lock:
+            self._load()
+            self._layouts[key] = layout
+            self._layouts.move_to_end(key)
+            while len(self._layouts) > self.maxsize:
+                self._layouts.popitem(last=False)
+            self._save()
+
+    def mismatch(self, fingerprint):
+        """Record that a stored layout did not fit a file, and drop it."""
+        key = _hash(fingerprint)
+        with self._lock:
+            # the lookup was counted as a hit
+            self.hits -= 1
+            self.mismatches += 1
+            self._layouts.pop(key, None)
+
+    def clear(self):
+        """Remove all layouts and reset the counters."""
+        with self._lock:
+            self._layouts.clear()
+            self.hits = self.misses = self.mismatches = 0
+            self._loaded = True
+            self._save()
+
+    def stats(self):
+        """Return the hit/miss counters and the cache size."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'mismatches': self.mismatches,
+            'size': len(self._layouts),
+            'maxsize': self.maxsize,
+        }
+
+    def _load(self):
+        """Read persisted layouts, once."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                layouts = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as err:
+            logger.warning(f"Could not read layout cache '{self.path}': {err}")
+            return
+        for key, layout in layouts.items():
+            self._layouts.setdefault(key, layout)
+        while len(self._layouts) > self.maxsize:
+            self._layouts.popitem(last=False)
+
+    def _save(self):
+        """Persist layouts, replacing the file atomically."""
+        if self.path is None:
+            return
+        tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self._layouts, file)
+            os.replace(tmp_path, self.path)
+        except OSError as err:
+            logger.warning(f"Could not write layout cache '{self.path}': {err}")
+
+
+# disabled unless configured, see the module documentation
+_CACHE = LayoutCache(maxsize=0)
+
+
+def get_layout_cache():
+    """Return the layout cache used by the parsers."""
+    return _CACHE
+
+
+def configure_layout_cache(maxsize=256, path=None):
+    """
+    Replace the layout cache used by the parsers, enabling it.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of layouts held, 0 disables the cache.
+    path : str, optional
+        JSON file where layouts are persisted between runs.
+
+    Returns
+    -------
+    LayoutCache
+        The new cache.
+    """
+    global _CACHE  # pylint: disable=global-statement
+    _CACHE = LayoutCache(maxsize=maxsize, path=path)
+    return _CACHE
+
+
+def _hash(fingerprint):
+    return hashlib.sha1(repr(fingerprint).encode('utf-8')).hexdigest()
+
+
+def xlrd_fingerprint(parser, workbook, sheet):
+    """Fingerprint of an xlrd sheet: sheet names, width and top cell types."""
+    anchors = tuple(bytes(sheet.row_types(row)) for row in range(min(sheet.nrows, _ANCHOR_ROWS)))
+    return (parser, tuple(workbook.sheet_names()), sheet.name, sheet.ncols, anchors)
+
+
+def xlrd_text(sheet, row, col):
+    """The text of a cell of an xlrd sheet, None if it is not a text cell or outside the sheet."""
+    if row >= sheet.nrows or col >= sheet.ncols or sheet.cell_type(row, col) != _XL_CELL_TEXT:
+        return None
+    return sheet.cell_value(row, col)
+
+
+def xlrd_layout(parser, workbook, sheet, scan, fits):
+    """
+    Return the layout events of a sheet, from the cache if possible.
+
+    Parameters
+    ----------
+    parser : str
+        Name of the parser, part of the fingerprint.
+    workbook : xlrd.Book
+        The open workbook.
+    sheet : xlrd.sheet.Sheet
+        The sheet to parse.
+    scan : callable
+        Full scan of the sheet, returns a list of events.
+    fits : callable
+        Check that the cells of cached events hold the same labels
+        in the sheet, reading only these cells.
+
+    Returns
+    -------
+    list
+        Events as ``[row, col, key]`` in the order they were found,
+        with a None key for the start of a data block.
+    """
+    cache = _CACHE
+    fingerprint = xlrd_fingerprint(parser, workbook, sheet)
+    layout = cache.get(fingerprint)
+    if layout is not None:
+        if fits(sheet, layout['events']):
+            instrumentation.count('layout_cache_hits')
+            instrumentation.count('cells', len(layout['events']))
+            return layout['events']
+        logger.debug(f'Cached {parser} layout does not match, scanning the sheet.')
+        instrumentation.fallback('layout_mismatch')
+        cache.mismatch(fingerprint)
+
+    instrumentation.count('cells', sheet.nrows * sheet.ncols)
+    events = scan(sheet)
+    if cache.maxsize:
+        cache.put(fingerprint, {'events': events})
+    return events
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Conversion of blocks of numeric text to columns of floats.
+
+The data of text files is a block of lines holding one value per column,
+separated by whitespace or by a separator character. ``tokenize``
+converts a whole block at once: lines are split with a single call per
+line, the number of values in each line is checked, and all values are
+converted together, by ``float`` or, for arrays, in C by numpy.
+
+Only when this fails, because a value cannot be read or a line has
+missing values, is the block read value by value to locate the problem.
+By default a ``ParsingError`` then gives the row and column of the first
+bad value. In tolerant mode, bad or missing values become NaN and are
+reported in a mask and a list of errors instead.
+
+Blocks may be ``str`` or ``bytes``, as ``float`` reads both. Blank lines
+are skipped, and values after the expected number of columns are ignored.
+"""
+
+from collections import namedtuple
+from itertools import chain
+from itertools import repeat
+
+from adsorption_file_parser import ParsingError
+from adsorption_file_parser.utils import instrumentation
+from adsorption_file_parser.utils.common_utils import import_numpy
+
+NumericBlock = namedtuple('NumericBlock', ['columns', 'mask', 'errors'])
+NumericBlock.__doc__ = """
+Columns of a numeric block.
+
+Parameters
+----------
+columns : list
+    The values of each column, as lists of floats or float64 arrays.
+mask : list or None
+    For each column, whether each value is missing or could not be read
+    and was replaced by NaN, as lists of bools or bool arrays. None if
+    all values were read.
+errors : list
+    The ``(row, column, token)`` of each value which could not be read,
+    with ``None`` as token for a missing value. Rows are counted in the
+    returned columns, without blank lines, from ``first_row``.
+"""
+
+NAN = float('nan')
+
+
+def tokenize(block, ncols, separator=None, decimal='.', tolerant=False, as_arrays=False, first_row=0):
+    """
+    Convert a block of lines of numbers to columns.
+
+    Parameters
+    ----------
+    block : str or bytes
+        The lines of the block.
+    ncols : int
+        Number of values read on each line.
+    separator : str, optional
+        Value separator, by default any whitespace.
+    decimal : str, optional
+        Decimal mark, ``','`` for files written in some locales.
+    tolerant : bool, optional
+        Replace values which cannot be read by NaN instead of raising.
+    as_arrays : bool, optional
+        Return float64 numpy arrays instead of lists.
+    first_row : int, optional
+        Index of the first row in reported locations, for
+        blocks converted in several pieces.
+
+    Returns
+    -------
+    NumericBlock
+        The columns, with the mask and location of bad values.
+
+    Raises
+    ------
+    ParsingError
+        If a value cannot be read or is missing, unless ``tolerant``.
+    """
+    if decimal != '.':
+        if decimal == separator:
+            raise ValueError('The decimal mark cannot be the value separator.')
+        block = block.replace(_cast(decimal, block), _cast('.', block))
+    if separator is not None:
+        separator = _cast(separator, block)
+
+    # every line split once, blank lines have no value
+    split = type(block).split
+    rows = map(split, block.splitlines(), repeat(separator)) if separator else map(split, block.splitlines())
+    rows = [row for row in rows if row and row != [b''] and row != ['']]
+    values = None
+    if set(map(len, rows)) <= {ncols}:
+        values = _convert(chain.from_iterable(rows), as_arrays)
+
+    if values is not None:
+        columns = [values[i::ncols] for i in range(ncols)]
+        mask = None
+        errors = []
+    else:
+        columns, mask, errors = _tokenize_rows(rows, ncols, tolerant, first_row)
+
+    if as_arrays:
+        np = import_numpy()
+        if values is not None:
+            table = values.reshape(-1, ncols)
+            # transposing once leaves each column contiguous in memory
+            columns = list(table.T.copy())
+        else:
+            columns = [np.array(column, dtype=np.float64) for column in columns]
+            mask = [np.array(column, dtype=bool) for column in mask] if mask is not None else None
+
+    return NumericBlock(columns, mask, errors)
+
+
+def _convert(tokens, as_arrays):
+    """Convert all tokens at once, None if one cannot be read."""
+    try:
+        values = list(map(float, tokens))
+    except ValueError:
+        return None
+    if as_arrays:
+        np = import_numpy()
+        return np.array(values, dtype=np.float64)
+    return values
+
+
+def _tokenize_rows(rows, ncols, tolerant, first_row):
+    """Convert rows value by value, to locate the values which cannot be read."""
+    instrumentation.fallback('numeric_rows')
+    columns = [[] for _ in range(ncols)]
+    mask = [[] for _ in range(ncols)]
+    errors = []
+
+    for nrow, row in enumerate(rows, start=first_row):
+        for ncol in range(ncols):
+            token = row[ncol] if ncol < len(row) else None
+            try:
+                value = float(token)
+                bad = False
+            except (TypeError, ValueError):
+                if not tolerant:
+                    if token is None:
+                        raise ParsingError(f'Data row {nrow} has {len(row)} values instead of {ncols}.') from None
+                    raise ParsingError(f'Could not read {_text(token)!r} in data row {nrow}, column {ncol}.') from None
+                value = NAN
+                bad = True
+                errors.append((nrow, ncol, None if token is None else _text(token)))
+            columns[ncol].append(value)
+            mask[ncol].append(bad)
+
+    return columns, mask if errors else None, errors
+
+
+def _cast(text, like):
+    """Encode a str like a bytes block."""
+    return text.encode('ascii') if isinstance(like, (bytes, bytearray)) else text
+
+
+def _text(token):
+    """Token as a str, for messages."""
+    return token.decode('latin-1') if isinstance(token, (bytes, bytearray)) else token
@@ -2,6 +2,8 @@
 """Parses the most common unit types."""
 
 import re
+from functools import lru_cache
+from types import MappingProxyType
 
 from adsorption_file_parser import ParsingError
 from adsorption_file_parser import logger
@@ -23,6 +25,18 @@ pre_proc_sub = [
     [util.RE_BRACKETS, ''],
 ]
 
+# the same cleanup as pre_proc_sub, as a single translation table
+# whitespace is collapsed separately
+_CLEAN_TABLE = str.maketrans({
+    **dict.fromkeys('\'"_,^', None),
+    **dict.fromkeys('{[()]}', None),
+    '²': '2',
+    '³': '3',
+})
+
+# distinct unit strings in a corpus are few, parsed units are memoised
+_CACHE_SIZE = 256
+
 # the string can be a single descriptor like "wt%" or "fraction volume"
 ALIAS_FRACTION = {
     'percent': ('%', 'percent'),
@@ -50,6 +64,9 @@ ALIAS_VOLUME_UNIT = {
     'm3': ('m3', ),
 }
 
+# reverse maps, from a cleaned alias to the unit
+_PRESSURE_UNIT_LOOKUP = {text: unit for unit, texts in ALIAS_PRESSURE_UNIT.items() for text in texts}
+
 
 def parse_number_unit_string(string):
     """Split a string """
@@ -68,19 +85,25 @@ def parse_temperature_unit(text: str) -> str:
     return text
 
 
+@lru_cache(maxsize=_CACHE_SIZE)
 def parse_temperature_string(temperature_string: str) -> str:
     """Correctly format a temperature string."""
 
     # first clean the string
-    temperature_string_clean = clean_string(temperature_string, pre_proc_sub)
+    temperature_string_clean = clean_unit_string(temperature_string)
     # then correctly format degC/degK
     temperature_string_clean = parse_temperature_unit(temperature_string_clean)
 
     return temperature_string_clean
 
 
-def parse_pressure_string(pressure_string: str) -> str:
-    """Correctly parse a pressure string."""
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_pressure_string(pressure_string: str) -> 'MappingProxyType[str, str]':
+    """
+    Correctly parse a pressure string.
+
+    The result is memoised and read-only, copy it to modify it.
+    """
 
     final_units = {
         'pressure_mode': None,
@@ -88,7 +111,7 @@ def parse_pressure_string(pressure_string: str) -> str:
     }
 
     # first clean the string
-    pressure_string_clean = clean_string(pressure_string, pre_proc_sub)
+    pressure_string_clean = clean_unit_string(pressure_string)
 
     if pressure_string_clean in ['relative', 'p/p0']:
         final_units['pressure_mode'] = 'relative'
@@ -96,14 +119,12 @@ def parse_pressure_string(pressure_string: str) -> str:
         final_units['pressure_mode'] = 'relative%'
     else:
         final_units['pressure_mode'] = 'absolute'
-        for p_unit, p_text in ALIAS_PRESSURE_UNIT.items():
-            if any(text == pressure_string_clean for text in p_text):
-                final_units['pressure_unit'] = p_unit
+        final_units['pressure_unit'] = _PRESSURE_UNIT_LOOKUP.get(pressure_string_clean)
 
         if not final_units['pressure_unit']:
             raise ParsingError(f'Cannot understand pressure units in {pressure_string}')
 
-    return final_units
+    return MappingProxyType(final_units)
 
 
 def upper_litre(text: str) -> str:
@@ -118,23 +139,44 @@ def clean_string(text: str, patterns: 'list[str]') -> str:
     return text.lower().strip()
 
 
+def clean_unit_string(text: str) -> str:
+    """
+    Clean a unit string in a single pass.
+
+    Equivalent to ``clean_string(text, pre_proc_sub)``, except that
+    spaces left around a removed bracket are also collapsed.
+    """
+    return ' '.join(text.translate(_CLEAN_TABLE).split()).lower()
+
+
 def find_loading_basis(loading_unit):
     """Find the loading basis from the unit"""
+    basis = _loading_basis(loading_unit)
+    if basis == 'volume_gas':
+        _warn_volume_loading(loading_unit)
+    return basis
+
+
+def _loading_basis(loading_unit):
+    """Find the loading basis from the unit, without warnings."""
     if loading_unit in _MOLAR_UNITS:
         return 'molar'
     if loading_unit in _MASS_UNITS:
         return 'mass'
     if loading_unit in _VOLUME_UNITS:
-        logger.warning(
-            f"The loading unit '{loading_unit}' is ambiguous. "
-            'It can mean either gas at STP, gas at isotherm temperature '
-            'or liquid volume. Here we assumed it is gas at isotherm temperature. '
-            'DOUBLE CHECK if this is the case !!!'
-        )
         return 'volume_gas'
     raise ParsingError(f"Cannot understand loading units in '{loading_unit}'.")
 
 
+def _warn_volume_loading(loading_unit):
+    logger.warning(
+        f"The loading unit '{loading_unit}' is ambiguous. "
+        'It can mean either gas at STP, gas at isotherm temperature '
+        'or liquid volume. Here we assumed it is gas at isotherm temperature. '
+        'DOUBLE CHECK if this is the case !!!'
+    )
+
+
 def find_material_basis(material_unit):
     """Find the material basis from the unit"""
     if material_unit in _MASS_UNITS:
@@ -146,7 +188,7 @@ def find_material_basis(material_unit):
     raise ParsingError(f"Cannot understand material units in '{material_unit}'.")
 
 
-def parse_loading_string(loading_string: str, missing_units: dict = None) -> 'tuple[str, str]':
+def parse_loading_string(loading_string: str, missing_units: dict = None) -> 'MappingProxyType[str, str]':
     """
     Correctly parse an adsorption loading unit string.
 
@@ -156,19 +198,36 @@ def parse_loading_string(loading_string: str, missing_units: dict = None) -> 'tu
     However they should always be either in
     [amount adsorbed] / [material quantity]
     or in a fractional/percentage amount adsorbed.
+
+    The result is memoised and read-only, copy it to modify it.
+    Units which cannot be found in the string are taken from
+    ``missing_units``, if given.
     """
+    parsed = _parse_loading_string(loading_string)
+    if parsed['loading_basis'] == 'volume_gas':
+        _warn_volume_loading(parsed['loading_unit'])
+    if not missing_units:
+        return parsed
+
+    final_units = dict(parsed)
+    final_units.update(missing_units)
+    final_units.update((k, v) for k, v in parsed.items() if v is not None)
+    return MappingProxyType(final_units)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _parse_loading_string(loading_string):
+    """Parse a loading unit string, memoised."""
     final_units = {
         'loading_basis': None,
         'loading_unit': None,
         'material_basis': None,
         'material_unit': None,
     }
-    if missing_units:
-        final_units.update(missing_units)
     error_text = 'Isotherm cannot be parsed due to loading string format.'
 
     # first clean the string
-    loading_string_clean = clean_string(loading_string, pre_proc_sub)
+    loading_string_clean = clean_unit_string(loading_string)
 
     # the string can be a single descriptor like "wt%" or "fractional volume"
     for lbasis, lbtext in ALIAS_FRACTION.items():
@@ -179,7 +238,7 @@ def parse_loading_string(loading_string: str, missing_units: dict = None) -> 'tu
                 if any(text in loading_string_clean for text in mbtext):
                     final_units['material_basis'] = mbasis
 
-                    return final_units
+                    return MappingProxyType(final_units)
             raise ParsingError(error_text)
 
     # the string can also be a combined descriptor like "mmol/g" or "cm3 g^-1"
@@ -209,10 +268,33 @@ def parse_loading_string(loading_string: str, missing_units: dict = None) -> 'tu
     if stp:
         loading_unit = loading_unit + '(STP)'
 
-    final_units['loading_basis'] = find_loading_basis(loading_unit)
+    final_units['loading_basis'] = _loading_basis(loading_unit)
     final_units['loading_unit'] = loading_unit
 
     final_units['material_basis'] = find_material_basis(material_unit)
     final_units['material_unit'] = material_unit
 
-    return final_units
+    return MappingProxyType(final_units)
+
+
+def unit_cache_info():
+    """
+    Return the statistics of the memoised unit parsers.
+
+    Returns
+    -------
+    dict
+        The ``functools`` cache info of each parser, by name.
+    """
+    return {
+        'loading': _parse_loading_string.cache_info(),
+        'pressure': parse_pressure_string.cache_info(),
+        'temperature': parse_temperature_string.cache_info(),
+    }
+
+
+def unit_cache_clear():
+    """Empty the caches of the memoised unit parsers."""
+    _parse_loading_string.cache_clear()
+    parse_pressure_string.cache_clear()
+    parse_temperature_string.cache_clear()
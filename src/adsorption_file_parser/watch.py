@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""
+Parse the files written to watched directories as they arrive.
+
+A ``Watcher`` looks for new or modified files in some directories, and
+parses each with the parser detected from its content, in a pool of
+workers which is kept for the lifetime of the watcher, with the parser
+modules imported once in each worker. Results, or errors for files which
+cannot be parsed, are passed to a sink: a function receiving each
+``BatchResult``, such as those made by ``json_lines_sink`` and
+``directory_sink``.
+
+Changes are noticed through the notifications of the operating system
+(inotify, FSEvents, ...) when the optional ``watchdog`` package is
+installed, and otherwise by listing the directories every ``interval``
+seconds. Files which are still being written are left alone until their
+size and modification time stay the same for ``settle`` seconds.
+
+The size and modification time of every processed file are stored in a
+JSON state file, so that a restarted watcher only processes the files
+which were added or modified in the meantime.
+
+.. code:: python
+
+    from adsorption_file_parser.watch import json_lines_sink, watch
+    watch(['/instruments/bel', '/instruments/mic'], json_lines_sink('results.jsonl'), state='state.json')
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import wait
+
+from adsorption_file_parser import ParsingError
+from adsorption_file_parser import logger
+from adsorption_file_parser.batch import _read_one
+from adsorption_file_parser.batch import _record_result
+from adsorption_file_parser.utils.exports import is_ignored
+from adsorption_file_parser.utils.exports import result_to_json
+
+_EXECUTORS = ('process', 'thread')
+
+# libraries imported by the parsers when reading a file
+_WARM_MODULES = ('xlrd', 'openpyxl')
+
+
+class Watcher():
+    """
+    Parse the new and modified files of some directories.
+
+    Parameters
+    ----------
+    directories : list[str]
+        The directories to watch.
+    sink : callable
+        Called with the ``BatchResult`` of each processed file.
+    state : str, optional
+        JSON file where processed files are recorded. Without it,
+        all files present are processed when the watcher starts.
+    workers : int, optional
+        Number of parallel workers, defaults to the number of CPUs.
+    executor : {'process', 'thread'}
+        Type of worker pool to use.
+    interval : float, optional
+        Seconds between two looks for changes.
+    settle : float, optional
+        Seconds during which a file must not change before being processed.
+    recursive : bool, optional
+        Also watch the subdirectories.
+    suffixes : list[str], optional
+        Only process the files with these extensions, e.g. ``['.xls', '.dat']``.
+    options : dict, optional
+        Extra arguments passed to ``read``, e.g. ``{'as_arrays': True}``.
+    """
+    def __init__(
+        self,
+        directories,
+        sink,
+        state=None,
+        workers=None,
+        executor='process',
+        interval=1.0,
+        settle=2.0,
+        recursive=False,
+        suffixes=None,
+        options=None,
+    ):
+        if isinstance(directories, (str, os.PathLike)):
+            directories = [directories]
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.sink = sink
+        self.state_path = os.fspath(state) if state is not None else None
+        self.interval = interval
+        self.settle = settle
+        self.recursive = recursive
+        self.suffixes = tuple(suffix.lower() for suffix in suffixes) if suffixes else None
+        self.options = options or {}
+        self.processed = _load_state(self.state_path)
+
+        if executor == 'process':
+            from concurrent.futures import ProcessPoolExecutor as Executor
+        elif executor == 'thread':
+            from concurrent.futures import ThreadPoolExecutor as Executor
+        else:
+            raise ParsingError(f'Executor must be one of {_EXECUTORS}.')
+        self._pool = Executor(max_workers=workers or os.cpu_count() or 1, initializer=_warm_up)
+
+        self._pending = {}  # path: (signature, time first seen with it)
+        self._running = {}  # future: (path, signature)
+        self._count = 0
+        self._scanned = False
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._changed = set()
+        self._lock = threading.Lock()
+        self._observer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def step(self):
+        """
+        Look for changes once, submit the settled files and pass on the finished results.
+
+        Returns
+        -------
+        int
+            Number of results passed to the sink.
+        """
+        for path, signature in self._settled():
+            future = self._pool.submit(_read_one, self._count, path, None, None, self.options)
+            self._running[future] = (path, signature)
+            self._count += 1
+        return self._collect()
+
+    def run(self):
+        """Process the directories until ``stop`` is called, waiting for the files being parsed."""
+        self._observer = self._start_observer()
+        self._scanned = False  # changes before the observer started
+        try:
+            while not self._stop.is_set():
+                self.step()
+                if self._running:
+                    # results are passed on as soon as they are ready
+                    wait(list(self._running), timeout=self.interval, return_when=FIRST_COMPLETED)
+                else:
+                    self._wakeup.wait(self.interval)
+                    self._wakeup.clear()
+            self._finish()
+        finally:
+            if self._observer is not None:
+                self._observer.stop()
+                self._observer.join()
+                self._observer = None
+
+    def stop(self):
+        """Make ``run`` return, for example from another thread or a signal handler."""
+        self._stop.set()
+        self._wakeup.set()
+
+    def close(self):
+        """Wait for the files being parsed, then release the workers."""
+        self._finish()
+        self._pool.shutdown(wait=True)
+
+    def _finish(self):
+        """Pass on the results of the files being parsed."""
+        if self._running:
+            wait(list(self._running))
+            self._collect()
+
+    def _settled(self):
+        """New or modified files which have not changed for ``settle`` seconds."""
+        now = time.time()
+        in_flight = {path for path, _ in self._running.values()}
+        ready = []
+        candidates = dict(self._candidates())
+        for path in set(self._pending) - set(candidates):  # removed since
+            del self._pending[path]
+        for path, signature in candidates.items():
+            if path in in_flight or self.processed.get(path) == signature:
+                self._pending.pop(path, None)
+                continue
+            seen = self._pending.get(path)
+            if seen is None or seen[0] != signature:
+                # files modified long enough ago, e.g. before a restart, are not waited for
+                seen = (signature, min(now, signature[1] / 1e9))
+                self._pending[path] = seen
+            if now - seen[1] >= self.settle:
+                del self._pending[path]
+                ready.append((path, signature))
+        return ready
+
+    def _candidates(self):
+        """Paths and signatures of the files to check."""
+        if self._observer is None or not self._scanned:
+            self._scanned = True
+            for directory in self.directories:
+                yield from self._scan(directory)
+            return
+
+        # only notified files, and those waiting to settle
+        with self._lock:
+            paths = self._changed | set(self._pending)
+            self._changed = set()
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:  # removed since
+                continue
+            if self._accepts(os.path.basename(path)):
+                yield path, (stat.st_size, stat.st_mtime_ns)
+
+    def _scan(self, directory):
+        """List the files of a directory, using the stat results of ``scandir``."""
+        try:
+            entries = list(os.scandir(directory))
+        except OSError as err:
+            logger.warning(f'Could not list {directory}: {err}')
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if self.recursive and not is_ignored(entry.name):
+                        yield from self._scan(entry.path)
+                elif entry.is_file() and self._accepts(entry.name):
+                    stat = entry.stat()
+                    yield entry.path, (stat.st_size, stat.st_mtime_ns)
+            except OSError:  # removed since
+                continue
+
+    def _accepts(self, name):
+        if is_ignored(name):
+            return False
+        return self.suffixes is None or name.lower().endswith(self.suffixes)
+
+    def _collect(self):
+        """Pass the finished results to the sink and record their files."""
+        done = [future for future in self._running if future.done()]
+        for future in done:
+            path, signature = self._running.pop(future)
+            result = future.result()
+            if result.error is not None:
+                logger.warning(str(result.error))
+            _record_result(result)
+            self.sink(result)
+            self.processed[path] = signature
+        if done:
+            _save_state(self.state_path, self.processed)
+        return len(done)
+
+    def _start_observer(self):
+        """Operating system notifications of changes, if ``watchdog`` is installed."""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                with watcher._lock:
+                    watcher._changed.add(os.fspath(getattr(event, 'dest_path', None) or event.src_path))
+
+        observer = Observer()
+        for directory in self.directories:
+            observer.schedule(Handler(), directory, recursive=self.recursive)
+        observer.start()
+        return observer
+
+
+def watch(directories, sink, **kwargs):
+    """
+    Process the files written to some directories, until interrupted.
+
+    Parameters
+    ----------
+    directories : list[str]
+        The directories to watch.
+    sink : callable
+        Called with the ``BatchResult`` of each processed file.
+    kwargs :
+        Other arguments of ``Watcher``.
+    """
+    with Watcher(directories, sink, **kwargs) as watcher:
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+
+
+def json_lines_sink(path):
+    """
+    Sink appending each result to a JSON lines file.
+
+    Each line holds the ``path``, ``manufacturer``, ``fmt``, ``meta``,
+    ``data`` and ``error`` of a file, dates being written in ISO format.
+    """
+    path = os.fspath(path)
+
+    def sink(result):
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write(result_to_json(result) + '\n')
+
+    return sink
+
+
+def directory_sink(directory):
+    """
+    Sink writing each result to a JSON file in a directory.
+
+    The file has the name of the parsed file followed by a short hash of
+    its directory, so that files of the same name in different watched
+    directories are kept apart, e.g. ``1.DAT.3f2a9c1e.json``. Its content
+    is that of a ``json_lines_sink`` line.
+    """
+    directory = os.fspath(directory)
+    os.makedirs(directory, exist_ok=True)
+
+    def sink(result):
+        path = os.path.abspath(result.path)
+        folder = hashlib.sha1(os.path.dirname(path).encode('utf-8')).hexdigest()[:8]
+        target = os.path.join(directory, f'{os.path.basename(path)}.{folder}.json')
+        _write_atomic(target, result_to_json(result))
+
+    return sink
+
+
+def _warm_up():
+    """Import the parsers and the libraries they use when parsing, once in each worker."""
+    import importlib
+
+    from adsorption_file_parser import registry
+    for spec in registry.parsers():
+        try:
+            spec.load()
+        except Exception:  # pylint: disable=broad-except
+            pass  # reported when the parser is used
+    # the Excel libraries are only imported by the parse functions
+    for name in _WARM_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass  # reported when the parser is used
+
+
+def _load_state(path):
+    """Signatures of the processed files."""
+    if path is None:
+        return {}
+    try:
+        with open(path, encoding='utf-8') as file:
+            return {file_path: tuple(signature) for file_path, signature in json.load(file).items()}
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, AttributeError) as err:
+        logger.warning(f'Could not read the state file {path}, all files will be processed: {err}')
+        return {}
+
+
+def _save_state(path, processed):
+    if path is not None:
+        _write_atomic(path, json.dumps(processed))
+
+
+def _write_atomic(target, content):
+    """Write a file under a temporary name, then rename it."""
+    temporary = f'{target}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        file.write(content)
+    os.replace(temporary, target)
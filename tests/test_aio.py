@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Tests parsing files from asyncio code."""
+
+import asyncio
+
+import pytest
+
+import adsorption_file_parser as afp
+from adsorption_file_parser import synthetic
+
+from .conftest import DATA_BEL
+from .conftest import DATA_QNT
+
+
+@pytest.fixture(scope='module')
+def big_file(tmp_path_factory):
+    """A Micromeritics report taking most of a second to parse."""
+    path = tmp_path_factory.mktemp('aio') / 'big.xls'
+    synthetic.write('mic_excel', path, 20000)
+    return path
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def _collect(results):
+    return [result async for result in results]
+
+
+class TestAio():
+    """Test the coroutine API."""
+    def test_aread(self):
+        """Results are the same as with read."""
+        path = DATA_BEL[0]
+        assert _run(afp.aread(path, 'bel', 'dat')) == afp.read(path, 'bel', 'dat')
+        assert _run(afp.aread(path)) == afp.read(path)
+
+    def test_aread_errors(self, big_file):
+        """Errors and timeouts are raised."""
+        with pytest.raises(afp.ParsingError):
+            _run(afp.aread(DATA_QNT[0], 'unknown', 'txt-raw'))
+        with pytest.raises(asyncio.TimeoutError):
+            _run(afp.aread(big_file, 'mic', 'xl', timeout=0.01))
+
+    def test_responsive(self, big_file):
+        """The event loop keeps running other tasks while a large file is parsed."""
+        async def main():
+            ticks = 0
+            done = asyncio.Event()
+
+            async def ticker():
+                nonlocal ticks
+                while not done.is_set():
+                    ticks += 1
+                    await asyncio.sleep(0.001)
+
+            tick = asyncio.ensure_future(ticker())
+            result = await afp.aread(big_file, 'mic', 'xl')
+            done.set()
+            await tick
+            return result, ticks
+
+        (_, data), ticks = _run(main())
+        assert len(data['pressure']) == 20000
+        # a blocked loop would only tick before and after the parse
+        assert ticks >= 10
+
+    @pytest.mark.parametrize('executor', ['thread', 'process'])
+    def test_aread_many(self, executor):
+        """Results of a batch are the same as reading each file."""
+        items = [(path, 'qnt', 'txt-raw') for path in DATA_QNT[:3]] + [DATA_BEL[0]]
+        results = _run(_collect(afp.aread_many(items, workers=2, executor=executor, limit=1)))
+        assert sorted(r.index for r in results) == list(range(len(items)))
+        for result in results:
+            assert result.error is None
+            assert (result.meta, result.data) == afp.read(result.path)
+
+    def test_aread_many_errors(self, big_file):
+        """Failures and timeouts are reported per file."""
+        items = [(DATA_QNT[0], 'qnt', 'txt-raw'), (DATA_QNT[0], 'unknown', 'txt-raw'), (big_file, 'mic', 'xl')]
+        results = sorted(_run(_collect(afp.aread_many(items, workers=3, timeout=0.1))), key=lambda r: r.index)
+        assert results[0].error is None
+        assert isinstance(results[1].error, afp.ParsingError)
+        assert 'timed out' in str(results[2].error)
+
+        with pytest.raises(afp.ParsingError):
+            _run(_collect(afp.aread_many(items, executor='unknown')))
+
+    def test_aread_many_stop(self):
+        """Files not yet parsed are cancelled when the consumer stops."""
+        items = [(path, 'qnt', 'txt-raw') for path in DATA_QNT] * 3
+
+        async def first():
+            results = afp.aread_many(items, workers=1)
+            async for result in results:
+                await results.aclose()
+                return result
+
+        assert _run(first()).error is None
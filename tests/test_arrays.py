@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Tests array output of all parsers."""
+
+import pytest
+
+import adsorption_file_parser as afp
+
+from .conftest import DATA_3P_XL
+from .conftest import DATA_BEL
+from .conftest import DATA_BEL_CSV
+from .conftest import DATA_BEL_XL
+from .conftest import DATA_GENERIC_CSV
+from .conftest import DATA_GENERIC_EXCEL
+from .conftest import DATA_MIC_XL
+from .conftest import DATA_QNT
+from .conftest import DATA_SMS_DVS_XL
+
+np = pytest.importorskip('numpy')
+
+
+def _lang(path):
+    return {'lang': 'JPN' if path.stem.endswith('_jis') else 'ENG'}
+
+
+FILES = [(p, 'mic', 'xl', {}) for p in DATA_MIC_XL]
+FILES += [(p, 'bel', 'dat', _lang(p)) for p in DATA_BEL]
+FILES += [(p, 'bel', 'csv', _lang(p)) for p in DATA_BEL_CSV]
+FILES += [(p, 'bel', 'xl', {}) for p in DATA_BEL_XL]
+FILES += [(p, '3p', 'xl', {}) for p in DATA_3P_XL]
+FILES += [(p, 'qnt', 'txt-raw', {}) for p in DATA_QNT]
+FILES += [(p, 'smsdvs', 'xlsx', {}) for p in DATA_SMS_DVS_XL]
+FILES += [(p, 'generic', 'csv', {}) for p in DATA_GENERIC_CSV]
+FILES += [(p, 'generic', 'xls', {}) for p in DATA_GENERIC_EXCEL]
+
+
+class TestArrays():
+    """Test data returned as numpy arrays."""
+    @pytest.mark.parametrize('path, manufacturer, fmt, options', FILES)
+    def test_read_as_arrays(self, path, manufacturer, fmt, options):
+        """Arrays hold the same values as the default lists."""
+        meta, data = afp.read(path, manufacturer, fmt, **options)
+        meta_arr, data_arr = afp.read(path, manufacturer, fmt, as_arrays=True, **options)
+
+        assert meta_arr == meta
+        assert data_arr.keys() == data.keys()
+        for key, values in data.items():
+            column = data_arr[key]
+            if key == 'branch':
+                assert column.dtype == np.int8
+                assert column.tolist() == values
+            elif isinstance(column, np.ndarray):
+                assert column.dtype == np.float64
+                expected = np.array(values, dtype=np.float64)
+                np.testing.assert_array_equal(column, expected)
+            else:
+                assert column == values
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Tests parallel parsing of many files."""
+
+import pytest
+
+import adsorption_file_parser as afp
+
+from .conftest import DATA_BEL
+from .conftest import DATA_MIC_XL
+from .conftest import DATA_QNT
+
+
+def _items():
+    items = [(path, 'mic', 'xl') for path in DATA_MIC_XL[:3]]
+    items += [(path, 'qnt', 'txt-raw') for path in DATA_QNT[:3]]
+    items += [(path, 'bel', 'dat', {'lang': 'JPN' if path.stem.endswith('_jis') else 'ENG'})
+              for path in DATA_BEL[:3]]
+    return items
+
+
+class TestBatch():
+    """Test parsing of many files at once."""
+    @pytest.mark.parametrize('executor', ['thread', 'process'])
+    def test_read_many(self, executor):
+        """Results of a batch are the same as reading each file."""
+        items = _items()
+        results = list(afp.read_many(items, workers=2, executor=executor))
+
+        assert sorted(r.index for r in results) == list(range(len(items)))
+        for result in results:
+            item = items[result.index]
+            options = item[3] if len(item) == 4 else {}
+            meta, data = afp.read(item[0], item[1], item[2], **options)
+            assert result.error is None
+            assert result.path == item[0]
+            assert result.meta == meta
+            assert result.data == data
+
+    def test_read_many_errors(self, tmp_path):
+        """Failures are reported per file and do not stop the batch."""
+        bad = tmp_path / 'bad.txt'
+        bad.write_text('not an isotherm')
+        items = [
+            (DATA_QNT[0], 'qnt', 'txt-raw'),
+            (bad, 'qnt', 'txt-raw'),
+            (tmp_path / 'missing.txt', 'qnt', 'txt-raw'),
+            (DATA_QNT[0], 'unknown', 'txt-raw'),
+        ]
+        results = sorted(afp.read_many(items, executor='thread'), key=lambda r: r.index)
+
+        assert results[0].error is None
+        assert results[0].meta is not None
+        for result in results[1:]:
+            assert isinstance(result.error, afp.ParsingError)
+            assert result.meta is None
+            assert result.data is None
+
+    def test_read_many_options(self):
+        """Wrong batch options are caught."""
+        with pytest.raises(afp.ParsingError):
+            list(afp.read_many([], executor='cluster'))
+        with pytest.raises(afp.ParsingError):
+            list(afp.read_many([(DATA_QNT[0], 'qnt')]))
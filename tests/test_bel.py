@@ -4,8 +4,11 @@
 import json
 
 import pytest
+import xlrd
 
 import adsorption_file_parser as afp
+from adsorption_file_parser import bel_dat
+from adsorption_file_parser import bel_excel
 
 from .conftest import DATA_BEL
 from .conftest import DATA_BEL_CSV
@@ -68,3 +71,66 @@ class TestBEL():
             result_dict_json = json.load(file)
 
         assert result_dict == result_dict_json
+
+    def test_release_on_error(self, monkeypatch):
+        """The workbook is released when parsing fails mid-sheet."""
+        released = []
+        release = xlrd.Book.release_resources
+        monkeypatch.setattr(xlrd.Book, 'release_resources', lambda book: released.append(release(book)))
+
+        def fail(*args):
+            raise afp.ParsingError('bad header')
+
+        monkeypatch.setattr(bel_excel, '_get_header', fail)
+        with pytest.raises(afp.ParsingError):
+            afp.read(path=DATA_BEL_XL[0], manufacturer='bel', fmt='xl')
+        assert len(released) == 1
+
+
+class TestBELDatReader():
+    """Test incremental reading of BEL data files being written."""
+    @pytest.mark.parametrize('as_arrays', [False, True])
+    @pytest.mark.parametrize('path', [*DATA_BEL[:2], *(p for p in DATA_BEL if p.stem.endswith('_jis'))])
+    def test_progressive(self, tmp_path, path, as_arrays):
+        """Reading a file as it is written gives the same result as parsing it."""
+        lang = 'JPN' if path.stem.endswith('_jis') else 'ENG'
+        meta, data = bel_dat.parse(path, lang=lang, as_arrays=as_arrays)
+        content = path.read_bytes()
+        live = tmp_path / path.name
+        live.write_bytes(b'')
+        reader = bel_dat.BelDatReader(live, lang=lang, as_arrays=as_arrays)
+
+        branches = []
+        for end in range(0, len(content), 211):
+            live.write_bytes(content[:end])
+            branches += list(reader.update().get('branch', []))
+        live.write_bytes(content)
+        branches += list(reader.update().get('branch', []))
+        assert reader.update() == {}
+
+        assert reader.meta == meta
+        assert {key: list(column) for key, column in reader.data.items()} == {key: list(column) for key, column in data.items()}
+        assert branches == list(data['branch'])
+
+    def test_unterminated(self, tmp_path):
+        """Points of a section still being measured are returned, and the file can be rewritten."""
+        path = DATA_BEL[0]
+        _, data = bel_dat.parse(path)
+        n_ads = list(data['branch']).count(0)
+        lines = path.read_bytes().splitlines(keepends=True)
+        # the header of the desorption block is two lines after its title
+        first = next(i for i, line in enumerate(lines) if line.strip().lower() == b'desorption data') + 3
+        live = tmp_path / path.name
+
+        # the second desorption line is not complete
+        live.write_bytes(b''.join(lines[:first + 1]) + lines[first + 1][:-1])
+        reader = bel_dat.BelDatReader(live)
+        new = reader.update()
+        assert new['branch'] == [0] * n_ads + [1]
+        assert new['pressure'] == data['pressure'][:n_ads + 1]
+
+        live.write_bytes(b''.join(lines[:first + 3]))
+        assert reader.update() == {key: column[n_ads + 1:n_ads + 3] for key, column in data.items()}
+
+        live.write_bytes(b''.join(lines[:first + 1]))
+        assert len(reader.update()['branch']) == n_ads + 1
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Tests the persistent cache of parse results."""
+
+import os
+import pickle
+import shutil
+
+import pytest
+
+import adsorption_file_parser as afp
+from adsorption_file_parser import cache
+
+from .conftest import DATA_BEL
+from .conftest import DATA_GENERIC_CSV
+from .conftest import DATA_MIC_XL
+from .conftest import DATA_QNT
+
+CALLS = []
+
+
+def _record_call():
+    CALLS.append(True)
+
+
+class _Unsafe():
+    """An object which runs code when unpickled."""
+    def __reduce__(self):
+        return _record_call, ()
+
+
+@pytest.fixture
+def result_cache(tmp_path):
+    """An enabled cache, disabled after the test."""
+    yield cache.configure_result_cache(tmp_path / 'cache')
+    cache.configure_result_cache(None)
+
+
+class TestResultCache():
+    """Test caching of parsed files."""
+    def test_hit(self, result_cache):
+        """A second read returns the stored result."""
+        path = DATA_MIC_XL[0]
+        first = afp.read(path, 'mic', 'xl')
+        second = afp.read(path, 'mic', 'xl')
+        assert result_cache.stats()['hits'] == 1
+        assert result_cache.stats()['misses'] == 1
+        assert first == second
+        # results are independent copies
+        second[1]['pressure'].append(0)
+        assert afp.read(path, 'mic', 'xl') == first
+
+    def test_key(self, result_cache, tmp_path):
+        """Options and content are part of the key, the path is not."""
+        path = DATA_BEL[0]
+        lang = 'JPN' if path.stem.endswith('_jis') else 'ENG'
+        afp.read(path, 'bel', 'dat', lang=lang)
+        afp.read(path, 'bel', 'dat', lang=lang, as_arrays=False)
+        assert result_cache.stats()['misses'] == 2
+
+        copy = tmp_path / path.name
+        shutil.copy(path, copy)
+        afp.read(copy, 'bel', 'dat', lang=lang)
+        assert result_cache.stats()['hits'] == 1
+
+        # a modified file is hashed again
+        with open(copy, 'a', encoding='cp1252') as file:
+            file.write('\n')
+        os.utime(copy, ns=(0, 0))
+        afp.read(copy, 'bel', 'dat', lang=lang)
+        assert result_cache.stats()['misses'] == 3
+
+    def test_shared(self, result_cache):
+        """Another cache on the same directory reuses the results."""
+        path = DATA_QNT[0]
+        reference = afp.read(path, 'qnt', 'txt-raw')
+        other = cache.configure_result_cache(result_cache.directory)
+        assert afp.read(path, 'qnt', 'txt-raw') == reference
+        assert other.stats()['hits'] == 1
+
+    def test_errors_not_cached(self, result_cache, tmp_path):
+        path = tmp_path / 'bad.DAT'
+        path.write_text('nothing')
+        for _ in range(2):
+            with pytest.raises(Exception):
+                afp.read(path, 'bel', 'dat')
+        assert result_cache.stats()['entries'] == 0
+
+    def test_eviction(self, tmp_path):
+        """The least recently used entries are removed above the size limit."""
+        small = cache.ResultCache(tmp_path, max_size=1000)
+        entries = []
+        for i in range(5):
+            small.read(DATA_QNT[0], 'parser', {'i': i}, lambda path, i: ({'i': i}, {'x': [0.0] * 50}))
+            entry = tmp_path / (small._key(DATA_QNT[0], 'parser', {'i': i}) + '.pickle')
+            os.utime(entry, ns=(i * 10**9, i * 10**9))
+            entries.append(entry)
+        small.evict()
+        assert small.stats()['size'] <= 1000
+        assert not entries[0].exists()
+        assert entries[-1].exists()
+        small.clear()
+        assert small.stats()['entries'] == 0
+
+    def test_not_a_file(self, result_cache):
+        """Inputs which are not files, such as CSV text, are parsed without the cache."""
+        text = DATA_GENERIC_CSV[0].read_text(encoding='utf-8')
+        assert afp.read(text, 'generic', 'csv') == afp.read(DATA_GENERIC_CSV[0], 'generic', 'csv')
+        assert result_cache.stats()['hits'] + result_cache.stats()['misses'] == 1
+
+    def test_records_evicted(self, tmp_path):
+        """Content hash records count towards the size and are evicted too."""
+        small = cache.ResultCache(tmp_path / 'cache', max_size=2000)
+        for i in range(40):
+            path = tmp_path / f'{i}.txt'
+            path.write_text(str(i))
+            small.read(path, 'parser', {}, lambda path: ({}, {}))
+        small.evict()
+        assert small.stats()['size'] <= 2000
+        records = [name for name in os.listdir(small.directory) if name.endswith('.path')]
+        assert 0 < len(records) < 40
+
+    def test_eviction_amortised(self, tmp_path, monkeypatch):
+        """The directory is not scanned at each write."""
+        large = cache.ResultCache(tmp_path, max_size=10**9)
+        scans = []
+        evict = large.evict
+        monkeypatch.setattr(large, 'evict', lambda: scans.append(evict()))
+        for i in range(20):
+            large.read(DATA_QNT[0], 'parser', {'i': i}, lambda path, i: ({'i': i}, {}))
+        assert len(scans) == 1
+        assert large._size == large.stats()['size']
+
+    def test_keys_bounded(self, tmp_path, monkeypatch):
+        """Keys remembered in memory are bounded, the least recently used are forgotten."""
+        monkeypatch.setattr(cache, '_MAX_KEYS', 3)
+        small = cache.ResultCache(tmp_path)
+        for i in range(5):
+            small.read(DATA_QNT[0], 'parser', {'i': i}, lambda path, i: ({'i': i}, {}))
+        assert [params[2] for params in small._keys] == [repr([('i', i)]) for i in (2, 3, 4)]
+        assert small.read(DATA_QNT[0], 'parser', {'i': 0}, lambda path, i: ({}, {})) == ({'i': 0}, {})
+        assert len(small._keys) == 3
+
+    def test_unsafe_entry(self, result_cache):
+        """An entry which would run code is discarded and the file parsed again."""
+        path = DATA_QNT[0]
+        reference = afp.read(path, 'qnt', 'txt-raw')
+        for entry in os.listdir(result_cache.directory):
+            if entry.endswith('.pickle'):
+                with open(os.path.join(result_cache.directory, entry), 'wb') as file:
+                    pickle.dump(_Unsafe(), file)
+        assert afp.read(path, 'qnt', 'txt-raw') == reference
+        assert not CALLS
+        assert result_cache.stats()['misses'] == 2
+
+    def test_arrays(self, result_cache):
+        """Numpy columns are loaded from entries."""
+        np = pytest.importorskip('numpy')
+        path = DATA_BEL[0]
+        lang = 'JPN' if path.stem.endswith('_jis') else 'ENG'
+        _, data = afp.read(path, 'bel', 'dat', lang=lang, as_arrays=True)
+        _, cached = afp.read(path, 'bel', 'dat', lang=lang, as_arrays=True)
+        assert result_cache.stats()['hits'] == 1
+        for key, column in data.items():
+            assert isinstance(cached[key], np.ndarray)
+            assert cached[key].dtype == column.dtype
+            assert np.array_equal(cached[key], column, equal_nan=True)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""Tests the afp command line tool."""
+
+import csv
+import json
+import logging
+import shutil
+import sys
+
+import pytest
+
+import adsorption_file_parser as afp
+from adsorption_file_parser.cli import main
+
+from .conftest import DATA_BEL
+from .conftest import DATA_QNT
+
+
+@pytest.fixture
+def exports(tmp_path):
+    """A directory of instrument exports, with a subdirectory and a file to ignore."""
+    directory = tmp_path / 'exports'
+    (directory / 'qnt').mkdir(parents=True)
+    for path in DATA_QNT[:2]:
+        shutil.copy(path, directory / 'qnt')
+    shutil.copy(DATA_BEL[0], directory)
+    (directory / '.hidden').write_text('ignored')
+    return directory
+
+
+class TestCLI():
+    """Test the command line tool."""
+    @pytest.mark.parametrize('to', ['json', 'csv'])
+    def test_convert(self, exports, tmp_path, capsys, to):
+        """Every file is written out, keeping the directory structure."""
+        output = tmp_path / 'output'
+        assert main(['convert', str(exports), '-o', str(output), '-t', to, '-w', '2', '--threads']) == 0
+        assert 'Converted 3 of 3 files' in capsys.readouterr().out
+
+        for path in DATA_QNT[:2]:
+            target = output / 'qnt' / f'{path.name}.{to}'
+            _, data = afp.read(path)
+            if to == 'json':
+                content = json.loads(target.read_text())
+                assert content['fmt'] == 'txt-raw'
+                assert content['data'] == data
+            else:
+                with open(target, encoding='utf-8', newline='') as file:
+                    rows = list(csv.reader(file))
+                assert rows[0] == list(data.keys())
+                assert len(rows) == len(data['pressure']) + 1
+        assert (output / f'{DATA_BEL[0].name}.{to}').exists()
+
+    def test_convert_jsonl(self, exports, tmp_path, capsys):
+        """Failures are reported in the output and the exit status."""
+        (exports / 'notes.txt').write_text('not an isotherm')
+        output = tmp_path / 'results.jsonl'
+        assert main(['convert', str(exports), '--no-recursive', '-o', str(output), '-t', 'jsonl']) == 1
+        captured = capsys.readouterr()
+        assert 'Converted 1 of 2 files' in captured.out
+        assert 'notes.txt' in captured.err
+
+        lines = [json.loads(line) for line in output.read_text().splitlines()]
+        assert sorted(line['error'] is None for line in lines) == [False, True]
+
+    def test_convert_duplicates(self, exports, tmp_path, capsys):
+        """Files with the same output are refused rather than overwritten."""
+        output = tmp_path / 'output'
+        first = exports / 'qnt' / DATA_QNT[0].name
+        second = tmp_path / DATA_QNT[0].name
+        shutil.copy(DATA_QNT[1], second)
+        assert main(['convert', str(first), str(second), '-o', str(output), '--threads']) == 1
+        captured = capsys.readouterr()
+        assert 'Converted 1 of 2 files' in captured.out
+        assert str(second) in captured.err
+
+        content = json.loads((output / f'{DATA_QNT[0].name}.json').read_text())
+        assert content['path'] == str(first)
+
+    def test_logger_restored(self, exports, tmp_path, capsys):
+        """Logging is sent to stderr while the tool runs, and back to stdout after."""
+        handler = logging.StreamHandler(sys.stdout)
+        afp.logger.addHandler(handler)
+        try:
+            assert main(['inspect', str(exports / 'qnt')]) == 0
+            assert handler.stream is sys.stdout
+            with pytest.raises(SystemExit):
+                main(['inspect', str(tmp_path / 'missing')])
+            assert handler.stream is sys.stdout
+        finally:
+            afp.logger.removeHandler(handler)
+
+    def test_convert_options(self, tmp_path, capsys):
+        """Options are given to the parser, with values read as JSON."""
+        output = tmp_path / 'output'
+        path = str(DATA_QNT[0])
+        assert main(['convert', path, '-o', str(output), '-m', 'qnt', '-f', 'txt-raw', '--option', 'tolerant=true']) == 0
+        with pytest.raises(SystemExit):
+            main(['convert', path, '-o', str(output), '--option', 'tolerant'])
+        with pytest.raises(SystemExit):
+            main(['convert', str(tmp_path / 'missing'), '-o', str(output)])
+
+    def test_inspect(self, exports, capsys):
+        """Metadata of each file is printed as JSON."""
+        assert main(['inspect', str(exports / 'qnt'), '--suffix', '.TXT']) == 0
+        out = capsys.readouterr().out
+        documents = json.loads('[' + out.replace('}\n{', '},{') + ']')
+        assert [document['manufacturer'] for document in documents] == ['qnt', 'qnt']
+        assert all('data' not in document for document in documents)
+
+    def test_bench(self, exports, capsys):
+        """Each file is timed, with its phases."""
+        assert main(['bench', str(exports), '-r', '1', '--phases']) == 0
+        out = capsys.readouterr().out
+        assert out.count('qnt:txt-raw') == 2
+        assert 'metadata' in out
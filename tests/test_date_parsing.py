@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Tests the date parser with learned formats."""
+
+import random
+from datetime import datetime
+from datetime import timedelta
+
+import dateutil.parser
+import pytest
+
+from adsorption_file_parser.utils import date_parsing
+
+FORMATS = [
+    '%d.%m.%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M:%S',
+    '%m/%d/%Y %I:%M:%S %p',
+    '%m/%d/%Y %H:%M',
+    '%Y/%m/%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M:%S+01:00',
+    '%Y/%m/%d 下午 %I:%M:%S',
+    '%m/%d/%Y',
+    '%d.%m.%Y',
+    '%y/%m/%d',
+    '%Y-%m-%dT%H:%M:%S',
+    '%d %b %Y',
+]
+
+
+def _strings(seed, count=300):
+    """Dates in all formats, shuffled, including ambiguous days and months."""
+    rng = random.Random(seed)
+    start = datetime(1995, 1, 1)
+    strings = []
+    for _ in range(count):
+        date = start + timedelta(seconds=rng.randrange(40 * 365 * 86400))
+        strings.append(date.strftime(rng.choice(FORMATS)))
+    return strings
+
+
+@pytest.fixture(autouse=True)
+def clear_formats():
+    date_parsing.date_cache_clear()
+    yield
+    date_parsing.date_cache_clear()
+
+
+@pytest.mark.parametrize('yearfirst', [False, True])
+@pytest.mark.parametrize('seed', range(3))
+def test_same_as_dateutil(seed, yearfirst):
+    """Learned formats always give the dateutil result."""
+    for text in _strings(seed):
+        try:
+            expected = dateutil.parser.parse(text.replace('下午', ''), yearfirst=yearfirst).isoformat()
+        except ValueError:
+            with pytest.raises(ValueError):
+                date_parsing.parse_date(text, yearfirst=yearfirst)
+            continue
+        assert date_parsing.parse_date(text, yearfirst=yearfirst) == expected, text
+
+    info = date_parsing.date_cache_info()
+    assert info['learned'] > 0
+    assert info['fast'] > info['dateutil']
+
+
+def test_learned_format():
+    """A format is learned from the first string and used for the next."""
+    assert date_parsing.parse_date('14.04.2021 09:20:40') == '2021-04-14T09:20:40'
+    assert date_parsing.date_cache_info()['learned'] == 1
+    assert date_parsing.parse_date('30.08.2021 13:22:35') == '2021-08-30T13:22:35'
+    assert date_parsing.date_cache_info()['fast'] == 1
+
+    # ambiguous day and month are left to dateutil, which reads month first
+    assert date_parsing.parse_date('10.02.2021 8:25:30') == '2021-10-02T08:25:30'
+    assert date_parsing.date_cache_info()['dateutil'] == 2
+
+
+def test_ampm_markers():
+    """Chinese/Japanese markers are removed."""
+    assert date_parsing.parse_date('2021/12/16 下午 06:50:16') == '2021-12-16T06:50:16'
+    assert date_parsing.parse_date('2021/12/17 上午 08:54:19') == '2021-12-17T08:54:19'
+
+
+def test_invalid_date():
+    with pytest.raises(ValueError):
+        date_parsing.parse_date('not a date')
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Tests detection of the file format."""
+
+import pytest
+
+import adsorption_file_parser as afp
+from adsorption_file_parser.detect import detect_format
+
+from .conftest import DATA_3P_XL
+from .conftest import DATA_BEL
+from .conftest import DATA_BEL_CSV
+from .conftest import DATA_BEL_XL
+from .conftest import DATA_GENERIC_CSV
+from .conftest import DATA_GENERIC_EXCEL
+from .conftest import DATA_MIC_XL
+from .conftest import DATA_QNT
+from .conftest import DATA_SMS_DVS_XL
+
+
+def _lang(path):
+    return {'lang': 'JPN' if path.stem.endswith('_jis') else 'ENG'}
+
+
+CASES = (
+    [(path, 'mic', 'xl', {}) for path in DATA_MIC_XL] +
+    [(path, 'bel', 'xl', {}) for path in DATA_BEL_XL] +
+    [(path, 'bel', 'dat', _lang(path)) for path in DATA_BEL] +
+    [(path, 'bel', 'csv', _lang(path)) for path in DATA_BEL_CSV] +
+    [(path, '3p', 'xl', {}) for path in DATA_3P_XL] +
+    [(path, 'qnt', 'txt-raw', {}) for path in DATA_QNT] +
+    [(path, 'smsdvs', 'xlsx', {}) for path in DATA_SMS_DVS_XL] +
+    [(path, 'generic', 'csv', {}) for path in DATA_GENERIC_CSV] +
+    [(path, 'generic', 'xls', {}) for path in DATA_GENERIC_EXCEL]
+)
+
+
+class TestDetect():
+    """Test format detection."""
+    @pytest.mark.parametrize('path, manufacturer, fmt, options', CASES)
+    def test_detect(self, path, manufacturer, fmt, options):
+        """All test files are detected as their format."""
+        detection = detect_format(path)
+        assert detection.manufacturer == manufacturer
+        assert detection.fmt == fmt
+        assert detection.options == options
+        assert 0 < detection.confidence <= 1
+
+    @pytest.mark.parametrize('path, manufacturer, fmt, options', CASES[::7])
+    def test_read_detected(self, path, manufacturer, fmt, options):
+        """Reading without format is the same as with the format."""
+        assert afp.read(path) == afp.read(path, manufacturer, fmt, **options)
+
+    def test_read_partial(self):
+        """A missing format is detected, a wrong manufacturer is an error."""
+        path = DATA_BEL[0]
+        assert afp.read(path, 'bel', lang=_lang(path)['lang']) == afp.read(path, 'bel', 'dat', **_lang(path))
+        with pytest.raises(afp.ParsingError):
+            afp.read(path, 'mic')
+
+    def test_unknown(self, tmp_path):
+        """Unknown files raise a ParsingError."""
+        path = tmp_path / 'unknown.txt'
+        path.write_text('nothing to see here')
+        with pytest.raises(afp.ParsingError):
+            detect_format(path)
+        with pytest.raises(afp.ParsingError):
+            afp.read(tmp_path / 'missing.txt')
+
+    def test_module_attribute(self):
+        """The package attribute is the detection module, not shadowed by a function."""
+        from adsorption_file_parser import detect
+        assert detect.resolve is afp.detect.resolve
+        assert afp.detect_format is detect.detect_format
+
+    def test_read_many_detected(self):
+        """Batch items can be paths only."""
+        paths = [DATA_QNT[0], DATA_BEL[0]]
+        results = sorted(afp.read_many(paths, executor='thread'), key=lambda r: r.index)
+        assert [r.error for r in results] == [None, None]
+        assert [r.manufacturer for r in results] == ['qnt', 'bel']
+        assert results[1].data == afp.read(DATA_BEL[0], 'bel', 'dat', **_lang(DATA_BEL[0]))[1]
@@ -6,6 +6,8 @@ import json
 import pytest
 
 import adsorption_file_parser as afp
+from adsorption_file_parser import ParsingError
+from adsorption_file_parser import generic_csv
 
 from .conftest import DATA_GENERIC_CSV
 from .conftest import RECREATE
@@ -28,3 +30,25 @@ class TestGeneric():
             result_dict_json = json.load(file)
 
         assert result_dict == result_dict_json
+
+    @pytest.mark.parametrize('path', DATA_GENERIC_CSV)
+    def test_read_generic_csv_string(self, path):
+        """A CSV string gives the same result as the file."""
+        text = path.read_text(encoding='utf-8')
+        assert generic_csv.parse(text) == generic_csv.parse(path)
+
+    @pytest.mark.parametrize('path', DATA_GENERIC_CSV)
+    def test_read_generic_csv_batches(self, path, monkeypatch):
+        """Data read in many batches gives the same result."""
+        expected = generic_csv.parse(path)
+        monkeypatch.setattr(generic_csv, '_BATCH_LINES', 3)
+        assert generic_csv.parse(path) == expected
+
+    def test_read_generic_csv_irregular_lines(self):
+        """Blank lines are skipped, windows line ends and padding are ignored."""
+        text = '_parser_version,1.0\ndata:[pressure,loading,branch]\npressure,loading,branch\n'
+        _, data = generic_csv.parse(text + '0.1,1.0,ads\r\n\n 0.2,2.0,ads \r\n0.1,1.5,des\n')
+        assert data == {'pressure': [0.1, 0.2, 0.1], 'loading': [1.0, 2.0, 1.5], 'branch': [0, 0, 1]}
+
+        with pytest.raises(ParsingError):
+            generic_csv.parse(text + '0.1,1.0\n0.2,2.0\n')
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Tests the cold start cost of importing the package and its parsers."""
+
+import subprocess
+import sys
+
+import pytest
+
+# import times in ms, generous to be stable on slow CI machines,
+# a regression like eagerly importing openpyxl costs several hundred ms
+BUDGET_PACKAGE = 150
+BUDGET_PARSER = 200
+
+# third party modules which are only imported when a file is parsed
+HEAVY_MODULES = ('xlrd', 'openpyxl', 'dateutil', 'numpy', 'setuptools_scm')
+
+PARSERS = (
+    'bel_csv',
+    'bel_dat',
+    'bel_excel',
+    'generic_csv',
+    'generic_excel',
+    'mic_excel',
+    'qnt_txt',
+    'sms_dvs_excel',
+    'trp_excel',
+)
+
+
+def _import_time(statement):
+    """Cumulative import time in ms of the package modules, and the modules loaded."""
+    code = f'{statement}\nimport sys\nprint(",".join(sys.modules))'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # top-level imports are not indented, the package and the parser
+    # module are imported one after the other
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and line.split('|')[2].startswith(' adsorption_file_parser'):
+            cumulative += int(line.split('|')[1])
+    return cumulative / 1000, set(result.stdout.strip().split(','))
+
+
+def _best_import_time(statement, repeat=3):
+    runs = [_import_time(statement) for _ in range(repeat)]
+    return min(run[0] for run in runs), runs[0][1]
+
+
+def test_import_package():
+    """The package imports quickly, without third party dependencies."""
+    elapsed, modules = _best_import_time('import adsorption_file_parser')
+    assert not modules.intersection(HEAVY_MODULES)
+    assert elapsed < BUDGET_PACKAGE
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+def test_import_parser(parser):
+    """Importing a parser does not import the libraries it needs to run."""
+    elapsed, modules = _best_import_time(f'from adsorption_file_parser.{parser} import parse')
+    assert not modules.intersection(HEAVY_MODULES)
+    assert elapsed < BUDGET_PARSER
+
+
+def test_version_lazy():
+    """The version is resolved on first access."""
+    _, modules = _import_time('import adsorption_file_parser')
+    assert 'adsorption_file_parser._version' not in modules
+    _, modules = _import_time('import adsorption_file_parser as afp\nassert afp.__version__')
+    assert 'adsorption_file_parser._version' in modules or 'setuptools_scm' in modules
+
+
+def test_import_cli():
+    """The command line tool starts without importing the parsers."""
+    _, modules = _import_time('from adsorption_file_parser.cli import main')
+    assert not modules.intersection(HEAVY_MODULES)
+    assert 'adsorption_file_parser.bel_dat' not in modules
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Tests the instrumentation of the parsers."""
+
+from importlib import import_module
+
+import pytest
+
+import adsorption_file_parser as afp
+from adsorption_file_parser import synthetic
+from adsorption_file_parser.utils import instrumentation
+from adsorption_file_parser.utils.numeric_block import tokenize
+
+from .conftest import DATA_QNT
+
+
+@pytest.mark.parametrize('parser', synthetic.WRITERS)
+def test_parsers(tmp_path, parser):
+    """Every parser reports its phases and the work done, without changing the result."""
+    path = tmp_path / f'{parser}{synthetic.WRITERS[parser][1]}'
+    synthetic.write(parser, path, 12)
+    parse = import_module(f'adsorption_file_parser.{parser}').parse
+    expected = parse(path)
+
+    with instrumentation.collect() as stats:
+        assert parse(path) == expected
+    assert instrumentation.active() is None
+
+    assert stats.counters['files'] == 1
+    assert stats.counters['points'] == 12
+    assert stats.counters.get('lines', 0) + stats.counters.get('cells', 0) > 0
+    assert {'open', 'metadata', 'data'} <= set(stats.phases)
+    for wall, cpu in stats.phases.values():
+        assert wall >= 0 and cpu >= 0
+    if parser not in ('trp_xml', 'generic_excel'):
+        assert stats.counters['keyword_lookups'] >= stats.counters.get('keyword_misses', 0)
+
+
+def test_disabled():
+    """Without collect, parse functions are called directly."""
+    parse = import_module('adsorption_file_parser.qnt_txt').parse
+    assert parse.__name__ == 'parse'
+    assert parse.__wrapped__(DATA_QNT[0]) == parse(DATA_QNT[0])
+    instrumentation.count('files')
+    instrumentation.mark('open')
+    with instrumentation.phase('dates'):
+        assert instrumentation.active() is None
+
+
+def test_phases_and_fallbacks():
+    """Phases nest, failures and fallbacks to slower paths are counted."""
+    with instrumentation.collect() as stats:
+        instrumentation.mark('metadata')
+        with instrumentation.phase('dates'):
+            assert stats._phase == 'dates'
+        assert stats._phase == 'metadata'
+        tokenize('1 2\n3 x\n', 2, tolerant=True)
+        with pytest.raises(KeyError):
+            afp.read(DATA_QNT[0], 'bel', 'dat')
+    assert {'metadata', 'dates'} <= set(stats.phases)
+    assert stats.counters['fallback.numeric_rows'] == 1
+    assert stats.counters['fallbacks'] == 1
+    assert stats.counters['failures'] == 1
+
+
+def test_aggregate():
+    """Batch results carry the stats of each file, summed by parser."""
+    items = [(path, 'qnt', 'txt-raw') for path in DATA_QNT[:3]] + [(DATA_QNT[0], 'bel', 'dat')]
+    results = list(afp.read_many(items, workers=2, executor='thread', stats=True))
+    assert all(result.stats is not None for result in results)
+
+    totals = instrumentation.aggregate(results)
+    assert set(totals) == {'qnt:txt-raw', 'bel:dat'}
+    assert totals['qnt:txt-raw'].counters['files'] == 3
+    assert totals['qnt:txt-raw'].counters['points'] == sum(len(afp.read(path)[1]['loading']) for path in DATA_QNT[:3])
+    assert totals['bel:dat'].counters['failures'] == 1
+    assert 'files' not in totals['bel:dat'].counters
+    assert totals['qnt:txt-raw'].as_dict()['phases']['data']['wall'] > 0
+
+    assert all(result.stats is None for result in afp.read_many(items[:1], executor='thread'))
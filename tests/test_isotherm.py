@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Tests the compact isotherm form of parse results."""
+
+import pickle
+import tracemalloc
+from array import array
+from importlib import import_module
+
+import pytest
+
+import adsorption_file_parser as afp
+from adsorption_file_parser import synthetic
+from adsorption_file_parser.isotherm import FIELDS
+from adsorption_file_parser.isotherm import Isotherm
+
+from .conftest import DATA_BEL
+from .conftest import DATA_MIC_XL
+from .conftest import DATA_SMS_DVS_XL
+
+
+def _parse(parser, tmp_path, points=40, **options):
+    path = tmp_path / f'{parser}{synthetic.WRITERS[parser][1]}'
+    synthetic.write(parser, path, points, meta_fields=3)
+    return import_module(f'adsorption_file_parser.{parser}').parse(path, **options)
+
+
+class TestIsotherm():
+    """Test the conversion to and from isotherms."""
+    @pytest.mark.parametrize('parser', synthetic.WRITERS)
+    def test_roundtrip(self, tmp_path, parser):
+        """The (meta, data) tuple of every parser is kept, with the order of the fields."""
+        meta, data = _parse(parser, tmp_path)
+        isotherm = Isotherm(meta, data)
+        assert isotherm.to_tuple() == (meta, data)
+        assert list(isotherm.data) == list(data)
+        assert list(isotherm.meta) == list(meta)
+        assert tuple(isotherm) == (meta, data)
+        assert len(isotherm) == 40
+        for key, column in data.items():
+            if key != 'branch' and column and all(isinstance(value, float) for value in column):
+                assert isinstance(isotherm.columns[key], array)
+
+    @pytest.mark.parametrize('path', DATA_MIC_XL[:3] + DATA_BEL[:3] + DATA_SMS_DVS_XL[:1])
+    def test_roundtrip_files(self, path):
+        """Real files, with missing fields and text columns."""
+        isotherm = Isotherm.read(path)
+        assert isotherm.to_tuple() == afp.read(path)
+        assert pickle.loads(pickle.dumps(isotherm)) == isotherm
+
+    def test_arrays(self, tmp_path):
+        """Numpy columns are kept as they are, and the branch column is rebuilt with its type."""
+        np = pytest.importorskip('numpy')
+        meta, data = _parse('bel_dat', tmp_path, as_arrays=True)
+        isotherm = Isotherm(meta, data)
+        assert isotherm.columns['pressure'] is data['pressure']
+        rebuilt = isotherm.data
+        assert rebuilt['branch'].dtype == data['branch'].dtype
+        assert rebuilt['branch'].tolist() == data['branch'].tolist()
+        assert isotherm == Isotherm(meta, data)
+
+        data['branch'] = data['branch'].astype(np.int64)
+        assert Isotherm(meta, data).data['branch'].dtype == np.int64
+
+    def test_fields(self, tmp_path):
+        """Common fields are attributes, missing ones are not set."""
+        meta, data = _parse('qnt_txt', tmp_path)
+        meta.pop('operator', None)
+        isotherm = Isotherm(meta, data)
+        assert isotherm.material == meta['material']
+        assert isotherm.temperature == meta['temperature']
+        assert isotherm.get('operator', 'none') == 'none'
+        with pytest.raises(AttributeError):
+            isotherm.operator  # pylint: disable=pointless-statement
+        assert 'operator' not in isotherm.meta
+        assert isotherm.extra == {key: value for key, value in meta.items() if key not in FIELDS}
+        assert not hasattr(isotherm, '__dict__')
+
+    def test_meta_order(self):
+        """The metadata keeps the order of the parser, with later changes at the end."""
+        meta = {'custom': 1, 'temperature': 77.0, 'material': 'm', 'other': 2}
+        isotherm = Isotherm(meta, {})
+        assert list(isotherm.meta) == list(meta)
+        del isotherm.material
+        isotherm.operator = 'o'
+        isotherm.extra['added'] = 3
+        assert list(isotherm.meta) == ['custom', 'temperature', 'other', 'operator', 'added']
+
+    def test_branches(self):
+        """Branches are stored as runs, whatever their order."""
+        data = {'pressure': [1.0, 2.0, 3.0, 2.0, 1.0, 2.0], 'branch': [0, 0, 0, 1, 1, 0]}
+        isotherm = Isotherm({}, data)
+        assert isotherm.branches == ((0, 0), (3, 1), (5, 0))
+        assert isotherm.data == data
+        assert list(isotherm.data) == ['pressure', 'branch']
+
+    def test_mixed_columns(self):
+        """Columns which are not all floats or all ints are kept as lists."""
+        data = {'a': [1, 2.5], 'b': [1, None], 'c': ['x', 'y'], 'd': [1, 2], 'e': [2**70, 1], 'f': []}
+        isotherm = Isotherm({'material': 'm'}, data)
+        assert isotherm.columns['a'] is data['a']
+        assert isinstance(isotherm.columns['d'], array)
+        assert isotherm.columns['e'] is data['e']
+        assert isotherm.data == data
+        assert [type(value) for value in isotherm.data['a']] == [int, float]
+
+    def test_memory(self, tmp_path):
+        """The compact form takes several times less memory."""
+        path = tmp_path / 'isotherm.DAT'
+        synthetic.write('bel_dat', path, 1000, meta_fields=20)
+        parse = import_module('adsorption_file_parser.bel_dat').parse
+
+        tracemalloc.start()
+        try:
+            start = tracemalloc.get_traced_memory()[0]
+            results = [parse(path) for _ in range(5)]
+            plain = tracemalloc.get_traced_memory()[0] - start
+            del results
+            start = tracemalloc.get_traced_memory()[0]
+            isotherms = [Isotherm(*parse(path)) for _ in range(5)]
+            compact = tracemalloc.get_traced_memory()[0] - start
+        finally:
+            tracemalloc.stop()
+        assert len(isotherms) == 5
+        assert compact < plain / 3
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Tests the precompiled keyword index."""
+
+import pytest
+
+from adsorption_file_parser import bel_common
+from adsorption_file_parser import mic_excel
+from adsorption_file_parser import qnt_txt
+from adsorption_file_parser.utils.keyword_index import KeywordIndex
+
+DEF_DICTS = [
+    bel_common._META_DICT,
+    bel_common._DATA_DICT,
+    mic_excel._META_DICT,
+    mic_excel._DATA_DICT,
+    qnt_txt._META_DICT,
+    qnt_txt._DATA_DICT,
+]
+
+
+def _texts(def_dict):
+    """Aliases, with some extra text, and strings that match nothing."""
+    texts = ['', 'x', 'not a key', 'no', 'p', 'pe2/kpa', 'p/p0', 'press']
+    for definition in def_dict.values():
+        for text in definition['text']:
+            texts += [text, text + ' extra', text[:-1]]
+    return texts
+
+
+def _search_in(text, def_dict):
+    """Linear search of the first key with an alias equal to the text."""
+    return next((k for k, v in def_dict.items() if text in v['text']), None)
+
+
+def _search_starts(text, def_dict):
+    """Linear search of the first key with an alias the text starts with."""
+    return next((k for k, v in def_dict.items() if any(text.startswith(n) for n in v['text'])), None)
+
+
+@pytest.mark.parametrize('def_dict', DEF_DICTS)
+def test_index_matches_search(def_dict):
+    """Lookups give the same keys as a linear search."""
+    index = KeywordIndex(def_dict)
+    for text in _texts(def_dict):
+        assert index.find(text) == _search_in(text, def_dict)
+        assert index.find_start(text) == _search_starts(text, def_dict)
+
+
+@pytest.mark.parametrize('def_dict', DEF_DICTS)
+def test_index_remove(def_dict):
+    """Removed keys are skipped, as if deleted from the dictionary."""
+    index = KeywordIndex(def_dict)
+    reduced = dict(def_dict)
+    for key in list(def_dict)[::2]:
+        copy = index.copy()
+        index.remove(key)
+        del reduced[key]
+        assert key in copy
+        assert key not in index
+        assert len(index) == len(reduced)
+        for text in _texts(def_dict):
+            assert index.find(text) == _search_in(text, reduced)
+            assert index.find_start(text) == _search_starts(text, reduced)
+    assert [k for k, _ in index.items()] == list(reduced)
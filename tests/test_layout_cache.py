@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Tests the layout cache of Excel report parsers."""
+
+import pytest
+import xlrd
+
+from adsorption_file_parser import bel_excel
+from adsorption_file_parser import mic_excel
+from adsorption_file_parser import synthetic
+from adsorption_file_parser.utils import layout_cache
+
+from .conftest import DATA_BEL_XL
+from .conftest import DATA_MIC_XL
+
+PARSERS = [(mic_excel, path) for path in DATA_MIC_XL] + [(bel_excel, path) for path in DATA_BEL_XL]
+DEFAULT_CACHE = layout_cache.get_layout_cache()
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    """Each test starts with an empty enabled cache, the default is restored after."""
+    monkeypatch.setattr(layout_cache, '_CACHE', layout_cache.LayoutCache())
+
+
+def _fingerprint(module, path):
+    workbook = xlrd.open_workbook(path, encoding_override='latin-1', on_demand=True)
+    if module is bel_excel:
+        sheet = workbook.sheet_by_name('AdsDes')
+        name = 'bel'
+    else:
+        try:
+            sheet = workbook.sheet_by_name("Isotherm Tabular Report")
+        except Exception:
+            sheet = workbook.sheet_by_index(0)
+        name = 'mic'
+    fingerprint = layout_cache.xlrd_fingerprint(name, workbook, sheet)
+    workbook.release_resources()
+    return fingerprint
+
+
+@pytest.mark.parametrize('module, path', PARSERS)
+def test_cached_layout(module, path):
+    """A second parse uses the cached layout and gives the same result."""
+    cache = layout_cache.get_layout_cache()
+    first = module.parse(path)
+    assert cache.stats()['misses'] == 1
+    second = module.parse(path)
+    assert cache.stats()['hits'] == 1
+    assert first == second
+
+
+@pytest.mark.parametrize('module, path', PARSERS)
+def test_cached_cells_only(module, path, monkeypatch):
+    """A cached layout which fits is used without scanning the sheet."""
+    reference = module.parse(path)
+
+    def scan(sheet):
+        raise AssertionError('The sheet was scanned.')
+
+    monkeypatch.setattr(module, '_scan', scan)
+    assert module.parse(path) == reference
+
+
+@pytest.mark.parametrize('module, path', PARSERS)
+def test_layout_mismatch(module, path):
+    """A cached layout which does not fit falls back to the full scan."""
+    cache = layout_cache.get_layout_cache()
+    reference = module.parse(path)
+    cache.put(_fingerprint(module, path), {'events': [[0, 0, None]]})
+    assert module.parse(path) == reference
+    assert cache.stats()['mismatches'] == 1
+    assert cache.stats()['hits'] == 0
+    # the layout was rescanned and stored again
+    assert module.parse(path) == reference
+    assert cache.stats()['hits'] == 1
+
+
+def test_disabled_by_default(tmp_path, monkeypatch):
+    """Without the cache, a label in a cell which held other text in a previous file is found."""
+    monkeypatch.setattr(layout_cache, '_CACHE', DEFAULT_CACHE)
+    assert DEFAULT_CACHE.maxsize == 0
+
+    first, second = tmp_path / 'first.xls', tmp_path / 'second.xls'
+    synthetic.write('mic_excel', first, 10, meta_fields=2)
+    monkeypatch.setattr(synthetic, 'extra_fields', lambda _: [('Primary Data', 'see below'), ('Bad point', 'x')])
+    synthetic.write('mic_excel', second, 10, meta_fields=2)
+
+    assert 'errors' not in mic_excel.parse(first)[0]
+    meta, _ = mic_excel.parse(second)
+    assert meta['errors'] == ['Bad point:']
+    assert DEFAULT_CACHE.stats()['hits'] == 0
+
+
+def test_layout_persisted(tmp_path):
+    """Layouts are shared through the cache file."""
+    cache_path = tmp_path / 'layouts.json'
+    path = DATA_MIC_XL[0]
+    cache = layout_cache.configure_layout_cache(path=str(cache_path))
+    reference = mic_excel.parse(path)
+    assert cache.stats()['misses'] == 1
+    assert cache_path.exists()
+
+    cache = layout_cache.configure_layout_cache(path=str(cache_path))
+    assert mic_excel.parse(path) == reference
+    assert cache.stats()['hits'] == 1
+
+
+def test_layout_cache_lru():
+    """The oldest layout is evicted, and a size of 0 disables the cache."""
+    cache = layout_cache.LayoutCache(maxsize=2)
+    for i in range(3):
+        cache.put(('fp', i), {'events': i})
+    assert cache.get(('fp', 0)) is None
+    assert cache.get(('fp', 2)) == {'events': 2}
+    assert cache.stats()['size'] == 2
+
+    cache = layout_cache.LayoutCache(maxsize=0)
+    cache.put('fp', {})
+    assert cache.get('fp') is None
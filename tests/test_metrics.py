@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Tests the metrics of parsed files and their export."""
+
+import urllib.request
+
+import pytest
+
+import adsorption_file_parser as afp
+from adsorption_file_parser import metrics as metrics_module
+from adsorption_file_parser.metrics import configure_metrics
+from adsorption_file_parser.metrics import serve_metrics
+from adsorption_file_parser.metrics import write_metrics
+from adsorption_file_parser.utils.numeric_block import tokenize
+
+from .conftest import DATA_MIC_XL
+from .conftest import DATA_QNT
+
+PREFIX = 'adsorption_file_parser_'
+
+
+@pytest.fixture
+def metrics():
+    """Fresh metrics for the test, enabled again afterwards."""
+    yield configure_metrics()
+    configure_metrics()
+
+
+def _samples(text):
+    """Values of an exposition by series name with labels."""
+    samples = {}
+    for line in text.splitlines():
+        if not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+class TestMetrics():
+    """Test the recording and exposition of metrics."""
+    def test_read(self, metrics):
+        """Files, bytes, points and times are recorded by parser and outcome."""
+        path = DATA_QNT[0]
+        _, data = afp.read(path)
+        afp.read(path, 'qnt', 'txt-raw')
+        with pytest.raises(afp.ParsingError):
+            afp.read(path, 'unknown', 'format')
+
+        assert metrics.files.value(('qnt', 'txt-raw', 'ok')) == 2
+        assert metrics.files.value(('unknown', 'unknown', 'error')) == 1
+        assert metrics.bytes.value(('qnt', 'txt-raw')) == 2 * path.stat().st_size
+        assert metrics.points.value(('qnt', 'txt-raw')) == 2 * len(data['pressure'])
+        assert metrics.seconds.count(('qnt', 'txt-raw')) == 2
+
+    def test_exposition(self, metrics):
+        """The text format has cumulative buckets and escaped labels."""
+        metrics.seconds.observe(('mic', 'xl'), 0.003)
+        metrics.seconds.observe(('mic', 'xl'), 100)
+        metrics.fallbacks.inc(('a "quoted"\nname', ))
+        text = metrics.exposition()
+        samples = _samples(text)
+
+        assert f'# TYPE {PREFIX}parse_seconds histogram' in text
+        assert samples[f'{PREFIX}parse_seconds_bucket{{manufacturer="mic",fmt="xl",le="0.0025"}}'] == 0
+        assert samples[f'{PREFIX}parse_seconds_bucket{{manufacturer="mic",fmt="xl",le="0.005"}}'] == 1
+        assert samples[f'{PREFIX}parse_seconds_bucket{{manufacturer="mic",fmt="xl",le="+Inf"}}'] == 2
+        assert samples[f'{PREFIX}parse_seconds_count{{manufacturer="mic",fmt="xl"}}'] == 2
+        assert samples[f'{PREFIX}parse_seconds_sum{{manufacturer="mic",fmt="xl"}}'] == 100.003
+        assert samples[f'{PREFIX}fallbacks_total{{name="a \\"quoted\\"\\nname"}}'] == 1
+        assert len(text.splitlines()) == 2 * 5 + len(samples)
+
+    def test_fallbacks(self, metrics):
+        """Parsers count their fallbacks to slower code paths."""
+        tokenize('1 2\n3 x\n', 2, tolerant=True)
+        assert metrics.fallbacks.value(('numeric_rows', )) == 1
+
+    @pytest.mark.parametrize('executor', ['thread', 'process'])
+    def test_read_many(self, metrics, executor, tmp_path):
+        """Files of batches are recorded once, in the calling process."""
+        bad = tmp_path / 'bad.xls'
+        bad.write_bytes(b'not a workbook')
+        items = [(path, 'mic', 'xl') for path in DATA_MIC_XL[:2]] + [(bad, 'mic', 'xl')]
+        results = list(afp.read_many(items, workers=2, executor=executor))
+
+        assert all(result.seconds > 0 for result in results)
+        assert metrics.files.value(('mic', 'xl', 'ok')) == 2
+        assert metrics.files.value(('mic', 'xl', 'error')) == 1
+        assert metrics.seconds.count(('mic', 'xl')) == 3
+
+    def test_disabled(self):
+        """Nothing is recorded when disabled."""
+        try:
+            assert configure_metrics(enabled=False) is None
+            afp.read(DATA_QNT[0])
+            assert metrics_module.get_metrics() is None
+        finally:
+            configure_metrics()
+
+    def test_write(self, metrics, tmp_path):
+        afp.read(DATA_QNT[0])
+        path = tmp_path / 'metrics.prom'
+        write_metrics(path)
+        assert _samples(path.read_text())[f'{PREFIX}files_total{{manufacturer="qnt",fmt="txt-raw",outcome="ok"}}'] == 1
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_serve(self, metrics):
+        afp.read(DATA_QNT[0])
+        server = serve_metrics(0)
+        try:
+            url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+            with urllib.request.urlopen(url, timeout=10) as response:
+                assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+                text = response.read().decode('utf-8')
+            assert text == metrics.exposition()
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(url.replace('/metrics', '/other'), timeout=10)
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -4,8 +4,10 @@
 import json
 
 import pytest
+import xlrd
 
 import adsorption_file_parser as afp
+from adsorption_file_parser import mic_excel
 
 from .conftest import DATA_MIC_XL
 from .conftest import RECREATE
@@ -28,3 +30,17 @@ class TestMicromeritics():
             result_dict_json = json.load(file)
 
         assert result_dict == result_dict_json
+
+    def test_release_on_error(self, monkeypatch):
+        """The workbook is released when parsing fails mid-sheet."""
+        released = []
+        release = xlrd.Book.release_resources
+        monkeypatch.setattr(xlrd.Book, 'release_resources', lambda book: released.append(release(book)))
+
+        def fail(*args):
+            raise afp.ParsingError('bad header')
+
+        monkeypatch.setattr(mic_excel, '_get_header', fail)
+        with pytest.raises(afp.ParsingError):
+            afp.read(path=DATA_MIC_XL[0], manufacturer='mic', fmt='xl')
+        assert len(released) == 1
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Tests the conversion of numeric blocks."""
+
+import math
+import re
+from importlib import import_module
+
+import pytest
+
+from adsorption_file_parser import ParsingError
+from adsorption_file_parser import synthetic
+from adsorption_file_parser.utils.numeric_block import tokenize
+
+
+@pytest.mark.parametrize('as_arrays', [False, True])
+@pytest.mark.parametrize('block', ['1 2\n3\t4\n\n5 6 7\n', b'1 2\n3\t4\n\n5 6 7\n'])
+def test_tokenize(block, as_arrays):
+    """Blank lines and extra values are skipped, str and bytes give the same columns."""
+    result = tokenize(block, 2, as_arrays=as_arrays)
+    assert [list(column) for column in result.columns] == [[1.0, 3.0, 5.0], [2.0, 4.0, 6.0]]
+    assert result.mask is None
+    assert result.errors == []
+
+
+def test_separator_decimal():
+    """Values written with a decimal comma are read with another separator."""
+    result = tokenize('1,5;2\n3;4,25\n', 2, separator=';', decimal=',')
+    assert result.columns == [[1.5, 3.0], [2.0, 4.25]]
+    with pytest.raises(ValueError):
+        tokenize('1,5,2\n', 2, separator=',', decimal=',')
+
+
+@pytest.mark.parametrize('block', ['1 2\n3 x\n', '1 2\n3\n'])
+def test_strict(block):
+    """Bad or missing values raise a ParsingError with their location."""
+    with pytest.raises(ParsingError, match='ata row 1'):
+        tokenize(block, 2)
+
+
+@pytest.mark.parametrize('as_arrays', [False, True])
+def test_tolerant(as_arrays):
+    """Bad or missing values are NaN, masked and reported."""
+    result = tokenize(b'1 2\nx 4\n5\n', 2, tolerant=True, as_arrays=as_arrays, first_row=10)
+    a, b = (list(column) for column in result.columns)
+    assert a[0] == 1.0 and math.isnan(a[1]) and a[2] == 5.0
+    assert b[:2] == [2.0, 4.0] and math.isnan(b[2])
+    assert [list(column) for column in result.mask] == [[False, True, False], [False, False, True]]
+    assert result.errors == [(11, 0, 'x'), (12, 1, None)]
+
+
+@pytest.mark.parametrize('parser', ['bel_dat', 'qnt_txt'])
+def test_parse_tolerant(tmp_path, parser):
+    """Parsers read a corrupted value as NaN when tolerant."""
+    path = tmp_path / f'{parser}{synthetic.WRITERS[parser][1]}'
+    synthetic.write(parser, path, 4)
+    parse = import_module(f'adsorption_file_parser.{parser}').parse
+    assert parse(path, tolerant=True)[0]['data_errors'] == []
+
+    # the loading of the second point
+    _, data = parse(path)
+    value = f"{data['loading'][1]:.4f}".encode()
+    path.write_bytes(re.sub(re.escape(value) + rb'\S*', b'1.2.3', path.read_bytes()))
+
+    with pytest.raises(ParsingError):
+        parse(path)
+    meta, data = parse(path, tolerant=True)
+    assert math.isnan(data['loading'][1])
+    assert meta['data_errors'] == ["Could not read '1.2.3' in data row 1, column 'loading'."]
+
+
+def _decimal_comma(line, separator):
+    """A line of a BEL csv file, with its numbers written with a decimal comma."""
+    fields = line.split(',')
+    for i, field in enumerate(fields):
+        try:
+            float(field)
+        except ValueError:
+            continue
+        fields[i] = field.replace('.', ',')
+    return separator.join(fields)
+
+
+def test_parse_decimal(tmp_path):
+    """Parsers read numbers written with a decimal comma."""
+    path = tmp_path / 'decimal.csv'
+    synthetic.write('bel_csv', path, 10)
+    parse = import_module('adsorption_file_parser.bel_csv').parse
+    meta, data = parse(path)
+    lines = path.read_text(encoding='ISO-8859-1').splitlines()
+    path.write_text('\n'.join(_decimal_comma(line, ';') for line in lines) + '\n', encoding='ISO-8859-1')
+    comma_meta, comma_data = parse(path, separator=';', decimal=',')
+    assert comma_data == data
+    # fields which are not known are kept as text
+    assert comma_meta.pop('saturated_vapor_pressure') == '101,3 kPa'
+    meta.pop('saturated_vapor_pressure')
+    assert comma_meta == meta
+
+    path = tmp_path / 'decimal.txt'
+    synthetic.write('qnt_txt', path, 10)
+    parse = import_module('adsorption_file_parser.qnt_txt').parse
+    meta, data = parse(path)
+    path.write_bytes(re.sub(rb'(\d)\.(\d)', rb'\1,\2', path.read_bytes()))
+    with pytest.raises(ParsingError):
+        parse(path)
+    comma_meta, comma_data = parse(path, decimal=',')
+    assert comma_data == data
+    assert (comma_meta['material_mass'], comma_meta['temperature']) == (meta['material_mass'], meta['temperature'])
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Tests the conversion of data blocks from bytes."""
+
+import pytest
+
+from adsorption_file_parser import ParsingError
+from adsorption_file_parser import bel_dat
+from adsorption_file_parser import qnt_txt
+from adsorption_file_parser.utils import common_utils as util
+
+from .conftest import DATA_BEL
+from .conftest import DATA_QNT
+
+PARSERS = [(bel_dat, path, {'lang': 'JPN' if path.stem.endswith('_jis') else 'ENG'}) for path in DATA_BEL]
+PARSERS += [(qnt_txt, path, {}) for path in DATA_QNT]
+
+
+@pytest.mark.parametrize('module, path, options', PARSERS)
+def test_small_chunks(monkeypatch, module, path, options):
+    """Blocks converted in many pieces give the same result."""
+    expected = module.parse(path, **options)
+    monkeypatch.setattr(util, '_BLOCK_CHUNK', 64)
+    assert module.parse(path, **options) == expected
+
+
+@pytest.mark.parametrize('module, path, options', PARSERS)
+def test_crlf(tmp_path, module, path, options):
+    """Windows line ends are read as in text mode."""
+    crlf = tmp_path / path.name
+    crlf.write_bytes(path.read_bytes().replace(b'\n', b'\r\n'))
+    assert module.parse(crlf, **options) == module.parse(path, **options)
+
+
+def test_read_line():
+    buffer = b'first\r\nsecond\n\nlast'
+    line, pos = util.read_line(buffer, 0)
+    assert line == b'first\n'
+    line, pos = util.read_line(buffer, pos)
+    assert line == b'second\n'
+    line, pos = util.read_line(buffer, pos)
+    assert line == b'\n'
+    line, pos = util.read_line(buffer, pos)
+    assert line == b'last'
+    assert pos == len(buffer)
+
+
+def test_map_empty_file(tmp_path):
+    path = tmp_path / 'empty.txt'
+    path.write_bytes(b'')
+    with util.map_file(path) as buffer:
+        assert buffer == b''
+
+
+@pytest.mark.parametrize('as_arrays', [False, True])
+def test_pack_block(as_arrays):
+    """Blank lines are skipped and each span is a branch."""
+    buffer = b'header\n1 2\n3\t4\n\n5 6\nend\n7 8\r\n'
+    first = (buffer.index(b'1'), buffer.index(b'end'))
+    second = (buffer.index(b'7'), len(buffer))
+    data = util.pack_block(['branch', 'a', 'b'], buffer, [first, second], branched=True, as_arrays=as_arrays)
+    assert list(data['branch']) == [0, 0, 0, 1]
+    assert list(data['a']) == [1.0, 3.0, 5.0, 7.0]
+    assert list(data['b']) == [2.0, 4.0, 6.0, 8.0]
+
+
+@pytest.mark.parametrize('as_arrays', [False, True])
+def test_pack_block_errors(as_arrays):
+    """Lines with a missing value or text are rejected."""
+    with pytest.raises(ParsingError):
+        util.pack_block(['a', 'b'], b'1 2\n3\n', [(0, 6)], as_arrays=as_arrays)
+    with pytest.raises(ParsingError):
+        util.pack_block(['a', 'b'], b'1 2\n3 x\n', [(0, 8)], as_arrays=as_arrays)
+
+
+@pytest.mark.parametrize('as_arrays', [False, True])
+def test_pack_block_tolerant(monkeypatch, as_arrays):
+    """Bad values are reported with their row in the whole block."""
+    monkeypatch.setattr(util, '_BLOCK_CHUNK', 8)
+    errors = []
+    buffer = b'1 2\n3 4\n5 6\n7 x\n9\n'
+    data = util.pack_block(['a', 'b'], buffer, [(0, len(buffer))], as_arrays=as_arrays, errors=errors)
+    assert list(data['a'])[:4] == [1.0, 3.0, 5.0, 7.0]
+    assert errors == [
+        "Could not read 'x' in data row 3, column 'b'.",
+        "Missing value in data row 4, column 'b'.",
+    ]
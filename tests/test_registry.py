@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Tests the parser registry."""
+
+import sys
+
+import pytest
+
+import adsorption_file_parser as afp
+from adsorption_file_parser import registry
+
+from .conftest import DATA_QNT
+
+
+@pytest.fixture
+def clean_registry():
+    """Restore the registry after a test."""
+    saved = dict(registry._REGISTRY)
+    loaded = registry._entry_points_loaded
+    yield registry
+    registry._REGISTRY.clear()
+    registry._REGISTRY.update(saved)
+    registry._entry_points_loaded = loaded
+
+
+class TestRegistry():
+    """Test registering and finding parsers."""
+    def test_builtin(self):
+        """All built-in parsers are registered and can be loaded."""
+        formats = registry.supported_formats()
+        assert formats['bel'] == ('csv', 'xl', 'dat')
+        assert formats['qnt'] == ('txt-raw', )
+        for spec in registry.parsers():
+            assert callable(spec.load())
+            assert spec.supports(registry.ARRAYS)
+        assert {(s.manufacturer, s.fmt) for s in registry.parsers(registry.LAYOUT_CACHE)} == {('mic', 'xl'), ('bel', 'xl')}
+        assert {s.fmt for s in registry.parsers(registry.TOLERANT)} == {'csv', 'dat', 'txt-raw'}
+
+    def test_unknown(self):
+        """Unknown manufacturers and formats raise a ParsingError."""
+        with pytest.raises(afp.ParsingError, match='manufacturers'):
+            afp.read(DATA_QNT[0], 'unknown', 'xl')
+        with pytest.raises(afp.ParsingError, match='formats'):
+            afp.read(DATA_QNT[0], 'qnt', 'xl')
+
+    def test_register(self, clean_registry):
+        """Registered parsers are used by read."""
+        def parse(path, option=None):
+            return {'path': path}, {'option': option}
+
+        clean_registry.register('custom', 'txt', parse, capabilities=['custom'])
+        assert afp.read('file.txt', 'custom', 'txt', option=1) == ({'path': 'file.txt'}, {'option': 1})
+        assert [s.fmt for s in clean_registry.parsers('custom')] == ['txt']
+
+        with pytest.raises(afp.ParsingError):
+            clean_registry.register('custom', 'txt', parse)
+        clean_registry.register('custom', 'txt', 'adsorption_file_parser.qnt_txt:parse', replace=True)
+        assert afp.read(DATA_QNT[0], 'custom', 'txt') == afp.read(DATA_QNT[0], 'qnt', 'txt-raw')
+
+        clean_registry.unregister('custom', 'txt')
+        with pytest.raises(afp.ParsingError):
+            afp.read(DATA_QNT[0], 'custom', 'txt')
+
+    def test_entry_points(self, clean_registry, tmp_path, monkeypatch):
+        """Parsers of other packages are found through entry points."""
+        (tmp_path / 'plugin_parser.py').write_text('def parse(path):\n    return {"plugin": True}, {}\n')
+        dist_info = tmp_path / 'plugin_parser-0.1.dist-info'
+        dist_info.mkdir()
+        (dist_info / 'METADATA').write_text('Metadata-Version: 2.1\nName: plugin-parser\nVersion: 0.1\n')
+        (dist_info / 'entry_points.txt').write_text(
+            '[adsorption_file_parser.parsers]\n'
+            'plugin.txt = plugin_parser:parse\n'
+            'qnt.txt-raw = plugin_parser:parse\n'
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        clean_registry._entry_points_loaded = False
+
+        assert afp.read('file.txt', 'plugin', 'txt') == ({'plugin': True}, {})
+        # built-in parsers are not replaced
+        assert registry.get_parser('qnt', 'txt-raw').target == 'adsorption_file_parser.qnt_txt:parse'
+        sys.modules.pop('plugin_parser', None)
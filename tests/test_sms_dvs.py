@@ -1,16 +1,32 @@
 # -*- coding: utf-8 -*-
 """Tests SMS DVS excel file parsing."""
 
+import collections
 import json
+import math
 
 import pytest
 
 import adsorption_file_parser as afp
+from adsorption_file_parser import ParsingError
+from adsorption_file_parser import sms_dvs_excel
+from adsorption_file_parser import synthetic
 
 from .conftest import DATA_SMS_DVS_XL
 from .conftest import RECREATE
 
 
+@pytest.fixture(scope='module')
+def reports(tmp_path_factory):
+    """Synthetic reports with small and large isotherms, by number of points."""
+    directory = tmp_path_factory.mktemp('reports')
+    paths = {}
+    for points in (100, 10_000):
+        paths[points] = directory / f'report_{points}.xlsx'
+        synthetic.write('sms_dvs_excel', paths[points], points, kinetics=3)
+    return paths
+
+
 class TestSMS_DVS():
     """Test parsing of SMS DVS files"""
     @pytest.mark.parametrize('path', DATA_SMS_DVS_XL)
@@ -28,3 +44,104 @@ class TestSMS_DVS():
             result_dict_json = json.load(file)
 
         assert result_dict == result_dict_json
+
+    @pytest.mark.parametrize('path', DATA_SMS_DVS_XL)
+    def test_kinetics_files(self, path):
+        """Kinetics end at the warning of the truncated export, and do not change the isotherm."""
+        meta, data = afp.read(path=path, manufacturer='smsdvs', fmt='xlsx', kinetics='all')
+        kinetics = meta.pop('kinetics')
+        assert (meta, data) == afp.read(path=path, manufacturer='smsdvs', fmt='xlsx')
+
+        assert isinstance(kinetics['Mass [mg]'], list)
+        json.dumps(kinetics)
+        assert kinetics['Chiller State'][0] == 'ON'
+        assert None not in kinetics
+        assert all(time >= 0 for time in kinetics['Time [minutes]'])
+
+    def test_kinetics(self, tmp_path):
+        """All rows, one row in a few, or the last row of each step."""
+        path = tmp_path / 'kinetics.xlsx'
+        synthetic.write('sms_dvs_excel', path, 10, kinetics=4)
+        meta, _ = sms_dvs_excel.parse(path, kinetics='all')
+        kinetics = meta['kinetics']
+        assert list(kinetics) == ['Time [minutes]', 'Mass [mg]', 'Target Relative Pressure [%]', 'Actual Relative Pressure [%]']
+        assert list(kinetics['Time [minutes]']) == [0.5 * row for row in range(40)]
+
+        meta, _ = sms_dvs_excel.parse(path, kinetics='all', kinetics_every=3)
+        assert list(meta['kinetics']['Time [minutes]']) == [0.5 * row for row in range(0, 40, 3)]
+
+        meta, _ = sms_dvs_excel.parse(path, kinetics='steps')
+        steps = meta['kinetics']
+        assert list(steps['step_rows']) == [4] * 10
+        assert list(steps['step_start']) == [2.0 * step for step in range(10)]
+        assert list(steps['Time [minutes]']) == [2.0 * step + 1.5 for step in range(10)]
+        assert list(steps['Mass [mg]']) == list(kinetics['Mass [mg]'])[3::4]
+
+    def test_kinetics_arrays(self, tmp_path):
+        np = pytest.importorskip('numpy')
+        path = tmp_path / 'kinetics.xlsx'
+        synthetic.write('sms_dvs_excel', path, 10, kinetics=4)
+        meta, _ = sms_dvs_excel.parse(path, kinetics='steps', as_arrays=True)
+        assert meta['kinetics']['Mass [mg]'].dtype == np.float64
+        assert meta['kinetics']['step_rows'].dtype == np.int64
+
+    def test_kinetics_errors(self, tmp_path):
+        path = tmp_path / 'kinetics.xlsx'
+        synthetic.write('sms_dvs_excel', path, 4, kinetics=2)
+        with pytest.raises(ParsingError):
+            sms_dvs_excel.parse(path, kinetics='some')
+        with pytest.raises(ParsingError):
+            sms_dvs_excel.parse(path, kinetics='all', kinetics_every=0)
+
+    def test_kinetics_short_rows(self, tmp_path):
+        """Rows without the last columns, as in sheets without dimensions, are read as empty there."""
+        import openpyxl
+
+        path = tmp_path / 'kinetics.xlsx'
+        book = openpyxl.Workbook(write_only=True)
+        sheet = book.create_sheet('Iso Report')
+        sheet.append([None, None, 'Temp:', '25.0 °C'])
+        sheet.append([None, None, None, 'Target', 'Sorp Mass', 'Desorp Mass'])
+        sheet.append([None, None, None, '% P/Po', 'Change (%)', 'Change (%)'])
+        sheet.append([None, None, 'Cycle 1', 10.0, 1.0, 1.5])
+        sheet = book.create_sheet('DVS Data')
+        sheet.append(['Time [minutes]', 'Mass [mg]', 'Target Relative Pressure [%]'])
+        for row in ([0.0, 30.0, 10.0], [0.5, 30.1, 10.0], [1.0, 30.2], [1.5, 30.3]):
+            sheet.append(row)
+        book.save(path)
+
+        meta, _ = afp.read(path=path, manufacturer='smsdvs', fmt='xlsx', kinetics='steps')
+        assert meta['kinetics']['step_rows'] == [2, 2]
+        assert meta['kinetics']['Mass [mg]'] == [30.1, 30.3]
+        meta, _ = afp.read(path=path, manufacturer='smsdvs', fmt='xlsx', kinetics='all')
+        assert all(math.isnan(value) for value in meta['kinetics']['Target Relative Pressure [%]'][2:])
+
+    @pytest.mark.parametrize('kinetics', [None, 'all', 'steps'])
+    def test_single_pass(self, reports, monkeypatch, kinetics):
+        """
+        Each sheet is read once, in order, whatever the number of rows,
+        so that parsing time is linear in the length of the report.
+        """
+        from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+
+        passes = []
+        rows = collections.Counter()
+        cells_by_row = ReadOnlyWorksheet._cells_by_row
+
+        def counted(sheet, *args, **kwargs):
+            passes.append(sheet.title)
+            for row in cells_by_row(sheet, *args, **kwargs):
+                rows[sheet.title] += 1
+                yield row
+
+        monkeypatch.setattr(ReadOnlyWorksheet, '_cells_by_row', counted)
+        for points, path in reports.items():
+            passes.clear()
+            rows.clear()
+            meta, data = afp.read(path=path, manufacturer='smsdvs', fmt='xlsx', kinetics=kinetics)
+            assert len(data['pressure']) == points
+            assert passes == ['DVS Data', 'Iso Report']
+            # the header rows, then one row per adsorption point
+            assert rows['Iso Report'] <= 20 + points
+            if kinetics == 'steps':
+                assert meta['kinetics']['step_rows'] == [3] * points
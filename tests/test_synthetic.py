@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Tests generated files are read back by the parsers."""
+
+from importlib import import_module
+
+import pytest
+
+from adsorption_file_parser import detect_format
+from adsorption_file_parser import synthetic
+from adsorption_file_parser.registry import get_parser
+
+# extra metadata stored under these keys by the parsers that keep unknown fields
+STORED_FIELDS = {
+    'bel_dat': 'extra_field_{}',
+    'bel_csv': 'extra_field_{}',
+    'trp_excel': 'extra_field_{}',
+    'generic_csv': '_extra_field_{}',
+    'generic_excel': '_extra_field_{}',
+}
+
+
+def _write_and_parse(tmp_path, parser, points, **options):
+    path = tmp_path / f'{parser}{synthetic.WRITERS[parser][1]}'
+    synthetic.write(parser, path, points, **options)
+    parse_options = {'lang': options['lang']} if 'lang' in options else {}
+    return path, import_module(f'adsorption_file_parser.{parser}').parse(path, **parse_options)
+
+
+@pytest.mark.parametrize('parser', synthetic.WRITERS)
+@pytest.mark.parametrize('points', [1, 2, 11])
+@pytest.mark.parametrize('branches', synthetic.BRANCHES)
+def test_round_trip(tmp_path, parser, points, branches):
+    """The parser reads back all points, in the right branch."""
+    _, (_, data) = _write_and_parse(tmp_path, parser, points, branches=branches)
+    assert max(len(column) for column in data.values()) == points
+
+    n_ads, _, _ = synthetic.isotherm(points, branches)
+    if data.get('branch'):
+        assert list(data['branch']) == [0] * n_ads + [1] * (points - n_ads)
+
+
+@pytest.mark.parametrize('parser', synthetic.WRITERS)
+def test_meta_fields(tmp_path, parser):
+    """Extra metadata fields do not change the data, and are kept when the parser stores unknown fields."""
+    _, (meta, data) = _write_and_parse(tmp_path, parser, 5, meta_fields=3)
+    _, (plain_meta, plain_data) = _write_and_parse(tmp_path, parser, 5)
+    assert data == plain_data
+
+    if parser in STORED_FIELDS:
+        for i in range(1, 4):
+            assert meta[STORED_FIELDS[parser].format(i)] == f'value {i}'
+        assert len(meta) == len(plain_meta) + 3
+    else:
+        assert meta == plain_meta
+
+
+@pytest.mark.parametrize('parser', [p for p in synthetic.WRITERS if p != 'trp_xml'])
+def test_detected(tmp_path, parser):
+    """Generated files are recognised as their format."""
+    path, _ = _write_and_parse(tmp_path, parser, 3)
+    detection = detect_format(path)
+    assert get_parser(detection.manufacturer, detection.fmt).target == f'adsorption_file_parser.{parser}:parse'
+
+
+def test_bel_dat_japanese(tmp_path):
+    """The shift_jis variant of BEL DAT files is read with ``lang='JPN'``."""
+    path, (meta, data) = _write_and_parse(tmp_path, 'bel_dat', 6, meta_fields=1, lang='JPN')
+    assert len(data['pressure']) == 6
+    assert meta['material'] == 'synthetic'
+    assert meta['serialnumber'] == '00356'
+    assert meta['extra_field_1'] == 'value 1'
+    assert detect_format(path).options == {'lang': 'JPN'}
+
+
+def test_sms_kinetics(tmp_path):
+    """Kinetic rows do not change the isotherm."""
+    first = tmp_path / 'first.xlsx'
+    second = tmp_path / 'second.xlsx'
+    synthetic.sms_dvs_xlsx(first, 7, kinetics=1)
+    synthetic.sms_dvs_xlsx(second, 7, kinetics=20)
+    parse = import_module('adsorption_file_parser.sms_dvs_excel').parse
+    assert parse(first) == parse(second)
+
+
+def test_errors(tmp_path):
+    """Unknown generators, layouts and oversized xls files are rejected."""
+    with pytest.raises(ValueError):
+        synthetic.write('unknown', tmp_path / 'file', 10)
+    with pytest.raises(ValueError):
+        synthetic.isotherm(10, branches='des')
+    with pytest.raises(ValueError):
+        synthetic.bel_xl(tmp_path / 'file.xls', 70000)
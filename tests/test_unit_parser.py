@@ -75,3 +75,47 @@ def test_parse_pressure_string(test, res):
 def test_parse_loading_string(test, res):
     out = unit_parsing.parse_loading_string(test)
     assert list(out.values()) == res
+
+
+@pytest.mark.parametrize(
+    "test", [
+        "\" mmol  / g \"",
+        "mmol g^(-1)",
+        "cm³(STP)/g",
+        "cm³_{STP} g^{-1}",
+        "ml  g-1 STP",
+        "wt%",
+        "P/P0",
+        "(kPa)",
+    ]
+)
+def test_clean_unit_string(test):
+    """The single pass cleanup matches the regex substitutions."""
+    out = unit_parsing.clean_unit_string(test)
+    assert out == unit_parsing.clean_string(test, unit_parsing.pre_proc_sub)
+
+
+def test_unit_cache():
+    """Parsed units are memoised and cannot be modified."""
+    unit_parsing.unit_cache_clear()
+    first = unit_parsing.parse_loading_string("mmol/g")
+    second = unit_parsing.parse_loading_string("mmol/g")
+    assert first is second
+    with pytest.raises(TypeError):
+        first['loading_unit'] = 'mol'
+    with pytest.raises(TypeError):
+        unit_parsing.parse_pressure_string("kPa")['pressure_unit'] = 'Pa'
+
+    info = unit_parsing.unit_cache_info()
+    assert info['loading'].hits == 1
+    assert info['loading'].misses == 1
+    assert info['pressure'].misses == 1
+
+
+def test_parse_loading_string_missing_units():
+    """Missing units are filled in without modifying the cached result."""
+    out = unit_parsing.parse_loading_string("wt%", missing_units={'loading_unit': 'g', 'material_unit': 'mg'})
+    assert list(out.values()) == ["percent", "g", "mass", "mg"]
+    out = unit_parsing.parse_loading_string("wt%", missing_units={'loading_basis': 'molar'})
+    assert list(out.values()) == ["percent", None, "mass", None]
+    assert list(unit_parsing.parse_loading_string("wt%").values()) == ["percent", None, "mass", None]
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""Tests the ingestion of files written to watched directories."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import adsorption_file_parser as afp
+from adsorption_file_parser import watch
+
+from .conftest import DATA_BEL
+from .conftest import DATA_QNT
+
+
+def _watcher(directory, results, **kwargs):
+    kwargs.setdefault('executor', 'thread')
+    kwargs.setdefault('settle', 0)
+    return watch.Watcher(directory, results.append, **kwargs)
+
+
+def _process(watcher):
+    watcher.step()
+    watcher._finish()
+
+
+class TestWatch():
+    """Test watching directories."""
+    def test_new_and_modified(self, tmp_path):
+        """Files are processed once, and again when modified."""
+        shutil.copy(DATA_QNT[0], tmp_path)
+        results = []
+        with _watcher(tmp_path, results) as watcher:
+            _process(watcher)
+            assert len(results) == 1
+            assert results[0].error is None
+            assert (results[0].meta, results[0].data) == afp.read(DATA_QNT[0])
+
+            _process(watcher)
+            assert len(results) == 1
+
+            path = tmp_path / DATA_QNT[0].name
+            os.utime(path, ns=(0, path.stat().st_mtime_ns + 10**9))
+            shutil.copy(DATA_QNT[1], tmp_path)
+            _process(watcher)
+            assert sorted(os.path.basename(r.path) for r in results[1:]) == sorted([DATA_QNT[0].name, DATA_QNT[1].name])
+
+    def test_state(self, tmp_path):
+        """Processed files are remembered across restarts."""
+        source = tmp_path / 'source'
+        source.mkdir()
+        shutil.copy(DATA_QNT[0], source)
+        state = tmp_path / 'state.json'
+        results = []
+        with _watcher(source, results, state=state) as watcher:
+            _process(watcher)
+        assert len(results) == 1
+
+        shutil.copy(DATA_QNT[1], source)
+        with _watcher(source, results, state=state) as watcher:
+            _process(watcher)
+        assert [os.path.basename(r.path) for r in results] == [DATA_QNT[0].name, DATA_QNT[1].name]
+
+        state.write_text('not json')
+        with _watcher(source, results, state=state) as watcher:
+            _process(watcher)
+        assert len(results) == 4
+
+    def test_settle(self, tmp_path):
+        """Files being written are only processed once they stop changing."""
+        path = tmp_path / DATA_QNT[0].name
+        path.write_bytes(DATA_QNT[0].read_bytes()[:100])
+        results = []
+        with _watcher(tmp_path, results, settle=0.5) as watcher:
+            _process(watcher)
+            path.write_bytes(DATA_QNT[0].read_bytes())
+            _process(watcher)
+            assert not results
+            time.sleep(0.6)
+            _process(watcher)
+        assert len(results) == 1
+        assert results[0].error is None
+
+    def test_filters(self, tmp_path):
+        """Hidden, lock and unwanted files are ignored, subdirectories are optional."""
+        (tmp_path / 'sub').mkdir()
+        shutil.copy(DATA_QNT[0], tmp_path / 'sub')
+        shutil.copy(DATA_QNT[0], tmp_path / '.hidden.txt')
+        shutil.copy(DATA_QNT[0], tmp_path / '~$lock.txt')
+        shutil.copy(DATA_BEL[0], tmp_path)
+        results = []
+        with _watcher(tmp_path, results, suffixes=['.TXT']) as watcher:
+            _process(watcher)
+        assert not results
+        with _watcher(tmp_path, results, suffixes=['.txt'], recursive=True) as watcher:
+            _process(watcher)
+        assert [os.path.basename(r.path) for r in results] == [DATA_QNT[0].name]
+
+    def test_errors(self, tmp_path):
+        """Files which cannot be parsed are reported once."""
+        (tmp_path / 'notes.txt').write_text('not an isotherm')
+        results = []
+        with _watcher(tmp_path, results) as watcher:
+            _process(watcher)
+            _process(watcher)
+        assert len(results) == 1
+        assert isinstance(results[0].error, afp.ParsingError)
+
+        with pytest.raises(afp.ParsingError):
+            watch.Watcher(tmp_path, results.append, executor='unknown')
+
+    def test_run(self, tmp_path):
+        """Files are processed by warm worker processes until stopped."""
+        results = []
+        watcher = _watcher(tmp_path, results, executor='process', workers=1, interval=0.05)
+        thread = threading.Thread(target=watcher.run)
+        thread.start()
+        try:
+            shutil.copy(DATA_BEL[0], tmp_path)
+            deadline = time.time() + 60
+            while not results and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            watcher.stop()
+            thread.join()
+            watcher.close()
+        assert len(results) == 1
+        assert (results[0].meta, results[0].data) == afp.read(DATA_BEL[0])
+
+    def test_sinks(self, tmp_path):
+        """Results are written as JSON."""
+        shutil.copy(DATA_BEL[0], tmp_path)
+        (tmp_path / 'notes.txt').write_text('not an isotherm')
+        lines = tmp_path / 'out' / 'results.jsonl'
+        lines.parent.mkdir()
+        sinks = [watch.json_lines_sink(lines), watch.directory_sink(tmp_path / 'out' / 'files')]
+        with watch.Watcher(tmp_path, lambda r: [sink(r) for sink in sinks], executor='thread', settle=0) as watcher:
+            _process(watcher)
+
+        written = {os.path.basename(r['path']): r for r in map(json.loads, lines.read_text().splitlines())}
+        assert set(written) == {DATA_BEL[0].name, 'notes.txt'}
+        assert written['notes.txt']['error']
+        result = written[DATA_BEL[0].name]
+        meta, data = afp.read(DATA_BEL[0])
+        assert result['error'] is None
+        assert (result['manufacturer'], result['fmt']) == ('bel', 'dat')
+        assert result['data'] == data
+        assert result['meta'] == meta
+        [target] = (tmp_path / 'out' / 'files').glob(f'{DATA_BEL[0].name}.*.json')
+        assert json.loads(target.read_text()) == result
+
+    def test_directory_sink_names(self, tmp_path):
+        """Files of the same name in different directories are written to different files."""
+        for name, source in (('a', DATA_QNT[0]), ('b', DATA_QNT[1])):
+            (tmp_path / name).mkdir()
+            shutil.copy(source, tmp_path / name / 'isotherm.txt')
+        output = tmp_path / 'out'
+        with watch.Watcher([tmp_path / 'a', tmp_path / 'b'], watch.directory_sink(output), executor='thread', settle=0) as watcher:
+            _process(watcher)
+
+        written = {json.loads(target.read_text())['path'] for target in output.glob('isotherm.txt.*.json')}
+        assert written == {str(tmp_path / 'a' / 'isotherm.txt'), str(tmp_path / 'b' / 'isotherm.txt')}
+
+    def test_warm_up(self):
+        """Workers import the Excel libraries before the first file."""
+        code = 'from adsorption_file_parser import watch\nimport sys\nwatch._warm_up()\nprint(",".join(sys.modules))'
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        modules = result.stdout.strip().split(',')
+        assert 'xlrd' in modules
+        assert 'openpyxl' in modules